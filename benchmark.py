@@ -0,0 +1,286 @@
+'''
+群成员管理工具的性能测试
+在无界面模式（Qt offscreen 平台）下，用合成的成员列表测量排序、表格渲染、搜索和导出等热点路径，
+结果保存为JSON文件，便于比较不同版本之间的性能变化
+
+用法示例：
+    python benchmark.py
+    python benchmark.py --sizes 1000 3000 --repeat 10 --output results.json --compare baseline.json
+'''
+
+import os
+import sys
+
+# 必须在导入 PyQt5 之前设置
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt5.QtWidgets import QApplication
+
+import viewGroup
+from viewGroup import GroupMemberGUI, MemberSnapshot, MemberStore, MEMBER_FIELDS
+from mock_napcat import MockConfig, MockData, MockNapCatServer
+
+
+DEFAULT_SIZES = [100, 1000, 3000, 10000]
+
+# 导出全部字段
+EXPORT_FIELDS = list(MEMBER_FIELDS)
+EXPORT_FIELD_NAMES = [spec.name for spec in MEMBER_FIELDS.values()]
+
+
+class BenchmarkGUI(GroupMemberGUI):
+    """用于性能测试的主窗口：使用固定设置和临时快照数据库，不读写用户设置"""
+    
+    def __init__(self, server_url, data_dir):
+        self.server_url = server_url
+        self.data_dir = data_dir
+        super().__init__()
+    
+    def load_settings(self):
+        self.settings = {
+            'url': self.server_url,
+            'token': '',
+            'theme': '蓝色主题',
+            'cache_time': 30,
+            'pool_size': 10,
+            'timeout': 30,
+            'max_concurrency': 8,
+            'max_retries': 0,
+            'sync_concurrency': 4,
+            'bulk_rate': 0,
+            'stale_while_revalidate': True,
+            'background_refresh': False
+        }
+    
+    def save_settings(self):
+        pass
+    
+    def snapshot_db_path(self):
+        return os.path.join(self.data_dir, "snapshots.db")
+
+
+class Benchmark:
+    """运行各项测试并收集结果"""
+    
+    def __init__(self, app, gui, repeat, data_dir):
+        self.app = app
+        self.gui = gui
+        self.repeat = repeat
+        self.data_dir = data_dir
+        self.results = []
+        self.generator = MockData(MockConfig(groups=0, seed=42))
+    
+    def members(self, count, group_id=1):
+        """生成指定数量的合成成员（1名群主、约3%管理员）"""
+        rng = self.generator.random
+        members = []
+        for i in range(count):
+            role = 'owner' if i == 0 else 'admin' if rng.random() < 0.03 else 'member'
+            members.append(self.generator.make_member(group_id, 1000000 + i * 7, role))
+        return members
+    
+    def groups(self, count):
+        """生成指定数量的合成群"""
+        rng = self.generator.random
+        topics = ["技术交流", "游戏开黑", "学习打卡", "摄影分享", "读书会"]
+        return [{
+            'group_id': 100000000 + i,
+            'group_name': f"{rng.choice(topics)}{i + 1}群",
+            'group_remark': '',
+            'member_count': rng.randint(10, 3000),
+            'max_member_count': 3000
+        } for i in range(count)]
+    
+    def measure(self, name, rows, func, setup=None):
+        """重复执行 func 并记录耗时；setup 的返回值作为 func 的参数，其耗时不计入"""
+        times = []
+        for _ in range(self.repeat):
+            arg = setup() if setup else None
+            start = time.perf_counter()
+            func(arg)
+            times.append((time.perf_counter() - start) * 1000)
+        result = {
+            'name': name,
+            'rows': rows,
+            'repeat': self.repeat,
+            'min_ms': round(min(times), 3),
+            'median_ms': round(statistics.median(times), 3),
+            'mean_ms': round(statistics.mean(times), 3)
+        }
+        self.results.append(result)
+        print(f"  {name:<32} {rows:>6} 行  中位数 {result['median_ms']:>10.3f} ms  最小 {result['min_ms']:>10.3f} ms")
+        return result
+    
+    def fresh_store(self, data):
+        """清空当前显示的数据并构建新的 MemberStore，避免命中相同数据跳过渲染和已缓存的排序"""
+        self.gui.member_data = MemberStore()
+        return MemberStore(data)
+    
+    def show_members(self, store):
+        """以新加载的快照显示成员数据"""
+        gui = self.gui
+        gui.update_ui_with_data(MemberSnapshot('benchmark', gui.begin_load(), store, time.time()))
+    
+    def run_member_benchmarks(self, size):
+        gui = self.gui
+        data = self.members(size)
+        
+        # 构建列式数据
+        self.measure("build_member_store", size, lambda _: MemberStore(data))
+        
+        # 应用快照：按默认方式（角色、加群时间）排序并交给表格模型
+        self.measure("update_ui_with_data", size, self.show_members, lambda: self.fresh_store(data))
+        
+        # 点击表头按各列降序排序（每次先恢复默认排序并使用新数据，排序结果未缓存）
+        model = gui.member_model
+        default_column = model.FIELDS.index('role')
+        
+        def setup():
+            store = self.fresh_store(data)
+            model.sort(default_column, viewGroup.Qt.AscendingOrder)
+            self.show_members(store)
+        
+        for column, field in enumerate(model.FIELDS):
+            def sort(_, column=column):
+                model.sort(column, viewGroup.Qt.DescendingOrder)
+            self.measure(f"sort_{field}", size, sort, setup)
+        model.sort(default_column, viewGroup.Qt.AscendingOrder)
+        
+        # 渲染：更新表格、调整列宽并绘制可见区域
+        def render(_):
+            gui.update_table()
+            gui.adjust_column_ratios()
+            gui.table.viewport().grab()
+        self.measure("update_table_render", size, render, setup)
+        
+        # 成员搜索
+        def search(_):
+            for query in ("1", "10", "100", "1000", "快乐"):
+                gui.member_search_input.setText(query)
+                gui.filter_members()
+            gui.member_search_input.clear()
+            gui.filter_members()
+        self.measure("member_search", size, search)
+        
+        # 导出（使用已显示的数据）
+        store = gui.member_data
+        csv_path = os.path.join(self.data_dir, "benchmark.csv")
+        json_path = os.path.join(self.data_dir, "benchmark.json")
+        self.measure("export_to_csv", size, lambda _: gui.export_to_csv(
+            csv_path, None, EXPORT_FIELDS, EXPORT_FIELD_NAMES, store))
+        self.measure("export_to_json", size, lambda _: gui.export_to_json(
+            json_path, None, EXPORT_FIELDS, EXPORT_FIELD_NAMES, store))
+        
+        # 按内容调整行高（表格已改为固定行高，保留该项作为对照）：在共享同一模型的临时视图中进行，
+        # 不改变主表格的行高，之后各项的测量不受影响
+        view = viewGroup.QTableView()
+        view.setModel(gui.member_model)
+        self.measure("resize_rows_to_contents", size, lambda _: view.resizeRowsToContents())
+        view.setModel(None)
+        view.deleteLater()
+    
+    def run_group_list_benchmarks(self, size):
+        gui = self.gui
+        groups = self.groups(size)
+        
+        self.measure("update_group_list", size, lambda data: gui.update_group_list(data),
+                     lambda: [dict(group) for group in groups])
+        
+        # 逐字输入搜索词再清空，模拟用户在搜索框中输入
+        def type_query(_):
+            for query in ("技", "技术", "技术交", "技术交流1", "技术交流", ""):
+                gui.search_input.setText(query)
+                gui.filter_group_list()
+        self.measure("filter_group_list", size, type_query)
+    
+    def run(self, sizes):
+        for size in sizes:
+            print(f"成员数 {size}:")
+            self.run_member_benchmarks(size)
+            self.run_group_list_benchmarks(size)
+            self.app.processEvents()
+        return self.results
+
+
+def git_revision():
+    """当前代码的 git 提交号，无法获取时返回空字符串"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(results, baseline_path):
+    """与基准结果比较并打印中位数的变化"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(item['name'], item['rows']): item for item in json.load(f).get('results', [])}
+    print(f"\n与基准 {baseline_path} 比较（中位数）:")
+    for item in results:
+        base = baseline.get((item['name'], item['rows']))
+        if not base or not base['median_ms']:
+            continue
+        change = (item['median_ms'] - base['median_ms']) / base['median_ms'] * 100
+        print(f"  {item['name']:<32} {item['rows']:>6} 行  {base['median_ms']:>10.3f} -> "
+              f"{item['median_ms']:>10.3f} ms  ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="群成员管理工具性能测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="成员数（及群数）")
+    parser.add_argument('--repeat', type=int, default=5, help="每项测试的重复次数")
+    parser.add_argument('--output', default='benchmark_results.json', help="结果文件路径")
+    parser.add_argument('--compare', default=None, help="与之比较的基准结果文件")
+    args = parser.parse_args(argv)
+    
+    app = QApplication(sys.argv[:1])
+    
+    # 中途出错也要关闭窗口、停止模拟服务并删除临时数据目录
+    with tempfile.TemporaryDirectory(prefix="group_benchmark_") as data_dir:
+        # 启动时获取群列表等请求发往本地模拟服务
+        server = MockNapCatServer(MockConfig(groups=1, min_members=10, max_members=10), port=0).start()
+        gui = None
+        try:
+            gui = BenchmarkGUI(server.url + '/', data_dir)
+            app.processEvents()
+            
+            benchmark = Benchmark(app, gui, max(1, args.repeat), data_dir)
+            results = benchmark.run(args.sizes)
+        finally:
+            if gui is not None:
+                gui.close()
+            server.shutdown()
+            server.server_close()
+    
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'pyqt': PYQT_VERSION_STR,
+        'platform': platform.platform(),
+        'repeat': benchmark.repeat,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已保存到 {args.output}")
+    
+    if args.compare:
+        compare(results, args.compare)
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
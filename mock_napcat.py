@@ -0,0 +1,516 @@
+'''
+本地模拟 NapCat HTTP 服务
+生成合成的群和群成员数据，用于离线测试和性能测试，无需连接真实的 NapCat 实例
+
+用法示例：
+    python mock_napcat.py --port 3000 --groups 50 --max-members 3000 --latency 50 --error-rate 0.02
+    python mock_napcat.py --event-url http://127.0.0.1:8090/ --event-interval 1
+'''
+
+import sys
+import hmac
+import json
+import time
+import queue
+import random
+import hashlib
+import argparse
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+# 合成数据使用的词表
+NAME_PARTS = ['小', '大', '老', '阿', '快乐', '星辰', '夜猫', '橘子', '咸鱼', '海盐', '晴天', '风铃',
+              '月亮', '可乐', '奶茶', '柠檬', '山竹', '白桃', '云朵', '布丁']
+AREAS = ['北京', '上海', '广州', '深圳', '杭州', '成都', '武汉', '南京', '西安', '重庆', '长沙', '']
+GROUP_TOPICS = ['技术交流', '游戏开黑', '学习打卡', '摄影分享', '读书会', '跑步健身', '动漫讨论',
+                '二手交易', '校友会', '同城活动']
+
+# 模拟的机器人QQ号（事件中的 self_id）
+SELF_ID = 10000
+
+# 合成数据的基准时间（秒），加群和发言时间都在此之前，与当前时间无关，相同的种子总是生成相同的数据
+EPOCH = 1700000000
+
+
+class MockConfig:
+    """模拟服务的配置"""
+    
+    def __init__(self, groups=20, min_members=10, max_members=3000, owner_count=1, admin_ratio=0.03,
+                 user_pool=None, latency=0, jitter=0, error_rate=0.0, rate_limit=0, churn=0.0,
+                 token='', seed=0, event_url='', event_secret='', event_interval=0):
+        """
+        Args:
+            groups: 群数量
+            min_members: 每个群的最少成员数
+            max_members: 每个群的最多成员数（不超过3000）
+            owner_count: 每个群的群主数（0或1）
+            admin_ratio: 管理员占成员的比例
+            user_pool: QQ号池大小，越小则跨群重复的成员越多，默认为成员总数的一半
+            latency: 每个请求的固定延迟（毫秒）
+            jitter: 在固定延迟上额外增加的随机延迟上限（毫秒）
+            error_rate: 返回 HTTP 500 的概率
+            rate_limit: 每秒允许的请求数，超出时返回 HTTP 429，0表示不限制
+            churn: 每次获取成员列表时发生变化（加入、退出、角色或群名片变更）的成员比例
+            token: 非空时校验请求头中的 Bearer Token
+            seed: 随机种子，相同的种子生成相同的数据
+            event_url: 非空时将成员变化以 OneBot 群通知事件 POST 到该地址（模拟 HTTP 上报）
+            event_secret: 上报签名(X-Signature)使用的密钥
+            event_interval: 大于0时每隔这么多秒随机改变一名成员并上报事件
+        """
+        self.groups = groups
+        self.min_members = min(min_members, max_members)
+        self.max_members = min(max_members, 3000)
+        self.owner_count = owner_count
+        self.admin_ratio = admin_ratio
+        self.user_pool = user_pool
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.churn = churn
+        self.token = token
+        self.seed = seed
+        self.event_url = event_url
+        self.event_secret = event_secret
+        self.event_interval = event_interval
+
+
+class MockData:
+    """合成的群和群成员数据，所有访问都需持有 lock"""
+    
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.random = random.Random(config.seed)
+        # 不同种子的基准时间错开若干天
+        self.epoch = EPOCH + (config.seed % 1000) * 86400
+        self.groups = {}  # 群号 -> 群信息
+        self.members = {}  # 群号 -> {QQ号: 成员详情}
+        self.next_user_id = 0
+        self.on_event = None  # 每次成员变化时以 OneBot 通知事件调用
+        self._generate()
+    
+    def _generate(self):
+        config = self.config
+        rng = self.random
+        sizes = [rng.randint(config.min_members, config.max_members) for _ in range(config.groups)]
+        pool_size = config.user_pool or max(10, sum(sizes) // 2)
+        pool = [1000000 + i * 7 for i in range(pool_size)]
+        self.next_user_id = 1000000 + pool_size * 7
+        
+        for index, size in enumerate(sizes):
+            group_id = 100000000 + index
+            user_ids = rng.sample(pool, min(size, len(pool)))
+            members = {}
+            for position, user_id in enumerate(user_ids):
+                if position < config.owner_count:
+                    role = 'owner'
+                elif rng.random() < config.admin_ratio:
+                    role = 'admin'
+                else:
+                    role = 'member'
+                members[user_id] = self.make_member(group_id, user_id, role)
+            self.members[group_id] = members
+            self.groups[group_id] = {
+                'group_id': group_id,
+                'group_name': f"{rng.choice(GROUP_TOPICS)}{index + 1}群",
+                'group_remark': '',
+                'group_all_shut': 0,
+                'member_count': len(members),
+                'max_member_count': 3000 if len(members) > 2000 else 2000 if len(members) > 500 else 500
+            }
+    
+    def make_member(self, group_id, user_id, role='member'):
+        """生成一名成员的完整详情（与 /get_group_member_info 的返回格式一致）"""
+        rng = self.random
+        now = self.epoch
+        join_time = now - rng.randint(0, 5 * 365 * 86400)
+        nickname = ''.join(rng.sample(NAME_PARTS, 2))
+        return {
+            'group_id': group_id,
+            'user_id': user_id,
+            'nickname': nickname,
+            'card': nickname + str(rng.randint(1, 99)) if rng.random() < 0.4 else '',
+            'sex': rng.choice(['male', 'female', 'unknown']),
+            'age': rng.randint(0, 45),
+            'area': rng.choice(AREAS),
+            'level': str(rng.randint(1, 100)),
+            'qq_level': rng.randint(1, 64),
+            'join_time': join_time,
+            'last_sent_time': rng.randint(join_time, now) if rng.random() < 0.8 else join_time,
+            'title_expire_time': 0,
+            'unfriendly': False,
+            'card_changeable': True,
+            'is_robot': False,
+            'shut_up_timestamp': 0,
+            'role': role,
+            'title': ''
+        }
+    
+    @staticmethod
+    def list_entry(member):
+        """成员列表中的一项：与真实接口一样，地区和QQ等级等详情字段为空"""
+        entry = dict(member)
+        entry['area'] = ''
+        entry['qq_level'] = 0
+        entry['age'] = 0
+        return entry
+    
+    def apply_churn(self, group_id):
+        """按配置的比例随机改变群成员，模拟两次获取之间的变化"""
+        count = int(len(self.members[group_id]) * self.config.churn)
+        for _ in range(count):
+            self.random_change(group_id)
+    
+    def random_change(self, group_id):
+        """随机改变一名成员（加入、退出、角色或群名片变更）"""
+        members = self.members[group_id]
+        rng = self.random
+        action = rng.random()
+        if action < 0.3 and len(members) < 3000:
+            user_id = self.next_user_id
+            self.next_user_id += 7
+            members[user_id] = self.make_member(group_id, user_id)
+            self.groups[group_id]['member_count'] = len(members)
+            self.emit('group_increase', group_id, user_id, sub_type='approve', operator_id=0)
+        elif action < 0.6 and len(members) > 1:
+            user_id = rng.choice(list(members))
+            if members[user_id]['role'] != 'owner':
+                del members[user_id]
+                self.groups[group_id]['member_count'] = len(members)
+                self.emit('group_decrease', group_id, user_id, sub_type='leave', operator_id=user_id)
+        elif action < 0.8:
+            member = members[rng.choice(list(members))]
+            if member['role'] != 'owner':
+                member['role'] = 'admin' if member['role'] == 'member' else 'member'
+                self.emit('group_admin', group_id, member['user_id'],
+                          sub_type='set' if member['role'] == 'admin' else 'unset')
+        else:
+            member = members[rng.choice(list(members))]
+            card_old = member['card']
+            member['card'] = member['nickname'] + str(rng.randint(100, 999))
+            self.emit('group_card', group_id, member['user_id'], card_new=member['card'], card_old=card_old)
+    
+    def emit(self, notice_type, group_id, user_id, **fields):
+        """以 OneBot 11 群通知事件的格式通知成员变化"""
+        if self.on_event is None:
+            return
+        event = {
+            'time': int(time.time()),
+            'self_id': SELF_ID,
+            'post_type': 'notice',
+            'notice_type': notice_type,
+            'group_id': group_id,
+            'user_id': user_id
+        }
+        event.update(fields)
+        self.on_event(event)
+
+
+class RateLimiter:
+    """按秒计数的简单限流器"""
+    
+    def __init__(self, rate):
+        self.rate = rate
+        self.window = 0
+        self.count = 0
+        self.lock = threading.Lock()
+    
+    def allow(self):
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            window = int(time.monotonic())
+            if window != self.window:
+                self.window = window
+                self.count = 0
+            self.count += 1
+            return self.count <= self.rate
+
+
+class EventPoster:
+    """在后台线程中依次将事件 POST 到上报地址（模拟 NapCat 的 HTTP 上报）"""
+    
+    def __init__(self, url, secret=''):
+        self.url = url
+        self.secret = secret.encode('utf-8')
+        self.queue = queue.Queue()
+        self.sent = 0
+        self.failed = 0
+        thread = threading.Thread(target=self._run, name="MockEventPoster")
+        thread.daemon = True
+        thread.start()
+    
+    def post(self, event):
+        self.queue.put(event)
+    
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            body = json.dumps(event, ensure_ascii=False).encode('utf-8')
+            request = urllib.request.Request(self.url, data=body, method='POST')
+            request.add_header('Content-Type', 'application/json')
+            request.add_header('X-Self-ID', str(SELF_ID))
+            if self.secret:
+                request.add_header('X-Signature', 'sha1=' + hmac.new(self.secret, body, hashlib.sha1).hexdigest())
+            try:
+                urllib.request.urlopen(request, timeout=5).close()
+                self.sent += 1
+            except OSError:
+                self.failed += 1
+
+
+class MockNapCatHandler(BaseHTTPRequestHandler):
+    """处理 NapCat HTTP 接口请求"""
+    
+    protocol_version = 'HTTP/1.1'  # 支持保持连接
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+    
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length) if length else b''
+        server.count_request(self.path)
+        
+        config = server.config
+        if config.token and self.headers.get('Authorization') != f'Bearer {config.token}':
+            self.send_json(401, {'status': 'failed', 'retcode': 1403, 'data': None,
+                                 'message': 'token验证失败', 'wording': 'token验证失败'})
+            return
+        
+        # 注入的延迟、限流和错误
+        delay = config.latency + (server.random.uniform(0, config.jitter) if config.jitter else 0)
+        if delay:
+            time.sleep(delay / 1000)
+        if not server.limiter.allow():
+            self.send_json(429, {'status': 'failed', 'retcode': 429, 'data': None,
+                                 'message': 'Too Many Requests', 'wording': '请求过于频繁'})
+            return
+        if config.error_rate and server.random.random() < config.error_rate:
+            self.send_json(500, {'status': 'failed', 'retcode': 500, 'data': None,
+                                 'message': 'Injected error', 'wording': '模拟的服务器错误'})
+            return
+        
+        try:
+            body = json.loads(raw or b'{}')
+        except json.JSONDecodeError:
+            self.send_json(400, {'status': 'failed', 'retcode': 1400, 'data': None,
+                                 'message': 'Invalid JSON', 'wording': '请求体不是有效的JSON'})
+            return
+        
+        # 服务器URL以 / 结尾时路径会出现 //，与 NapCat 一样忽略多余的斜杠
+        handler = server.routes.get('/' + self.path.split('?')[0].strip('/'))
+        if handler is None:
+            self.send_json(404, {'status': 'failed', 'retcode': 1404, 'data': None,
+                                 'message': f'Unknown action {self.path}', 'wording': '不支持的接口'})
+            return
+        self.send_json(200, handler(body))
+    
+    def send_json(self, code, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockNapCatServer(ThreadingHTTPServer):
+    """模拟 NapCat HTTP 服务，实现群成员管理工具使用的全部接口"""
+    
+    daemon_threads = True
+    
+    def __init__(self, config, host='127.0.0.1', port=3000, verbose=False):
+        """
+        Args:
+            config: MockConfig
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            verbose: 是否打印每个请求
+        """
+        super().__init__((host, port), MockNapCatHandler)
+        self.config = config
+        self.verbose = verbose
+        self.data = MockData(config)
+        self.random = random.Random(config.seed + 1)  # 用于注入延迟和错误，与数据生成分开
+        self.limiter = RateLimiter(config.rate_limit)
+        self.poster = EventPoster(config.event_url, config.event_secret) if config.event_url else None
+        if self.poster is not None:
+            self.data.on_event = self.poster.post
+        self.request_counts = {}  # 接口路径 -> 请求次数
+        self._count_lock = threading.Lock()
+        self.routes = {
+            '/get_group_list': self.get_group_list,
+            '/get_group_info': self.get_group_info,
+            '/get_group_member_list': self.get_group_member_list,
+            '/get_group_member_info': self.get_group_member_info,
+            '/set_group_ban': self.set_group_ban
+        }
+    
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def count_request(self, path):
+        with self._count_lock:
+            self.request_counts[path] = self.request_counts.get(path, 0) + 1
+    
+    def start(self):
+        """在后台线程中运行服务，返回自身"""
+        thread = threading.Thread(target=self.serve_forever, name="MockNapCat")
+        thread.daemon = True
+        thread.start()
+        self.start_events()
+        return self
+    
+    def start_events(self):
+        """配置了事件间隔时，在后台线程中定时随机改变成员并上报事件"""
+        if self.poster is None or self.config.event_interval <= 0:
+            return
+        
+        def run():
+            while True:
+                time.sleep(self.config.event_interval)
+                with self.data.lock:
+                    if self.data.members:
+                        self.data.random_change(self.data.random.choice(list(self.data.members)))
+        
+        thread = threading.Thread(target=run, name="MockEvents")
+        thread.daemon = True
+        thread.start()
+    
+    @staticmethod
+    def ok(data):
+        return {'status': 'ok', 'retcode': 0, 'data': data, 'message': '', 'wording': '', 'echo': None}
+    
+    @staticmethod
+    def failed(message, retcode=200):
+        return {'status': 'failed', 'retcode': retcode, 'data': None, 'message': message,
+                'wording': message, 'echo': None}
+    
+    @staticmethod
+    def parse_id(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    
+    def get_group_list(self, body):
+        with self.data.lock:
+            return self.ok([dict(group) for group in self.data.groups.values()])
+    
+    def get_group_info(self, body):
+        group_id = self.parse_id(body.get('group_id'))
+        with self.data.lock:
+            group = self.data.groups.get(group_id)
+            if group is None:
+                return self.failed('群不存在')
+            return self.ok(dict(group))
+    
+    def get_group_member_list(self, body):
+        group_id = self.parse_id(body.get('group_id'))
+        data = self.data
+        with data.lock:
+            if group_id not in data.members:
+                return self.failed('群不存在')
+            if self.config.churn:
+                data.apply_churn(group_id)
+            return self.ok([data.list_entry(member) for member in data.members[group_id].values()])
+    
+    def get_group_member_info(self, body):
+        group_id = self.parse_id(body.get('group_id'))
+        user_id = self.parse_id(body.get('user_id'))
+        with self.data.lock:
+            member = self.data.members.get(group_id, {}).get(user_id)
+            if member is None:
+                return self.failed('群成员不存在')
+            return self.ok(dict(member))
+    
+    def set_group_ban(self, body):
+        group_id = self.parse_id(body.get('group_id'))
+        user_id = self.parse_id(body.get('user_id'))
+        duration = self.parse_id(body.get('duration'))
+        if duration is None or duration < 0 or duration > 30 * 86400:
+            return self.failed('禁言时长无效')
+        with self.data.lock:
+            member = self.data.members.get(group_id, {}).get(user_id)
+            if member is None:
+                return self.failed('群成员不存在')
+            if member['role'] != 'member':
+                return self.failed('ERR_NOT_GROUP_ADMIN')
+            member['shut_up_timestamp'] = int(time.time()) + duration if duration else 0
+            self.data.emit('group_ban', group_id, user_id, sub_type='ban' if duration else 'lift_ban',
+                           operator_id=SELF_ID, duration=duration)
+            return self.ok(None)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="本地模拟 NapCat HTTP 服务（合成数据）")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址")
+    parser.add_argument('--port', type=int, default=3000, help="监听端口")
+    parser.add_argument('--groups', type=int, default=20, help="群数量")
+    parser.add_argument('--min-members', type=int, default=10, help="每个群的最少成员数")
+    parser.add_argument('--max-members', type=int, default=3000, help="每个群的最多成员数（最大3000）")
+    parser.add_argument('--owner-count', type=int, choices=[0, 1], default=1, help="每个群的群主数")
+    parser.add_argument('--admin-ratio', type=float, default=0.03, help="管理员占成员的比例")
+    parser.add_argument('--user-pool', type=int, default=None, help="QQ号池大小，越小跨群重复的成员越多")
+    parser.add_argument('--latency', type=float, default=0, help="每个请求的固定延迟（毫秒）")
+    parser.add_argument('--jitter', type=float, default=0, help="额外的随机延迟上限（毫秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="返回 HTTP 500 的概率")
+    parser.add_argument('--rate-limit', type=int, default=0, help="每秒允许的请求数，超出返回 HTTP 429，0表示不限制")
+    parser.add_argument('--churn', type=float, default=0.0, help="每次获取成员列表时变化的成员比例")
+    parser.add_argument('--token', default='', help="非空时校验 Bearer Token")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--event-url', default='', help="将成员变化以群通知事件 POST 到该地址")
+    parser.add_argument('--event-secret', default='', help="事件上报签名的密钥")
+    parser.add_argument('--event-interval', type=float, default=0, help="每隔这么多秒随机改变一名成员并上报事件")
+    parser.add_argument('--verbose', action='store_true', help="打印每个请求")
+    return parser
+
+
+def config_from_args(args):
+    return MockConfig(
+        groups=args.groups,
+        min_members=args.min_members,
+        max_members=args.max_members,
+        owner_count=args.owner_count,
+        admin_ratio=args.admin_ratio,
+        user_pool=args.user_pool,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        churn=args.churn,
+        token=args.token,
+        seed=args.seed,
+        event_url=args.event_url,
+        event_secret=args.event_secret,
+        event_interval=args.event_interval
+    )
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    server = MockNapCatServer(config_from_args(args), args.host, args.port, args.verbose)
+    total = sum(len(members) for members in server.data.members.values())
+    print(f"模拟 NapCat 服务已启动: {server.url}/ （{len(server.data.groups)} 个群，共 {total} 名成员）")
+    if args.event_url:
+        print(f"成员变化将以群通知事件上报到 {args.event_url}")
+    server.start_events()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,35 +5,1403 @@
 
 import sys
 import os
+import io
 import csv
+import gzip
+import hmac
+import hashlib
+import ipaddress
+import tracemalloc
+import zipfile
+import multiprocessing
 from datetime import datetime
 import json
+import sqlite3
+from array import array
 import requests
+from requests.adapters import HTTPAdapter
 import threading
 import time
+import random
+import asyncio
+from collections import namedtuple, deque
+from contextlib import contextmanager, asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
-                             QTableWidget, QTableWidgetItem, QHeaderView, 
+                             QTableView, QHeaderView, 
                              QGroupBox, QMessageBox, QFrame, QFileDialog,
                              QComboBox, QStyleFactory, QDialog, QGridLayout,
                              QScrollArea, QSizePolicy, QRadioButton,
-                             QListWidget, QListWidgetItem, QToolBar,
+                             QListView, QToolBar,
                              QAction, QMenu, QMenuBar, QStatusBar, QSplitter,
-                             QTabWidget, QCheckBox)
-from PyQt5.QtCore import Qt, pyqtSignal, QObject, QSettings, QSize
-from PyQt5.QtGui import QColor, QPalette, QFont, QIcon, QPixmap, QCursor
+                             QTabWidget, QCheckBox, QProgressDialog, QProgressBar)
+from PyQt5.QtCore import (Qt, pyqtSignal, QObject, QSettings, QSize, QStandardPaths, QTimer,
+                          QAbstractTableModel, QAbstractListModel, QSortFilterProxyModel, QModelIndex)
+from PyQt5.QtGui import (QColor, QPalette, QFont, QIcon, QPixmap, QCursor, QBrush,
+                         QStandardItemModel, QStandardItem)
+
+
+# 工作线程发布给界面的成员列表快照（members 为构建好的 MemberStore，之后不再修改），
+# generation 用于丢弃过期的加载结果
+MemberSnapshot = namedtuple('MemberSnapshot', ['group_id', 'generation', 'members', 'fetched_at'])
+
+# 两次获取之间的成员变化记录：kind 为 CHANGE_* 之一，old/new 为变化前后的值
+# （加入/退出时为成员名称，角色变更时为角色键，名片变更时为群名片）
+MemberChange = namedtuple('MemberChange', ['kind', 'user_id', 'old', 'new'])
+CHANGE_JOIN, CHANGE_LEAVE, CHANGE_ROLE, CHANGE_CARD = 0, 1, 2, 3
+CHANGE_NAMES = ('加入', '退出', '角色变更', '名片变更')
+
+# 导出时每写出这么多行报告一次进度并检查是否已取消
+EXPORT_CHUNK_ROWS = 500
+
+# 事件上报中用于增量更新成员数据的群通知类型
+EVENT_NOTICE_TYPES = ('group_increase', 'group_decrease', 'group_admin', 'group_ban', 'group_card')
+# 收到事件后延迟这么多秒再保存该群的成员列表快照，合并短时间内的多个事件
+EVENT_SAVE_DELAY = 2
+# 在内存中保留上一次成员数据（用于检测成员变化）的群数，其他群比较时从本地快照读取
+PREVIOUS_MEMBERS_LIMIT = 10
+
+# 请求优先级（数值越小越先取得并发名额）：交互操作、普通加载、后台任务
+PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BACKGROUND = 0, 1, 2
+PRIORITY_NAMES = ('交互', '普通', '后台')
+
+# 计时区间：category 为 TRACE_CATEGORIES 之一，start/duration 为秒（start 相对于 Tracer 创建时刻），
+# args 为附加信息（如行数）
+TraceSpan = namedtuple('TraceSpan', ['category', 'name', 'start', 'duration', 'thread_id', 'args'])
+# 内存分析记录：一次加载或导出前后的内存变化。retained 为结束时比开始时多占用的字节数，
+# peak 为期间峰值比开始时多出的字节数（与其他加载或导出重叠时为None）
+MemoryRecord = namedtuple('MemoryRecord', ['recorded_at', 'kind', 'label', 'duration', 'retained', 'peak'])
+# 计时区间的类别及其在状态栏中的名称
+TRACE_CATEGORIES = {
+    'network': '网络',
+    'json': 'JSON',
+    'store': '数据',
+    'sort': '排序',
+    'render': '渲染',
+    'export': '导出'
+}
+
+
+class StaleRequestError(Exception):
+    """请求结果已过期（已有更新的加载请求），无需再解析"""
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """接口处于熔断状态，请求未发送"""
+
+
+class ExportCancelled(Exception):
+    """导出已被用户取消"""
+
+
+class Tracer:
+    """热点路径计时
+
+    记录各接口请求、JSON解析、构建数据、排序、渲染和导出等阶段的耗时区间，只保留最近的
+    capacity 个，可导出为 Chrome 跟踪格式（chrome://tracing 或 Perfetto 可直接打开）。
+    可在任意线程中使用。
+    """
+    
+    def __init__(self, capacity=20000):
+        """
+        Args:
+            capacity: 保留的计时区间数
+        """
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._spans = deque(maxlen=capacity)
+        self._latest = {}  # 类别 -> 该类别最近一个 TraceSpan
+        self._thread_names = {}  # 线程ID -> 线程名称
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def span(self, category, name, **args):
+        """记录 with 语句块的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, start, time.perf_counter() - start, args)
+    
+    def wrap(self, category, name, func):
+        """返回记录每次调用耗时的 func（用于交给线程池执行的函数）"""
+        def traced(*args):
+            with self.span(category, name):
+                return func(*args)
+        return traced
+    
+    def record(self, category, name, start, duration, args=None):
+        """记录一个计时区间
+
+        Args:
+            category: 类别，TRACE_CATEGORIES 之一
+            name: 区间名称（如接口路径、排序字段）
+            start: 开始时间（time.perf_counter()）
+            duration: 耗时（秒）
+            args: 附加信息
+        """
+        thread = threading.current_thread()
+        span = TraceSpan(category, name, start - self._origin, duration, thread.ident, args or {})
+        with self._lock:
+            self._spans.append(span)
+            self._latest[category] = span
+            self._thread_names[thread.ident] = thread.name
+    
+    def spans(self):
+        """按记录顺序返回保留的所有计时区间"""
+        with self._lock:
+            return list(self._spans)
+    
+    def latest(self):
+        """返回各类别最近一个计时区间 {类别: TraceSpan}"""
+        with self._lock:
+            return dict(self._latest)
+    
+    def summary(self):
+        """按 (类别, 名称) 汇总，返回 [(类别, 名称, 次数, 总耗时, 最长耗时)]，按总耗时从高到低排序"""
+        totals = {}
+        for span in self.spans():
+            item = totals.setdefault((span.category, span.name), [0, 0.0, 0.0])
+            item[0] += 1
+            item[1] += span.duration
+            item[2] = max(item[2], span.duration)
+        return sorted(((category, name, count, total, longest)
+                       for (category, name), (count, total, longest) in totals.items()),
+                      key=lambda item: item[3], reverse=True)
+    
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._latest.clear()
+    
+    def chrome_trace(self):
+        """返回 Chrome 跟踪格式（Trace Event Format）的字典，时间单位为微秒"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            thread_names = dict(self._thread_names)
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': "QQ群成员管理"}}]
+        events.extend({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread_id, 'args': {'name': name}}
+                      for thread_id, name in thread_names.items())
+        events.extend({
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': round(span.start * 1e6, 3),
+            'dur': round(span.duration * 1e6, 3),
+            'pid': pid,
+            'tid': span.thread_id,
+            'args': span.args
+        } for span in spans)
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds')}
+        }
+    
+    def save(self, file_path):
+        """将计时区间保存为 Chrome 跟踪格式的JSON文件"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+# 全局计时器，各热点路径都记录到这里
+TRACER = Tracer()
+
+
+def object_size(obj, seen):
+    """估算对象及其包含的列表、字典、字符串等占用的字节数
+
+    Args:
+        obj: 对象
+        seen: 已计入对象的 id 集合，同一对象只计一次（如驻留的字符串）
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += object_size(key, seen) + object_size(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += object_size(item, seen)
+    return size
+
+
+class MemoryProfiler:
+    """基于 tracemalloc 的内存分析
+
+    开始跟踪后，每次加载群成员或导出时在前后读取已跟踪的内存总量，记录该过程结束后仍占用的
+    内存和期间的峰值；读取总量的开销很小，不会阻塞请求引擎。完整快照代价较高（需遍历所有分配），
+    只在查看分配位置时按需获取。tracemalloc 是进程全局的，与其他加载重叠的记录会互相计入
+    （此时不记录峰值）；跟踪期间所有内存分配都会变慢，只用于排查问题。可在任意线程中使用。
+    """
+    
+    def __init__(self, capacity=200):
+        """
+        Args:
+            capacity: 保留的记录数
+        """
+        self._records = deque(maxlen=capacity)
+        self._active = []  # 进行中的测量，每项为 [是否与其他测量重叠]
+        self._lock = threading.Lock()
+    
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+    
+    def start(self, frames=1):
+        """开始跟踪内存分配"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+    
+    def stop(self):
+        """停止跟踪并释放跟踪数据"""
+        tracemalloc.stop()
+    
+    def traced_memory(self):
+        """返回 (当前占用, 峰值) 字节数，未跟踪时为 (0, 0)"""
+        return tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    
+    @staticmethod
+    def snapshot():
+        """取得当前的内存快照，排除 tracemalloc 自身和导入机制的分配"""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>")
+        ))
+    
+    def top_allocations(self, limit=20):
+        """当前占用内存最多的代码位置，返回 [(代码位置, 字节数, 分配次数)]（会阻塞调用线程，按需调用）"""
+        if not tracemalloc.is_tracing():
+            return []
+        return [(str(stat.traceback[0]), stat.size, stat.count)
+                for stat in self.snapshot().statistics('lineno')[:limit]]
+    
+    @contextmanager
+    def measure(self, kind, label):
+        """记录 with 语句块前后的内存变化（未跟踪时不做任何事）
+
+        Args:
+            kind: 类型，如“打开群”“导出”
+            label: 对象，如群号或文件名
+        """
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        state = [False]
+        with self._lock:
+            for other in self._active:
+                other[0] = True
+            state[0] = bool(self._active)
+            self._active.append(state)
+            if not state[0]:
+                tracemalloc.reset_peak()
+            start_size = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active.remove(state)
+            if tracemalloc.is_tracing():
+                size, peak = tracemalloc.get_traced_memory()
+                duration = time.perf_counter() - started
+                record = MemoryRecord(time.time(), kind, label, duration, size - start_size,
+                                      None if state[0] else peak - start_size)
+                with self._lock:
+                    self._records.append(record)
+    
+    def records(self):
+        """按时间顺序返回保留的记录"""
+        with self._lock:
+            return list(self._records)
+    
+    def clear(self):
+        with self._lock:
+            self._records.clear()
 
 
 class SignalBridge(QObject):
     """用于线程间通信的信号桥"""
-    update_data_signal = pyqtSignal(list)
+    update_data_signal = pyqtSignal(object)  # 成员列表快照(MemberSnapshot)
+    cached_data_signal = pyqtSignal(object)  # 本地快照中的成员列表(MemberSnapshot)，网络数据到达前先显示
     error_signal = pyqtSignal(str, str)
     status_signal = pyqtSignal(str)
     enable_button_signal = pyqtSignal(bool)
     update_user_detail_signal = pyqtSignal(dict)  # 更新用户详情信号
-    update_group_info_signal = pyqtSignal(dict)  # 更新群详情信号
+    update_group_info_signal = pyqtSignal(dict, int)  # 更新群详情信号，参数为群信息和加载代次
     ban_result_signal = pyqtSignal(bool, str)  # 禁言结果信号，参数为是否成功和消息
     update_group_list_signal = pyqtSignal(list)  # 新增：更新群列表信号
+    cached_group_list_signal = pyqtSignal(list, float)  # 本地快照中的群列表，参数为群列表和获取时间
+    load_finished_signal = pyqtSignal(int)  # 成员列表加载结束信号，参数为加载代次
+    enrich_progress_signal = pyqtSignal(int, int)  # 成员详情补全进度，参数为已完成数和总数
+    enrich_finished_signal = pyqtSignal(str, object, int, int, bool)  # 补全结束，参数为群号、补全后的MemberStore、成功数、失败数和是否取消
+    sync_group_signal = pyqtSignal(str, object, float)  # 同步到一个群的成员，参数为群号、MemberStore和获取时间
+    sync_progress_signal = pyqtSignal(int, int)  # 同步所有群进度，参数为已完成群数和总数
+    sync_finished_signal = pyqtSignal(int, int, bool)  # 同步结束，参数为成功群数、失败群数和是否取消
+    member_changes_signal = pyqtSignal(str, list)  # 检测到成员变化，参数为群号和 MemberChange 列表
+    bulk_ban_progress_signal = pyqtSignal(int, int)  # 批量禁言进度，参数为已完成数和总数
+    bulk_ban_finished_signal = pyqtSignal(int, list)  # 批量禁言结束，参数为禁言时长和每个成员的结果
+    export_progress_signal = pyqtSignal(int, int)  # 导出进度，参数为已写出行数和总行数
+    export_finished_signal = pyqtSignal(str, int, str, bool)  # 导出结束，参数为文件路径、行数、错误信息和是否取消
+    archive_finished_signal = pyqtSignal(str, int, int, str, bool)  # 导出所有群结束，参数为文件路径、成功群数、失败群数、错误信息和是否取消
+    group_event_signal = pyqtSignal(str, object, float)  # 事件更新了一个群的成员，参数为群号、MemberStore和数据时间
+    refresh_done_signal = pyqtSignal(str, bool)  # 后台刷新一个群结束，参数为群号和是否成功
+
+
+class NapCatClient:
+    """NapCat HTTP接口客户端
+
+    每个接口路径持有一个带连接池的 requests.Session，复用保持连接(keep-alive)，
+    避免每次点击都重新建立TCP/TLS连接。所有网络请求都应通过该客户端发送。
+    """
+    
+    def __init__(self, base_url, token, pool_size=10, timeout=30):
+        """
+        Args:
+            base_url: 服务器URL
+            token: 访问令牌
+            pool_size: 每个接口的连接池大小
+            timeout: 请求超时时间（秒）
+        """
+        self.base_url = base_url
+        self.token = token
+        self.pool_size = max(1, int(pool_size))
+        self.timeout = timeout
+        self.headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {token}'
+        }
+        self._sessions = {}  # 接口路径 -> Session
+        self._lock = threading.Lock()
+    
+    def _get_session(self, api):
+        """获取（或创建）指定接口的会话"""
+        with self._lock:
+            session = self._sessions.get(api)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(self.headers)
+                self._sessions[api] = session
+            return session
+    
+    def send(self, api, body=None, timeout=None):
+        """向指定接口发送POST请求，返回未解析的响应
+        
+        Args:
+            api: 接口路径，如 '/get_group_list'
+            body: 请求体
+            timeout: 本次请求的超时时间（秒），默认使用客户端的超时时间
+        """
+        session = self._get_session(api)
+        response = session.post(self.base_url + api, json=body if body is not None else {},
+                                timeout=timeout or self.timeout)
+        response.raise_for_status()
+        return response
+    
+    def post(self, api, body=None):
+        """向指定接口发送POST请求并返回解析后的JSON"""
+        return self.send(api, body).json()
+    
+    def close(self):
+        """关闭所有会话，释放连接"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class EventRequestHandler(BaseHTTPRequestHandler):
+    """处理 NapCat 以 HTTP POST 上报的事件"""
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.reply_empty(400)
+            return
+        body = self.rfile.read(length) if length else b''
+        if not self.server.verify(body, self.headers.get('X-Signature', '')):
+            self.reply_empty(403)
+            return
+        
+        # 先响应再处理，不让 NapCat 等待
+        self.send_response(204)
+        self.end_headers()
+        try:
+            event = json.loads(body or b'{}')
+        except ValueError:
+            return
+        if isinstance(event, dict):
+            self.server.callback(event)
+    
+    def reply_empty(self, code):
+        """返回没有内容的错误响应"""
+        self.send_response(code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class EventListener(ThreadingHTTPServer):
+    """NapCat 事件上报（HTTP POST）接收服务，在后台线程中运行
+
+    每个事件以字典调用 callback(event)，在接收线程中调用。设置了密钥时校验
+    X-Signature 请求头（HMAC-SHA1），不匹配的请求返回 403。监听非本机地址时必须设置
+    密钥，否则局域网内任何人都能伪造群通知。
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, host, port, callback, secret=''):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            callback: 收到事件时调用的函数
+            secret: NapCat 中配置的上报密钥，为空时不校验签名（只允许监听本机地址）
+        
+        Raises:
+            ValueError: 监听非本机地址但没有设置密钥
+        """
+        if not secret and not self.is_loopback(host):
+            raise ValueError(f"监听非本机地址 {host} 时必须设置上报密钥")
+        super().__init__((host, port), EventRequestHandler)
+        self.callback = callback
+        self.secret = secret.encode('utf-8')
+        self.started_at = time.time()
+    
+    @staticmethod
+    def is_loopback(host):
+        """监听地址是否只接受本机连接"""
+        if host == 'localhost':
+            return True
+        try:
+            return ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            return False
+    
+    def verify(self, body, signature):
+        """校验请求体的签名"""
+        if not self.secret:
+            return True
+        expected = 'sha1=' + hmac.new(self.secret, body, hashlib.sha1).hexdigest()
+        return hmac.compare_digest(expected, signature)
+    
+    def start(self):
+        """在后台线程中运行服务，返回自身"""
+        thread = threading.Thread(target=self.serve_forever, name="EventListener")
+        thread.daemon = True
+        thread.start()
+        return self
+    
+    def stop(self):
+        """停止服务并释放端口"""
+        self.shutdown()
+        self.server_close()
+
+
+class CircuitBreaker:
+    """单个接口的熔断器
+
+    连续失败达到阈值后打开，冷却期内的请求直接失败而不再等待超时；冷却期过后放行一个
+    试探请求，成功则恢复，失败则重新打开。只在请求引擎的事件循环线程中访问。
+    """
+    
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Args:
+            failure_threshold: 打开熔断所需的连续失败次数
+            reset_timeout: 熔断后的冷却时间（秒）
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0  # 连续失败次数
+        self.opened_at = 0
+    
+    def allow(self):
+        """是否允许发送请求"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            # 冷却结束，由本次请求进行试探
+            self.state = self.HALF_OPEN
+            return True
+        # 试探请求进行中时，其余请求直接失败
+        return self.state == self.CLOSED
+    
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+    
+    def record_failure(self):
+        """记录一次失败，返回本次是否触发了熔断"""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            return True
+        return False
+    
+    def record_cancel(self):
+        """请求被取消：试探请求未得出结果时，允许下一个请求立即重新试探"""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+
+class RequestPolicy:
+    """NapCat 请求策略
+
+    统一规定各接口的超时时间、只读接口失败后的指数退避重试，以及每个接口的熔断器，
+    并统计发送、重试、熔断和快速失败的次数。只在请求引擎的事件循环线程中修改。
+    """
+    
+    # 只读（幂等）接口，失败后可以安全重试
+    IDEMPOTENT_APIS = frozenset({
+        '/get_group_list',
+        '/get_group_info',
+        '/get_group_member_list',
+        '/get_group_member_info'
+    })
+    # 响应较小的接口使用较短的超时，大群的成员列表使用设置中的超时
+    SHORT_TIMEOUT = 10
+    LONG_TIMEOUT_APIS = frozenset({'/get_group_member_list'})
+    
+    def __init__(self, timeout=30, max_retries=3, backoff_base=0.5, backoff_max=8,
+                 failure_threshold=5, reset_timeout=30):
+        """
+        Args:
+            timeout: 成员列表等耗时接口的超时时间（秒）
+            max_retries: 只读接口的最大重试次数
+            backoff_base: 第一次重试前的等待时间（秒），之后每次翻倍
+            backoff_max: 单次等待时间上限（秒）
+            failure_threshold: 打开熔断所需的连续失败次数
+            reset_timeout: 熔断后的冷却时间（秒）
+        """
+        self.timeout = timeout
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}  # 接口路径 -> CircuitBreaker
+        self.sent = {}  # 接口路径 -> 实际发送的请求数（含重试）
+        self.sent_total = 0  # 所有接口的发送总数，供界面线程读取请求预算
+        self.retries = {}  # 接口路径 -> 重试次数
+        self.trips = {}  # 接口路径 -> 熔断次数
+        self.fast_fails = {}  # 接口路径 -> 熔断期间直接失败的请求数
+    
+    def configure(self, timeout, max_retries):
+        """修改超时时间和最大重试次数（在事件循环线程中调用）"""
+        self.timeout = timeout
+        self.max_retries = max(0, int(max_retries))
+    
+    def timeout_for(self, api):
+        """返回接口的超时时间（秒）"""
+        if api in self.LONG_TIMEOUT_APIS:
+            return self.timeout
+        return min(self.timeout, self.SHORT_TIMEOUT)
+    
+    def breaker(self, api):
+        """返回（或创建）接口的熔断器"""
+        breaker = self._breakers.get(api)
+        if breaker is None:
+            breaker = self._breakers[api] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+    
+    @staticmethod
+    def is_failure(error):
+        """错误是否说明接口不可用（超时、连接失败或服务器错误）"""
+        if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            return True
+        response = getattr(error, 'response', None)
+        return response is not None and response.status_code >= 500
+    
+    def should_retry(self, api, attempt, error):
+        """判断第 attempt 次（从0开始）请求失败后是否重试"""
+        if api not in self.IDEMPOTENT_APIS or attempt >= self.max_retries:
+            return False
+        if isinstance(error, CircuitOpenError):
+            return False
+        response = getattr(error, 'response', None)
+        return self.is_failure(error) or (response is not None and response.status_code == 429)
+    
+    def backoff(self, attempt):
+        """第 attempt 次重试前的等待时间，加入随机抖动避免同时重试"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+    
+    def count(self, counter, api):
+        counter[api] = counter.get(api, 0) + 1
+    
+    def count_sent(self, api):
+        """记录一次实际发出的请求"""
+        self.count(self.sent, api)
+        self.sent_total += 1
+    
+    def stats(self):
+        """返回各接口的统计信息，每项为 (接口, 熔断状态, 发送次数, 重试次数, 熔断次数, 快速失败次数)
+        
+        统计随请求不断修改，需在事件循环线程中调用（界面线程通过 RequestEngine.call）；
+        只读取已有的熔断器，不会为没有熔断记录的接口创建熔断器。
+        """
+        apis = sorted(set(self._breakers) | set(self.sent) | set(self.retries))
+        return [(api, self._breakers[api].state if api in self._breakers else CircuitBreaker.CLOSED,
+                 self.sent.get(api, 0), self.retries.get(api, 0),
+                 self.trips.get(api, 0), self.fast_fails.get(api, 0)) for api in apis]
+
+
+class PrioritySemaphore:
+    """按优先级放行的信号量
+
+    与 asyncio.Semaphore 一样限制同时持有的名额数，但名额释放时交给优先级最高（数值最小）的
+    等待者，同一优先级先到先得。等待者的 priority 属性在等待期间可以提高（如交互请求合并到了
+    仍在排队的后台请求上）。只在事件循环线程中使用；active 和 waiting 可在其他线程中读取用于显示。
+    """
+    
+    def __init__(self, value):
+        """
+        Args:
+            value: 名额数
+        """
+        self._value = value
+        self._size = value
+        self._waiters = []  # (序号, 等待者, future)
+        self._sequence = 0
+        self.active = 0  # 持有名额的数量
+        self.waiting = (0,) * len(PRIORITY_NAMES)  # 各优先级排队等待的数量
+    
+    @asynccontextmanager
+    async def hold(self, owner):
+        """在 async with 语句块中持有一个名额，owner.priority 为优先级"""
+        await self.acquire(owner)
+        try:
+            yield
+        finally:
+            self.release()
+    
+    async def acquire(self, owner):
+        """等待并取得一个名额"""
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        waiter = (self._sequence, owner, future)
+        self._sequence += 1
+        self._waiters.append(waiter)
+        self.update_waiting()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self.update_waiting()
+            elif future.done() and not future.cancelled():
+                # 已分到名额但随即被取消，交给下一个等待者
+                self.release()
+            raise
+    
+    def release(self):
+        """释放一个名额，优先交给优先级最高、等待最久的等待者"""
+        while self._waiters:
+            waiter = min(self._waiters, key=lambda item: (item[1].priority, item[0]))
+            self._waiters.remove(waiter)
+            if not waiter[2].done():
+                waiter[2].set_result(None)
+                self.update_waiting()
+                return
+        self.update_waiting()
+        self.active -= 1
+        self._value += 1
+    
+    def resize(self, value):
+        """修改名额数：增加的名额立即交给等待者；减少时已持有的名额不受影响，释放后才生效"""
+        self._value += value - self._size
+        self._size = value
+        while self._value > 0 and self._waiters:
+            self._value -= 1
+            self.active += 1
+            self.release()
+    
+    def update_waiting(self):
+        """重新统计各优先级的等待数量（等待者的优先级改变后调用）"""
+        counts = [0] * len(PRIORITY_NAMES)
+        for _, owner, _ in self._waiters:
+            counts[owner.priority] += 1
+        self.waiting = tuple(counts)
+
+
+class InflightRequest:
+    """进行中的共享请求，记录等待该请求结果的调用方"""
+    
+    def __init__(self, priority=PRIORITY_NORMAL):
+        self.priority = priority  # 所有调用方中最高的优先级
+        self.task = None
+        self.waiters = 0
+        self.stale_checks = []  # 每个调用方的过期检查回调，None表示始终需要结果
+    
+    def all_stale(self):
+        """是否所有调用方都已不再需要结果"""
+        return bool(self.stale_checks) and all(
+            check is not None and check() for check in self.stale_checks)
+
+
+class RequestEngine:
+    """后台异步请求引擎
+
+    在单个工作线程中运行 asyncio 事件循环，所有 NapCat 请求都作为协程在其中执行，
+    并通过按优先级放行的信号量限制同时进行的请求数量。超出上限的请求只是挂起的协程，不占用线程，
+    名额空出时交互操作（如查看成员详情、禁言）先于普通加载，普通加载先于同步、补全等后台任务；
+    阻塞的HTTP调用交给大小与并发上限一致的线程池执行。
+    
+    相同接口、相同请求体的请求在进行中时会被合并，所有调用方共享同一次响应。
+    每次发送都遵循 RequestPolicy 的超时、重试和熔断规则。
+    """
+    
+    def __init__(self, client, max_concurrency=8, policy=None):
+        """
+        Args:
+            client: NapCatClient 实例
+            max_concurrency: 最大并发请求数
+            policy: RequestPolicy 实例，默认使用默认策略
+        """
+        self.client = client
+        self.policy = policy or RequestPolicy(client.timeout)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self._semaphore = None
+        self._inflight = {}  # (接口, 请求体) -> InflightRequest，只在事件循环线程中访问
+        self.coalesced_count = 0  # 被合并的重复请求数
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="RequestEngine")
+        self._thread.daemon = True
+        self._thread.start()
+        self._ready.wait()
+    
+    def _run_loop(self):
+        """事件循环线程入口"""
+        asyncio.set_event_loop(self.loop)
+        # 信号量需在事件循环所在线程中创建
+        self._semaphore = PrioritySemaphore(self.max_concurrency)
+        self._ready.set()
+        self.loop.run_forever()
+    
+    def submit(self, coro):
+        """从任意线程提交协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def call(self, func, *args, timeout=5):
+        """在事件循环线程中执行普通函数并返回结果（从其他线程调用，阻塞等待）
+        
+        用于读取只在事件循环线程中修改的状态（如请求统计），得到一致的快照。
+        """
+        async def run():
+            return func(*args)
+        return self.submit(run()).result(timeout=timeout)
+    
+    async def request(self, api, body=None, is_stale=None, priority=PRIORITY_NORMAL):
+        """在并发限制下发送请求，返回解析后的JSON
+        
+        若相同的只读请求正在进行中，则直接等待其结果而不重复发送。返回的结果可能由多个
+        调用方共享，调用方不应修改它。写操作（不在 RequestPolicy.IDEMPOTENT_APIS 中的接口，
+        如禁言）每次都会实际发送。
+        
+        Args:
+            api: 接口路径
+            body: 请求体
+            is_stale: 可选的回调，响应到达后若返回True则不再解析，抛出 StaleRequestError
+            priority: 优先级，PRIORITY_INTERACTIVE、PRIORITY_NORMAL 或 PRIORITY_BACKGROUND
+        """
+        if api in self.policy.IDEMPOTENT_APIS:
+            key = (api, json.dumps(body, sort_keys=True))
+            entry = self._inflight.get(key)
+        else:
+            # 写操作不合并：每个调用方使用独立的键
+            key = (api, object())
+            entry = None
+        if entry is None:
+            entry = InflightRequest(priority)
+            entry.task = self.loop.create_task(self._perform(api, body, entry))
+            entry.task.add_done_callback(lambda task: self._on_done(key, entry))
+            self._inflight[key] = entry
+        else:
+            self.coalesced_count += 1
+            # 更高优先级的调用方合并进来时，排队中的共享请求随之提前
+            if priority < entry.priority:
+                entry.priority = priority
+                self._semaphore.update_waiting()
+        
+        entry.waiters += 1
+        entry.stale_checks.append(is_stale)
+        try:
+            # shield: 单个调用方被取消时不影响其他共享该请求的调用方
+            result = await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            entry.stale_checks.remove(is_stale)
+            if entry.waiters == 0 and not entry.task.done():
+                # 推迟一轮再取消，让同一轮中提交的相同请求（如刷新）有机会接手
+                self.loop.call_soon(self._cancel_if_orphaned, key, entry)
+        
+        # 共享请求可能是为其他调用方解析的
+        if is_stale is not None and is_stale():
+            raise StaleRequestError(api)
+        return result
+    
+    async def _perform(self, api, body, entry):
+        """按请求策略发送请求；只有仍有调用方需要结果时才解析响应"""
+        policy = self.policy
+        breaker = policy.breaker(api)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                policy.count(policy.fast_fails, api)
+                raise CircuitOpenError(f"接口 {api} 暂时不可用（熔断中），请稍后重试")
+            try:
+                async with self._semaphore.hold(entry):
+                    policy.count_sent(api)
+                    response = await self.loop.run_in_executor(
+                        self._executor, TRACER.wrap('network', api, self.client.send), api, body,
+                        policy.timeout_for(api))
+            except asyncio.CancelledError:
+                breaker.record_cancel()
+                raise
+            except requests.exceptions.RequestException as e:
+                if not policy.is_failure(e):
+                    breaker.record_success()  # 服务器仍有响应
+                elif breaker.record_failure():
+                    policy.count(policy.trips, api)
+                # 退避等待期间不占用并发名额
+                if policy.should_retry(api, attempt, e) and not entry.all_stale():
+                    policy.count(policy.retries, api)
+                    await asyncio.sleep(policy.backoff(attempt))
+                    attempt += 1
+                    continue
+                raise
+            breaker.record_success()
+            break
+        
+        if entry.all_stale():
+            raise StaleRequestError(api)
+        async with self._semaphore.hold(entry):
+            return await self.loop.run_in_executor(self._executor, TRACER.wrap('json', api, response.json))
+    
+    def _on_done(self, key, entry):
+        """共享请求完成"""
+        self._forget(key, entry)
+        if not entry.task.cancelled():
+            entry.task.exception()  # 标记异常已读取，避免无人等待时的警告
+    
+    def _forget(self, key, entry):
+        """从进行中列表移除"""
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+    
+    def _cancel_if_orphaned(self, key, entry):
+        """没有调用方再等待时取消共享请求"""
+        if entry.waiters == 0 and not entry.task.done():
+            self._forget(key, entry)
+            entry.task.cancel()
+    
+    def queue_status(self):
+        """返回 (进行中的请求数, 各优先级排队的请求数)，可在其他线程中调用"""
+        semaphore = self._semaphore
+        return semaphore.active, semaphore.waiting
+    
+    async def run_blocking(self, func, *args):
+        """在线程池中执行阻塞操作（如读写本地存储）"""
+        return await self.loop.run_in_executor(self._executor, func, *args)
+    
+    async def run_bulk(self, items, handler, rate=0, concurrency=None):
+        """以有限的并发和速率对每一项执行 handler(item) 协程
+        
+        启动与并发上限相同数量的协程从同一队列中取项目，每项执行前先从令牌桶取得令牌，
+        因此同时进行的请求数和每秒请求数都有上限。handler 应自行处理请求异常。
+        
+        Args:
+            items: 项目列表
+            handler: 协程函数，处理单个项目
+            rate: 每秒最多处理的项目数，0表示不限制
+            concurrency: 同时处理的项目数，默认为引擎的并发上限
+        """
+        concurrency = min(concurrency or self.max_concurrency, self.max_concurrency)
+        bucket = TokenBucket(rate)
+        queue = iter(items)
+        
+        async def worker():
+            for item in queue:
+                await bucket.acquire()
+                await handler(item)
+        
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(items)))))
+    
+    def set_max_concurrency(self, max_concurrency):
+        """在运行中修改并发上限（可在任意线程中调用）
+        
+        进行中和排队的协程都不受影响：新的线程池接手之后提交的阻塞调用，旧线程池执行完已提交的调用后退出。
+        """
+        max_concurrency = max(1, int(max_concurrency))
+        
+        def apply():
+            previous = self._executor
+            self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+            self.max_concurrency = max_concurrency
+            self._semaphore.resize(max_concurrency)
+            previous.shutdown(wait=False)
+        
+        self.loop.call_soon_threadsafe(apply)
+    
+    async def _cancel_all(self):
+        """取消事件循环中的其他协程，并等待它们执行完 finally 和结束通知"""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def stop(self):
+        """取消所有协程，停止并关闭事件循环，释放线程池"""
+        try:
+            self.submit(self._cancel_all()).result(timeout=1)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=1)
+        if not self._thread.is_alive():
+            self.loop.close()
+        self._executor.shutdown(wait=False)
+
+
+class TokenBucket:
+    """令牌桶限速器
+
+    在请求引擎的事件循环中使用（只在单个线程中访问，无需加锁）。令牌按固定速率补充，
+    桶满时最多允许 capacity 个请求突发发送，之后按速率匀速放行。
+    """
+    
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate: 每秒补充的令牌数，小于等于0表示不限速
+            capacity: 桶容量，默认等于每秒速率
+        """
+        self.rate = float(rate)
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+    
+    async def acquire(self):
+        """等待并取走一个令牌"""
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RefreshState:
+    """后台刷新调度中一个群的状态"""
+    
+    def __init__(self, interval):
+        self.interval = interval  # 当前刷新间隔（秒），随成员变化自适应
+        self.refreshed_at = 0  # 最近一次获得成员数据的时间（0表示没有本地快照）
+        self.viewed_at = 0  # 最近一次打开该群的时间
+        self.retry_at = 0  # 刷新失败后，下一次允许刷新的时间
+        self.changes = 0  # 上一次获得数据以来检测到的成员变化数
+        self.in_flight = False  # 是否正在后台刷新
+
+
+class RefreshScheduler:
+    """后台刷新调度器
+
+    定时为已有本地快照的群在后台刷新成员列表和群信息，使打开群时显示的缓存数据已经足够新。
+    每个群的刷新间隔随成员变化自适应：获得新数据时若检测到变化则减半（不低于基础间隔的1/4），
+    没有变化则延长为1.5倍（不超过基础间隔的16倍）；最近打开过的群按1/4的间隔刷新。
+    到期的群按逾期程度排序，在每分钟请求预算的剩余额度内依次刷新。预算按所有发往 NapCat 的
+    请求计算（包括界面操作和重试），因此后台刷新只使用操作之外的空闲额度。只在界面线程中访问。
+    """
+    
+    TICK = 15  # 检查间隔（秒）
+    WINDOW = 60  # 请求预算的统计窗口（秒）
+    MIN_FACTOR = 0.25  # 刷新间隔下限（基础间隔的倍数）
+    MAX_FACTOR = 16  # 刷新间隔上限（基础间隔的倍数）
+    SHRINK = 0.5  # 检测到成员变化时间隔的缩放
+    GROW = 1.5  # 没有变化时间隔的缩放
+    RECENT_VIEW = 30 * 60  # 视为最近打开过的时间范围（秒）
+    VIEWED_FACTOR = 0.25  # 最近打开过的群的间隔缩放
+    FAILURE_DELAY = 5 * 60  # 刷新失败后的最长等待时间（秒）
+    REFRESH_COST = 2  # 刷新一个群的请求数（成员列表和群信息）
+    MAX_IN_FLIGHT = 2  # 同时进行的后台刷新数
+    
+    def __init__(self, base_interval=15 * 60, budget=30, clock=time.time):
+        """
+        Args:
+            base_interval: 基础刷新间隔（秒）
+            budget: 每分钟最多发往 NapCat 的请求数
+            clock: 返回当前时间的函数
+        """
+        self.base_interval = max(1, base_interval)
+        self.budget = max(0, int(budget))
+        self.clock = clock
+        self.groups = {}  # 群号 -> RefreshState
+        self.group_ids = set()  # 当前群列表中的群号
+        self.list_attempted_at = 0  # 最近一次后台刷新群列表的时间
+        self._samples = deque()  # (时间, 累计发送请求数)
+        self._reserved = 0  # 已决定发送、尚未计入累计数的请求数
+    
+    def configure(self, base_interval, budget):
+        """修改基础间隔和预算，已有的自适应间隔按比例缩放"""
+        base_interval = max(1, base_interval)
+        ratio = base_interval / self.base_interval
+        self.base_interval = base_interval
+        self.budget = max(0, int(budget))
+        for state in self.groups.values():
+            state.interval = self._clamp(state.interval * ratio)
+    
+    def _clamp(self, interval):
+        return min(self.base_interval * self.MAX_FACTOR, max(self.base_interval * self.MIN_FACTOR, interval))
+    
+    def state(self, group_id):
+        """返回（或创建）群的调度状态"""
+        state = self.groups.get(group_id)
+        if state is None:
+            state = self.groups[group_id] = RefreshState(self.base_interval)
+        return state
+    
+    def track(self, group_ids):
+        """设置当前群列表中的群，不在列表中的群不再刷新"""
+        self.group_ids = set(group_ids)
+    
+    def seed(self, fetched_times):
+        """用本地快照的获取时间初始化各群（程序启动时）
+        
+        Args:
+            fetched_times: 群号 -> 成员列表快照的获取时间
+        """
+        for group_id, fetched_at in fetched_times.items():
+            state = self.state(group_id)
+            state.refreshed_at = max(state.refreshed_at, fetched_at)
+    
+    def note_viewed(self, group_id):
+        """记录群被打开"""
+        self.state(group_id).viewed_at = self.clock()
+    
+    def note_changes(self, group_id, count):
+        """记录检测到的成员变化"""
+        self.state(group_id).changes += count
+    
+    def note_fetched(self, group_id, fetched_at):
+        """获得了群的新成员数据（来自后台刷新、打开群、同步或事件），按期间的变化调整刷新间隔"""
+        state = self.state(group_id)
+        if fetched_at <= state.refreshed_at:
+            return
+        if state.refreshed_at:
+            factor = self.SHRINK if state.changes else self.GROW
+            state.interval = self._clamp(state.interval * factor)
+        state.changes = 0
+        state.refreshed_at = fetched_at
+        state.retry_at = 0
+    
+    def record_requests(self, total):
+        """记录当前的累计发送请求数，用于计算最近一分钟的请求数
+        
+        保留最近一个早于统计窗口的采样作为起点，因此统计范围不短于一分钟，估计值只会偏多。
+        """
+        now = self.clock()
+        self._samples.append((now, total))
+        while len(self._samples) > 1 and self._samples[1][0] <= now - self.WINDOW:
+            self._samples.popleft()
+        self._reserved = 0
+    
+    def used(self):
+        """最近一分钟已发送（或已决定发送）的请求数"""
+        if not self._samples:
+            return self._reserved
+        return self._samples[-1][1] - self._samples[0][1] + self._reserved
+    
+    def available(self):
+        """剩余的请求预算；进行中的刷新按尚未发送计入"""
+        return self.budget - self.used() - self.in_flight_count() * self.REFRESH_COST
+    
+    def in_flight_count(self):
+        return sum(1 for state in self.groups.values() if state.in_flight)
+    
+    def tracked_count(self):
+        """参与后台刷新（在群列表中且有本地快照）的群数"""
+        return sum(1 for group_id in self.group_ids
+                   if group_id in self.groups and self.groups[group_id].refreshed_at)
+    
+    def effective_interval(self, state, now):
+        """群当前的实际刷新间隔"""
+        if state.viewed_at and now - state.viewed_at < self.RECENT_VIEW:
+            return state.interval * self.VIEWED_FACTOR
+        return state.interval
+    
+    def due(self):
+        """需要刷新的群号，按逾期程度（已过时间 / 刷新间隔）从高到低排序"""
+        now = self.clock()
+        overdue = []
+        for group_id in self.group_ids:
+            state = self.groups.get(group_id)
+            if state is None or not state.refreshed_at or state.in_flight or now < state.retry_at:
+                continue
+            ratio = (now - state.refreshed_at) / self.effective_interval(state, now)
+            if ratio >= 1:
+                overdue.append((ratio, group_id))
+        overdue.sort(reverse=True)
+        return [group_id for _, group_id in overdue]
+    
+    def list_due(self, fetched_at, max_age):
+        """群列表是否需要后台刷新；需要时占用一次请求预算
+        
+        Args:
+            fetched_at: 群列表的获取时间
+            max_age: 群列表的缓存时间（秒）
+        """
+        now = self.clock()
+        if now - fetched_at < max_age or now - self.list_attempted_at < min(max_age, self.FAILURE_DELAY):
+            return False
+        if self.available() < 1:
+            return False
+        self.list_attempted_at = now
+        self._reserved += 1
+        return True
+    
+    def next_batch(self):
+        """选出本轮要刷新的群并标记为刷新中，不超过剩余预算和同时刷新数"""
+        batch = []
+        available = self.available()
+        in_flight = self.in_flight_count()
+        for group_id in self.due():
+            if in_flight >= self.MAX_IN_FLIGHT or available < self.REFRESH_COST:
+                break
+            self.groups[group_id].in_flight = True
+            in_flight += 1
+            available -= self.REFRESH_COST
+            batch.append(group_id)
+        return batch
+    
+    def finish(self, group_id, ok):
+        """后台刷新结束；失败时推迟该群的下一次刷新"""
+        state = self.state(group_id)
+        state.in_flight = False
+        if not ok:
+            state.retry_at = self.clock() + min(state.interval, self.FAILURE_DELAY)
+
+
+class SnapshotStore:
+    """本地SQLite快照存储
+
+    按群号保存最近一次获取的群列表、群信息和群成员列表及其获取时间，
+    打开查看过的群时可以立即从本地数据渲染。可在多个线程中使用，读取应在工作线程中进行。
+    
+    每个群的成员列表整体保存为一条JSON记录：总是按群整体读写，不需要按成员查询，
+    一次读写一行比逐行写入上千名成员快得多；按成员更新的详情另存于 member_detail 表。
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS group_list (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            fetched_at REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS group_info (
+            group_id INTEGER PRIMARY KEY,
+            fetched_at REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS member_list (
+            group_id INTEGER PRIMARY KEY,
+            fetched_at REAL NOT NULL,
+            member_count INTEGER NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_member_list_fetched_at ON member_list (fetched_at);
+        CREATE TABLE IF NOT EXISTS member_detail (
+            group_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            fetched_at REAL NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (group_id, user_id)
+        );
+        CREATE TABLE IF NOT EXISTS member_change (
+            id INTEGER PRIMARY KEY,
+            group_id INTEGER NOT NULL,
+            detected_at REAL NOT NULL,
+            kind INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            old_value TEXT NOT NULL,
+            new_value TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_member_change_group ON member_change (group_id, detected_at);
+        CREATE INDEX IF NOT EXISTS idx_member_change_detected_at ON member_change (detected_at);
+    """
+    
+    def __init__(self, path, change_retention=0):
+        """
+        Args:
+            path: 数据库文件路径
+            change_retention: 成员变化记录的保留时间（秒），保存新记录时删除更早的记录，0表示一直保留
+        """
+        self.path = path
+        self.change_retention = change_retention
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+            self._conn.commit()
+    
+    @staticmethod
+    def _dumps(data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    
+    def _write(self, sql, params):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+    
+    def _read_one(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+    
+    def save_group_list(self, groups, fetched_at=None):
+        """保存群列表"""
+        self._write("INSERT OR REPLACE INTO group_list (id, fetched_at, data) VALUES (0, ?, ?)",
+                    (fetched_at or time.time(), self._dumps(groups)))
+    
+    def load_group_list(self):
+        """读取群列表，返回 (群列表, 获取时间)，没有则返回None"""
+        row = self._read_one("SELECT data, fetched_at FROM group_list WHERE id = 0")
+        return (json.loads(row[0]), row[1]) if row else None
+    
+    def save_group_info(self, group_id, info, fetched_at=None):
+        """保存群信息"""
+        self._write("INSERT OR REPLACE INTO group_info (group_id, fetched_at, data) VALUES (?, ?, ?)",
+                    (int(group_id), fetched_at or time.time(), self._dumps(info)))
+    
+    def load_group_info(self, group_id):
+        """读取群信息，返回 (群信息, 获取时间)，没有则返回None"""
+        row = self._read_one("SELECT data, fetched_at FROM group_info WHERE group_id = ?", (int(group_id),))
+        return (json.loads(row[0]), row[1]) if row else None
+    
+    def save_member_list(self, group_id, members, fetched_at=None):
+        """保存群成员列表"""
+        self._write("INSERT OR REPLACE INTO member_list (group_id, fetched_at, member_count, data) "
+                    "VALUES (?, ?, ?, ?)",
+                    (int(group_id), fetched_at or time.time(), len(members), self._dumps(members)))
+    
+    def load_member_list(self, group_id):
+        """读取群成员列表，返回 (成员列表, 获取时间)，没有则返回None"""
+        row = self._read_one("SELECT data, fetched_at FROM member_list WHERE group_id = ?", (int(group_id),))
+        return (json.loads(row[0]), row[1]) if row else None
+    
+    def load_member_list_times(self):
+        """读取所有群成员列表快照的获取时间，返回 {群号(字符串): 获取时间}"""
+        with self._lock:
+            rows = self._conn.execute("SELECT group_id, fetched_at FROM member_list").fetchall()
+        return {str(group_id): fetched_at for group_id, fetched_at in rows}
+    
+    def save_member_details(self, group_id, details, fetched_at=None):
+        """批量保存成员详情
+        
+        Args:
+            group_id: 群号
+            details: (QQ号, 详情字典) 列表
+            fetched_at: 获取时间
+        """
+        fetched_at = fetched_at or time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO member_detail (group_id, user_id, fetched_at, data) VALUES (?, ?, ?, ?)",
+                [(int(group_id), int(user_id), fetched_at, self._dumps(detail)) for user_id, detail in details])
+            self._conn.commit()
+    
+    def load_member_details(self, group_id, max_age=None):
+        """读取群内已保存的成员详情，返回 {QQ号: 详情字典}
+        
+        Args:
+            group_id: 群号
+            max_age: 只返回获取时间在该秒数以内的详情，None表示全部
+        """
+        since = time.time() - max_age if max_age is not None else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, data FROM member_detail WHERE group_id = ? AND fetched_at >= ?",
+                (int(group_id), since)).fetchall()
+        return {user_id: json.loads(data) for user_id, data in rows}
+    
+    def save_member_changes(self, group_id, changes, detected_at=None):
+        """保存成员变化记录
+        
+        Args:
+            group_id: 群号
+            changes: MemberChange 列表
+            detected_at: 检测到变化的时间
+        """
+        detected_at = detected_at or time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO member_change (group_id, detected_at, kind, user_id, old_value, new_value) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(int(group_id), detected_at, change.kind, change.user_id, change.old, change.new)
+                 for change in changes])
+            # 在同一事务中删除超过保留时间的记录，避免记录随刷新和事件无限增长
+            if self.change_retention:
+                self._conn.execute("DELETE FROM member_change WHERE detected_at < ?",
+                                   (time.time() - self.change_retention,))
+            self._conn.commit()
+    
+    def load_member_changes(self, group_id=None, kind=None, limit=1000):
+        """读取最近的成员变化记录（新的在前），每项为 (群号, 检测时间, MemberChange)
+        
+        Args:
+            group_id: 只读取该群的记录，None表示所有群
+            kind: 只读取该类型的记录，None表示全部
+            limit: 最多读取的条数
+        """
+        conditions, params = [], []
+        if group_id is not None:
+            conditions.append("group_id = ?")
+            params.append(int(group_id))
+        if kind is not None:
+            conditions.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT group_id, detected_at, kind, user_id, old_value, new_value FROM member_change "
+                f"{where}ORDER BY detected_at DESC, id DESC LIMIT ?", (*params, limit)).fetchall()
+        return [(str(row[0]), row[1], MemberChange(*row[2:])) for row in rows]
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
 
 
 class UserDetailDialog(QDialog):
@@ -119,11 +1487,9 @@ class UserDetailDialog(QDialog):
                     else:
                         value = "无"
                 elif field_key == "sex":
-                    sex_map = {'male': '男', 'female': '女', 'unknown': '未知'}
-                    value = sex_map.get(value, '未知')
+                    value = sex_name(value)
                 elif field_key == "role":
-                    role_map = {'owner': '群主', 'admin': '管理员', 'member': '成员'}
-                    value = role_map.get(value, '未知')
+                    value = role_name(value)
                 elif field_key in ["unfriendly", "card_changeable", "is_robot"]:
                     value = "是" if value else "否"
                 elif value == "":
@@ -324,10 +1690,11 @@ class CollapsibleBox(QWidget):
 class BanUserDialog(QDialog):
     """禁言用户对话框"""
     
-    def __init__(self, parent=None, user_info=None, theme=None):
+    def __init__(self, parent=None, user_info=None, theme=None, user_count=1):
         super().__init__(parent)
         self.user_info = user_info
         self.theme = theme
+        self.user_count = user_count  # 批量禁言时选中的成员数
         self.duration = 300  # 默认禁言时长5分钟
         self.init_ui()
         
@@ -341,7 +1708,9 @@ class BanUserDialog(QDialog):
         self.setLayout(main_layout)
         
         # 用户信息区域
-        if self.user_info:
+        if self.user_count > 1:
+            main_layout.addWidget(QLabel(f"已选择 {self.user_count} 名成员"))
+        elif self.user_info:
             info_layout = QGridLayout()
             
             # 数据项标签样式
@@ -365,8 +1734,7 @@ class BanUserDialog(QDialog):
             info_layout.addWidget(user_label, 0, 1)
             
             # 用户角色
-            role_map = {'owner': '群主', 'admin': '管理员', 'member': '成员'}
-            role = role_map.get(self.user_info.get("role", ""), "成员")
+            role = role_name(self.user_info.get("role", ""))
             info_layout.addWidget(QLabel("角色:"), 1, 0)
             role_label = QLabel(role)
             role_label.setStyleSheet(value_style)
@@ -475,6 +1843,332 @@ class BanUserDialog(QDialog):
         return self.duration
 
 
+class UserGroupsDialog(QDialog):
+    """查找成员所在的群"""
+    
+    # 请求打开某个群的信号，参数为群号
+    open_group_signal = pyqtSignal(str)
+    
+    def __init__(self, parent=None, user_index=None, group_names=None, theme=None, user_id=""):
+        super().__init__(parent)
+        self.user_index = user_index
+        self.group_names = group_names or {}  # 群号 -> 群名称
+        self.theme = theme
+        self.init_ui()
+        if user_id:
+            self.user_id_entry.setText(str(user_id))
+    
+    def init_ui(self):
+        self.setWindowTitle("查找成员所在的群")
+        self.setMinimumWidth(600)
+        self.setMinimumHeight(400)
+        
+        main_layout = QVBoxLayout()
+        self.setLayout(main_layout)
+        
+        # QQ号输入
+        input_layout = QHBoxLayout()
+        input_layout.addWidget(QLabel("QQ号:"))
+        self.user_id_entry = QLineEdit()
+        self.user_id_entry.setPlaceholderText("输入QQ号")
+        self.user_id_entry.textChanged.connect(self.lookup)
+        input_layout.addWidget(self.user_id_entry)
+        main_layout.addLayout(input_layout)
+        
+        self.summary_label = QLabel("")
+        main_layout.addWidget(self.summary_label)
+        
+        # 结果表格
+        self.result_model = QStandardItemModel(0, 5, self)
+        self.result_model.setHorizontalHeaderLabels(["群号", "群名称", "角色", "群名片", "最后发言时间"])
+        self.result_table = QTableView()
+        self.result_table.setModel(self.result_model)
+        self.result_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.result_table.setSelectionBehavior(QTableView.SelectRows)
+        self.result_table.horizontalHeader().setStretchLastSection(True)
+        self.result_table.verticalHeader().setVisible(False)
+        self.result_table.doubleClicked.connect(self.on_row_double_clicked)
+        main_layout.addWidget(self.result_table)
+        
+        hint_label = QLabel("双击一行可打开对应的群")
+        main_layout.addWidget(hint_label)
+        
+        # 如果是深色主题，设置对话框背景色
+        if self.theme == "深色主题":
+            self.setStyleSheet("background-color: #353535; color: #cccccc;")
+        
+        self.lookup()
+    
+    def lookup(self):
+        """根据输入的QQ号查询索引"""
+        self.result_model.setRowCount(0)
+        text = self.user_id_entry.text().strip()
+        indexed = f"已索引 {self.user_index.group_count} 个群、{self.user_index.user_count} 名成员"
+        if not text.isdigit():
+            self.summary_label.setText(indexed)
+            return
+        
+        entries = self.user_index.lookup(int(text))
+        for group_id, role, card, last_sent_time in entries:
+            self.result_model.appendRow([
+                QStandardItem(group_id),
+                QStandardItem(self.group_names.get(group_id, "")),
+                QStandardItem(ROLE_NAMES[role]),
+                QStandardItem(card),
+                QStandardItem(format_timestamp(last_sent_time))
+            ])
+        self.summary_label.setText(f"该成员在 {len(entries)} 个群中（{indexed}）")
+    
+    def on_row_double_clicked(self, index):
+        group_id = self.result_model.item(index.row(), 0).text()
+        self.open_group_signal.emit(group_id)
+
+
+class MemberChangesDialog(QDialog):
+    """成员变化记录（加入、退出、角色变更、名片变更）"""
+    
+    MAX_ROWS = 2000  # 最多显示的记录数
+    
+    def __init__(self, parent=None, store=None, group_names=None, theme=None, group_id=None):
+        super().__init__(parent)
+        self.store = store  # SnapshotStore
+        self.group_names = group_names or {}  # 群号 -> 群名称
+        self.theme = theme
+        self.group_id = group_id  # 当前群
+        self.init_ui()
+    
+    def init_ui(self):
+        self.setWindowTitle("成员变化记录")
+        self.setMinimumWidth(750)
+        self.setMinimumHeight(450)
+        
+        main_layout = QVBoxLayout()
+        self.setLayout(main_layout)
+        
+        # 筛选条件
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("范围:"))
+        self.scope_combo = QComboBox()
+        if self.group_id:
+            self.scope_combo.addItem(f"当前群 ({self.group_names.get(self.group_id, self.group_id)})", self.group_id)
+        self.scope_combo.addItem("所有群", None)
+        self.scope_combo.currentIndexChanged.connect(self.reload)
+        filter_layout.addWidget(self.scope_combo)
+        
+        filter_layout.addWidget(QLabel("类型:"))
+        self.kind_combo = QComboBox()
+        self.kind_combo.addItem("全部", None)
+        for kind, name in enumerate(CHANGE_NAMES):
+            self.kind_combo.addItem(name, kind)
+        self.kind_combo.currentIndexChanged.connect(self.reload)
+        filter_layout.addWidget(self.kind_combo)
+        filter_layout.addStretch()
+        main_layout.addLayout(filter_layout)
+        
+        # 记录表格
+        self.change_model = QStandardItemModel(0, 5, self)
+        self.change_model.setHorizontalHeaderLabels(["时间", "群", "类型", "QQ号", "变化"])
+        self.change_table = QTableView()
+        self.change_table.setModel(self.change_model)
+        self.change_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.change_table.setSelectionBehavior(QTableView.SelectRows)
+        self.change_table.horizontalHeader().setStretchLastSection(True)
+        self.change_table.verticalHeader().setVisible(False)
+        main_layout.addWidget(self.change_table)
+        
+        self.summary_label = QLabel("")
+        main_layout.addWidget(self.summary_label)
+        
+        # 如果是深色主题，设置对话框背景色
+        if self.theme == "深色主题":
+            self.setStyleSheet("background-color: #353535; color: #cccccc;")
+        
+        self.reload()
+    
+    def reload(self, *args):
+        """按筛选条件重新读取记录"""
+        records = self.store.load_member_changes(self.scope_combo.currentData(), self.kind_combo.currentData(),
+                                                 self.MAX_ROWS)
+        self.change_model.setRowCount(0)
+        for group_id, detected_at, change in records:
+            self.change_model.appendRow([
+                QStandardItem(format_timestamp(detected_at)),
+                QStandardItem(self.group_names.get(group_id, group_id)),
+                QStandardItem(CHANGE_NAMES[change.kind]),
+                QStandardItem(str(change.user_id)),
+                QStandardItem(self.describe(change))
+            ])
+        self.change_table.resizeColumnsToContents()
+        suffix = f"（仅显示最近 {self.MAX_ROWS} 条）" if len(records) >= self.MAX_ROWS else ""
+        self.summary_label.setText(f"共 {len(records)} 条记录{suffix}")
+    
+    @staticmethod
+    def describe(change):
+        """变化内容的文字描述"""
+        if change.kind == CHANGE_JOIN:
+            return change.new
+        elif change.kind == CHANGE_LEAVE:
+            return change.old
+        elif change.kind == CHANGE_ROLE:
+            return f"{ROLE_NAMES[ROLE_CODES[change.old]]} → {ROLE_NAMES[ROLE_CODES[change.new]]}"
+        return f"{change.old or '(无)'} → {change.new or '(无)'}"
+
+
+class MemoryProfileDialog(QDialog):
+    """内存分析面板：各群成员数据的内存占用、每次加载和导出的内存变化，以及内存分配最多的代码位置"""
+    
+    def __init__(self, parent=None, profiler=None, footprint=None, group_names=None, theme=None):
+        """
+        Args:
+            profiler: MemoryProfiler
+            footprint: 返回 (各群占用, 其他占用) 的函数，见 GroupMemberGUI.memory_footprint
+            group_names: 群号 -> 群名称
+            theme: 主题名称
+        """
+        super().__init__(parent)
+        self.profiler = profiler
+        self.footprint = footprint
+        self.group_names = group_names or {}
+        self.theme = theme
+        self.init_ui()
+    
+    def init_ui(self):
+        self.setWindowTitle("内存分析")
+        self.setMinimumWidth(800)
+        self.setMinimumHeight(500)
+        
+        main_layout = QVBoxLayout()
+        self.setLayout(main_layout)
+        
+        # 跟踪状态与操作
+        control_layout = QHBoxLayout()
+        self.tracing_label = QLabel("")
+        control_layout.addWidget(self.tracing_label)
+        control_layout.addStretch()
+        self.tracing_button = QPushButton("")
+        self.tracing_button.clicked.connect(self.toggle_tracing)
+        control_layout.addWidget(self.tracing_button)
+        refresh_button = QPushButton("刷新")
+        refresh_button.clicked.connect(self.reload)
+        control_layout.addWidget(refresh_button)
+        clear_button = QPushButton("清空记录")
+        clear_button.clicked.connect(self.clear_records)
+        control_layout.addWidget(clear_button)
+        main_layout.addLayout(control_layout)
+        
+        tabs = QTabWidget()
+        main_layout.addWidget(tabs)
+        
+        # 各群占用
+        footprint_tab = QWidget()
+        footprint_layout = QVBoxLayout(footprint_tab)
+        self.group_model = QStandardItemModel(0, 6, self)
+        self.group_model.setHorizontalHeaderLabels(["群", "成员数", "列式数据", "缓存与索引", "事件原始数据", "合计"])
+        footprint_layout.addWidget(self.create_table(self.group_model))
+        self.footprint_label = QLabel("")
+        footprint_layout.addWidget(self.footprint_label)
+        self.other_model = QStandardItemModel(0, 3, self)
+        self.other_model.setHorizontalHeaderLabels(["项目", "大小", "说明"])
+        other_table = self.create_table(self.other_model)
+        other_table.setMaximumHeight(160)
+        footprint_layout.addWidget(other_table)
+        tabs.addTab(footprint_tab, "各群占用")
+        
+        # 加载与导出前后的内存变化
+        records_tab = QWidget()
+        records_layout = QVBoxLayout(records_tab)
+        self.record_model = QStandardItemModel(0, 6, self)
+        self.record_model.setHorizontalHeaderLabels(["时间", "类型", "对象", "耗时", "保留", "峰值"])
+        records_layout.addWidget(self.create_table(self.record_model))
+        records_hint = QLabel("保留为结束时比开始时多占用的内存，峰值为期间最多多占用的内存（与其他操作重叠时不统计）；"
+                              "内存分配在哪些代码位置见“分配位置”页")
+        records_hint.setWordWrap(True)
+        records_layout.addWidget(records_hint)
+        tabs.addTab(records_tab, "加载与导出")
+        
+        # 当前内存分配最多的代码位置
+        allocation_tab = QWidget()
+        allocation_layout = QVBoxLayout(allocation_tab)
+        self.allocation_model = QStandardItemModel(0, 3, self)
+        self.allocation_model.setHorizontalHeaderLabels(["代码位置", "大小", "分配次数"])
+        allocation_layout.addWidget(self.create_table(self.allocation_model))
+        tabs.addTab(allocation_tab, "分配位置")
+        
+        # 如果是深色主题，设置对话框背景色
+        if self.theme == "深色主题":
+            self.setStyleSheet("background-color: #353535; color: #cccccc;")
+        
+        self.reload()
+    
+    def create_table(self, model):
+        """创建只读表格"""
+        table = QTableView()
+        table.setModel(model)
+        table.setEditTriggers(QTableView.NoEditTriggers)
+        table.setSelectionBehavior(QTableView.SelectRows)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.verticalHeader().setVisible(False)
+        return table
+    
+    def toggle_tracing(self):
+        """开始或停止跟踪内存分配"""
+        if self.profiler.tracing:
+            self.profiler.stop()
+        else:
+            self.profiler.start()
+        self.reload()
+    
+    def clear_records(self):
+        self.profiler.clear()
+        self.reload()
+    
+    def reload(self, *args):
+        """重新统计并显示"""
+        tracing = self.profiler.tracing
+        if tracing:
+            current, peak = self.profiler.traced_memory()
+            self.tracing_label.setText(f"tracemalloc 跟踪中：当前 {format_size(current)}，峰值 {format_size(peak)}")
+        else:
+            self.tracing_label.setText("tracemalloc 未开启：开启后记录每次加载和导出的内存变化（跟踪期间程序会变慢）")
+        self.tracing_button.setText("停止跟踪" if tracing else "开始跟踪")
+        
+        groups, others = self.footprint()
+        groups.sort(key=lambda item: sum(item[2:]), reverse=True)
+        self.group_model.setRowCount(0)
+        for group_id, count, columns, caches, raw in groups:
+            self.group_model.appendRow([
+                QStandardItem(f"{self.group_names.get(group_id, '')} ({group_id})"),
+                QStandardItem(str(count)),
+                QStandardItem(format_size(columns)),
+                QStandardItem(format_size(caches)),
+                QStandardItem(format_size(raw)),
+                QStandardItem(format_size(columns + caches + raw))
+            ])
+        total = sum(sum(item[2:]) for item in groups)
+        self.footprint_label.setText(f"共 {len(groups)} 个群，成员数据合计 {format_size(total)}"
+                                     "（同一群的多份数据中共享的部分只计一次）")
+        self.other_model.setRowCount(0)
+        for name, size, note in others:
+            self.other_model.appendRow([QStandardItem(name), QStandardItem(format_size(size)), QStandardItem(note)])
+        
+        self.record_model.setRowCount(0)
+        for record in reversed(self.profiler.records()):
+            items = [
+                QStandardItem(format_timestamp(record.recorded_at)),
+                QStandardItem(record.kind),
+                QStandardItem(self.group_names.get(record.label, record.label)),
+                QStandardItem(f"{record.duration * 1000:.0f} ms"),
+                QStandardItem(format_size(record.retained)),
+                QStandardItem(format_size(record.peak))
+            ]
+            self.record_model.appendRow(items)
+        
+        self.allocation_model.setRowCount(0)
+        for location, size, count in self.profiler.top_allocations():
+            self.allocation_model.appendRow([QStandardItem(location), QStandardItem(format_size(size)),
+                                             QStandardItem(str(count))])
+
+
 class SettingsDialog(QDialog):
     """设置对话框"""
     
@@ -525,6 +2219,86 @@ class SettingsDialog(QDialog):
         url_layout.addLayout(url_input_layout)
         url_layout.addLayout(token_input_layout)
         
+        # 连接设置
+        connection_group = QGroupBox("连接设置")
+        connection_layout = QVBoxLayout()
+        connection_group.setLayout(connection_layout)
+        
+        # 连接池大小
+        pool_layout = QHBoxLayout()
+        pool_label = QLabel("连接池大小:")
+        self.pool_size_entry = QLineEdit(str(self.settings.get('pool_size', 10)))
+        self.pool_size_entry.setMaximumWidth(80)
+        pool_layout.addWidget(pool_label)
+        pool_layout.addWidget(self.pool_size_entry)
+        pool_layout.addStretch()
+        
+        # 请求超时
+        timeout_layout = QHBoxLayout()
+        timeout_label = QLabel("请求超时(秒):")
+        self.timeout_entry = QLineEdit(str(self.settings.get('timeout', 30)))
+        self.timeout_entry.setMaximumWidth(80)
+        timeout_layout.addWidget(timeout_label)
+        timeout_layout.addWidget(self.timeout_entry)
+        timeout_layout.addStretch()
+        
+        # 最大并发请求数
+        concurrency_layout = QHBoxLayout()
+        concurrency_label = QLabel("最大并发请求数:")
+        self.concurrency_entry = QLineEdit(str(self.settings.get('max_concurrency', 8)))
+        self.concurrency_entry.setMaximumWidth(80)
+        concurrency_layout.addWidget(concurrency_label)
+        concurrency_layout.addWidget(self.concurrency_entry)
+        concurrency_layout.addStretch()
+        
+        # 只读接口失败重试次数
+        retries_layout = QHBoxLayout()
+        retries_label = QLabel("失败重试次数:")
+        self.retries_entry = QLineEdit(str(self.settings.get('max_retries', 3)))
+        self.retries_entry.setMaximumWidth(80)
+        self.retries_entry.setToolTip("获取群列表、群信息、成员列表和成员详情失败时的最大重试次数（禁言不会重试）")
+        retries_layout.addWidget(retries_label)
+        retries_layout.addWidget(self.retries_entry)
+        retries_layout.addStretch()
+        
+        # 同步所有群时同时获取的群数
+        sync_layout = QHBoxLayout()
+        sync_label = QLabel("同步所有群并发数:")
+        self.sync_concurrency_entry = QLineEdit(str(self.settings.get('sync_concurrency', 4)))
+        self.sync_concurrency_entry.setMaximumWidth(80)
+        self.sync_concurrency_entry.setToolTip("同步所有群时同时获取成员列表的群数，不超过最大并发请求数")
+        sync_layout.addWidget(sync_label)
+        sync_layout.addWidget(self.sync_concurrency_entry)
+        sync_layout.addStretch()
+        
+        # 批量请求速率
+        bulk_rate_layout = QHBoxLayout()
+        bulk_rate_label = QLabel("批量请求速率(次/秒):")
+        self.bulk_rate_entry = QLineEdit(str(self.settings.get('bulk_rate', 200)))
+        self.bulk_rate_entry.setMaximumWidth(80)
+        self.bulk_rate_entry.setToolTip("批量补全成员详情等只读操作每秒最多发送的请求数，0表示不限制")
+        bulk_rate_layout.addWidget(bulk_rate_label)
+        bulk_rate_layout.addWidget(self.bulk_rate_entry)
+        bulk_rate_layout.addStretch()
+        
+        # 批量禁言速率（写操作，单独使用较低的速率）
+        ban_rate_layout = QHBoxLayout()
+        ban_rate_label = QLabel("批量禁言速率(次/秒):")
+        self.ban_rate_entry = QLineEdit(str(self.settings.get('ban_rate', 5)))
+        self.ban_rate_entry.setMaximumWidth(80)
+        self.ban_rate_entry.setToolTip("批量禁言、解除禁言每秒最多发送的请求数，至少为1")
+        ban_rate_layout.addWidget(ban_rate_label)
+        ban_rate_layout.addWidget(self.ban_rate_entry)
+        ban_rate_layout.addStretch()
+        
+        connection_layout.addLayout(pool_layout)
+        connection_layout.addLayout(timeout_layout)
+        connection_layout.addLayout(concurrency_layout)
+        connection_layout.addLayout(retries_layout)
+        connection_layout.addLayout(sync_layout)
+        connection_layout.addLayout(bulk_rate_layout)
+        connection_layout.addLayout(ban_rate_layout)
+        
         # 自动刷新设置
         refresh_group = QGroupBox("数据刷新")
         refresh_layout = QVBoxLayout()
@@ -539,11 +2313,91 @@ class SettingsDialog(QDialog):
         cache_layout.addWidget(self.cache_time_entry)
         cache_layout.addStretch()
         
+        # 先显示缓存再后台刷新
+        self.swr_checkbox = QCheckBox("先显示缓存数据，后台刷新后再更新")
+        self.swr_checkbox.setChecked(self.settings.get('stale_while_revalidate', True))
+        
+        # 后台刷新已缓存的群
+        self.background_refresh_checkbox = QCheckBox("后台定时刷新已缓存的群（最近打开和成员变化多的群优先）")
+        self.background_refresh_checkbox.setChecked(self.settings.get('background_refresh', True))
+        
+        refresh_interval_layout = QHBoxLayout()
+        refresh_interval_label = QLabel("基础刷新间隔(分钟):")
+        self.refresh_interval_entry = QLineEdit(str(self.settings.get('refresh_interval', 15)))
+        self.refresh_interval_entry.setMaximumWidth(80)
+        self.refresh_interval_entry.setToolTip("成员经常变化的群会缩短到1/4，长时间没有变化的群逐步延长到16倍")
+        refresh_interval_layout.addWidget(refresh_interval_label)
+        refresh_interval_layout.addWidget(self.refresh_interval_entry)
+        refresh_interval_layout.addStretch()
+        
+        refresh_budget_layout = QHBoxLayout()
+        refresh_budget_label = QLabel("每分钟请求预算(次):")
+        self.refresh_budget_entry = QLineEdit(str(self.settings.get('refresh_budget', 30)))
+        self.refresh_budget_entry.setMaximumWidth(80)
+        self.refresh_budget_entry.setToolTip("最近一分钟发往 NapCat 的请求（包括手动操作）达到该数量时暂停后台刷新")
+        refresh_budget_layout.addWidget(refresh_budget_label)
+        refresh_budget_layout.addWidget(self.refresh_budget_entry)
+        refresh_budget_layout.addStretch()
+        
         refresh_layout.addLayout(cache_layout)
+        refresh_layout.addWidget(self.swr_checkbox)
+        refresh_layout.addWidget(self.background_refresh_checkbox)
+        refresh_layout.addLayout(refresh_interval_layout)
+        refresh_layout.addLayout(refresh_budget_layout)
+        
+        change_retention_layout = QHBoxLayout()
+        change_retention_label = QLabel("成员变化记录保留(天):")
+        self.change_retention_entry = QLineEdit(str(self.settings.get('change_retention', 90)))
+        self.change_retention_entry.setMaximumWidth(80)
+        self.change_retention_entry.setToolTip("保存新的变化记录时删除更早的记录，0表示一直保留")
+        change_retention_layout.addWidget(change_retention_label)
+        change_retention_layout.addWidget(self.change_retention_entry)
+        change_retention_layout.addStretch()
+        refresh_layout.addLayout(change_retention_layout)
+        
+        # 事件上报设置
+        event_group = QGroupBox("事件上报")
+        event_layout = QVBoxLayout()
+        event_group.setLayout(event_layout)
+        
+        self.event_checkbox = QCheckBox("接收事件上报，按群通知增量更新成员（无需重新获取成员列表）")
+        self.event_checkbox.setChecked(self.settings.get('event_listen', False))
+        
+        event_address_layout = QHBoxLayout()
+        event_host_label = QLabel("监听地址:")
+        self.event_host_entry = QLineEdit(self.settings.get('event_host', '127.0.0.1'))
+        self.event_host_entry.setMaximumWidth(120)
+        event_port_label = QLabel("端口:")
+        self.event_port_entry = QLineEdit(str(self.settings.get('event_port', 8090)))
+        self.event_port_entry.setMaximumWidth(80)
+        event_address_layout.addWidget(event_host_label)
+        event_address_layout.addWidget(self.event_host_entry)
+        event_address_layout.addWidget(event_port_label)
+        event_address_layout.addWidget(self.event_port_entry)
+        event_address_layout.addStretch()
+        
+        event_secret_layout = QHBoxLayout()
+        event_secret_label = QLabel("上报密钥:")
+        self.event_secret_entry = QLineEdit(self.settings.get('event_secret', ''))
+        self.event_secret_entry.setToolTip("与 NapCat 中 HTTP 上报的密钥(secret)一致，为空时不校验签名；"
+                                           "监听地址不是本机（如 0.0.0.0）时必须填写")
+        event_secret_layout.addWidget(event_secret_label)
+        event_secret_layout.addWidget(self.event_secret_entry)
+        
+        event_hint = QLabel("在 NapCat 的网络配置中添加 HTTP 客户端，上报地址填写 http://本机IP:端口/；"
+                            "NapCat 在其他机器上时监听地址改为 0.0.0.0 并设置上报密钥")
+        event_hint.setWordWrap(True)
+        
+        event_layout.addWidget(self.event_checkbox)
+        event_layout.addLayout(event_address_layout)
+        event_layout.addLayout(event_secret_layout)
+        event_layout.addWidget(event_hint)
         
         # 添加到API标签页
         api_layout.addWidget(url_group)
+        api_layout.addWidget(connection_group)
         api_layout.addWidget(refresh_group)
+        api_layout.addWidget(event_group)
         api_layout.addStretch()
         
         # 外观设置标签页
@@ -566,25 +2420,8 @@ class SettingsDialog(QDialog):
         theme_select_layout.addWidget(self.theme_combo)
         theme_layout.addLayout(theme_select_layout)
         
-        # 表格设置
-        table_group = QGroupBox("表格显示")
-        table_layout = QVBoxLayout()
-        table_group.setLayout(table_layout)
-        
-        # 分页大小设置
-        page_layout = QHBoxLayout()
-        page_label = QLabel("每页显示成员数:")
-        self.page_size_entry = QLineEdit(str(self.settings.get('page_size', 50)))
-        self.page_size_entry.setMaximumWidth(80)
-        page_layout.addWidget(page_label)
-        page_layout.addWidget(self.page_size_entry)
-        page_layout.addStretch()
-        
-        table_layout.addLayout(page_layout)
-        
         # 添加到外观标签页
         appearance_layout.addWidget(theme_group)
-        appearance_layout.addWidget(table_group)
         appearance_layout.addStretch()
         
         # 将标签页添加到标签组件
@@ -600,45 +2437,892 @@ class SettingsDialog(QDialog):
         self.save_btn.clicked.connect(self.accept)
         self.save_btn.setDefault(True)
         
-        button_layout.addStretch()
-        button_layout.addWidget(self.cancel_btn)
-        button_layout.addWidget(self.save_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(self.cancel_btn)
+        button_layout.addWidget(self.save_btn)
+        
+        main_layout.addLayout(button_layout)
+        
+        # 如果是深色主题，设置对话框背景色
+        if self.theme == "深色主题":
+            self.setStyleSheet("background-color: #353535; color: #cccccc;")
+    
+    def get_settings(self):
+        """获取设置值"""
+        settings = {
+            'url': self.url_entry.text().strip(),
+            'token': self.token_entry.text().strip(),
+            'theme': self.theme_combo.currentText(),
+            'cache_time': int(self.cache_time_entry.text() or 30),
+            'pool_size': int(self.pool_size_entry.text() or 10),
+            'timeout': int(self.timeout_entry.text() or 30),
+            'max_concurrency': int(self.concurrency_entry.text() or 8),
+            'max_retries': int(self.retries_entry.text() or 3),
+            'sync_concurrency': int(self.sync_concurrency_entry.text() or 4),
+            'bulk_rate': int(self.bulk_rate_entry.text() or 200),
+            'ban_rate': max(1, int(self.ban_rate_entry.text() or 5)),
+            'stale_while_revalidate': self.swr_checkbox.isChecked(),
+            'background_refresh': self.background_refresh_checkbox.isChecked(),
+            'refresh_interval': max(1, int(self.refresh_interval_entry.text() or 15)),
+            'refresh_budget': int(self.refresh_budget_entry.text() or 30),
+            'change_retention': max(0, int(self.change_retention_entry.text() or 90)),
+            'event_listen': self.event_checkbox.isChecked(),
+            'event_host': self.event_host_entry.text().strip() or '127.0.0.1',
+            'event_port': int(self.event_port_entry.text() or 8090),
+            'event_secret': self.event_secret_entry.text().strip()
+        }
+        return settings
+
+
+class GroupListModel(QAbstractListModel):
+    """群列表模型
+
+    保存群信息及群号到行号的索引，重新应用相同的数据不会触发任何界面更新。
+    """
+    
+    GROUP_DATA_ROLE = Qt.UserRole  # 完整的群信息
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._groups = []
+        self._texts = []  # 每行的显示文本
+        self._search_keys = []  # 每行的搜索文本（群名称、群号、群备注，小写）
+        self._index = {}  # 群号 -> 行号
+    
+    def set_groups(self, groups):
+        """更新群列表，返回是否有变化
+        
+        群的集合和顺序不变时只通知内容有变化的行，保留当前选中状态。
+        """
+        if groups is self._groups or groups == self._groups:
+            return False
+        
+        same_rows = [g.get('group_id') for g in groups] == [g.get('group_id') for g in self._groups]
+        if same_rows:
+            changed = [row for row, (old, new) in enumerate(zip(self._groups, groups)) if old != new]
+            self._set_rows(groups)
+            for row in changed:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+        else:
+            self.beginResetModel()
+            self._set_rows(groups)
+            self.endResetModel()
+        return True
+    
+    def _set_rows(self, groups):
+        self._groups = groups
+        self._texts = [f"{g['group_name']} ({g['member_count']}/{g['max_member_count']})" for g in groups]
+        self._search_keys = [
+            f"{g.get('group_name', '')}\n{g.get('group_id', '')}\n{g.get('group_remark', '')}".lower()
+            for g in groups
+        ]
+        self._index = {g.get('group_id'): row for row, g in enumerate(groups)}
+    
+    def row_of(self, group_id):
+        """返回群号所在的行，不存在时返回-1"""
+        return self._index.get(group_id, -1)
+    
+    def search_keys(self):
+        return self._search_keys
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._groups)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        group_data = self._groups[index.row()]
+        
+        if role == Qt.DisplayRole:
+            # 显示名称: 群名称 (成员数/最大成员数)
+            return self._texts[index.row()]
+        elif role == Qt.ToolTipRole:
+            # 工具提示，显示更多信息
+            tooltip = f"群ID: {group_data['group_id']}\n群名称: {group_data['group_name']}\n成员数: {group_data['member_count']}/{group_data['max_member_count']}"
+            if group_data.get('group_remark'):
+                tooltip += f"\n群备注: {group_data['group_remark']}"
+            return tooltip
+        elif role == self.GROUP_DATA_ROLE:
+            return group_data
+        return None
+
+
+class GroupFilterProxyModel(QSortFilterProxyModel):
+    """群列表过滤模型
+
+    在群名称、群号或群备注中搜索。输入在上一次搜索词基础上继续追加时，
+    只需在上一次匹配的行中查找。
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._query = ""
+        self._accepted = None  # 匹配的行集合，None表示全部显示
+    
+    def set_query(self, text):
+        """设置搜索词"""
+        query = text.lower()
+        if query == self._query:
+            return
+        
+        keys = self.sourceModel().search_keys()
+        if not query:
+            accepted = None
+        elif self._accepted is not None and self._query in query:
+            # 搜索范围缩小，只检查上一次匹配的行
+            accepted = {row for row in self._accepted if query in keys[row]}
+        else:
+            accepted = {row for row, key in enumerate(keys) if query in key}
+        
+        self._query = query
+        self._accepted = accepted
+        self.invalidateFilter()
+    
+    def refresh(self):
+        """源数据变化后重新计算匹配结果"""
+        query, self._query, self._accepted = self._query, "", None
+        self.set_query(query)
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._accepted is None or source_row in self._accepted
+
+
+# 角色枚举，数值即排序优先级：群主、管理员、普通成员
+ROLE_OWNER, ROLE_ADMIN, ROLE_MEMBER = 0, 1, 2
+ROLE_CODES = {'owner': ROLE_OWNER, 'admin': ROLE_ADMIN, 'member': ROLE_MEMBER}
+ROLE_KEYS = ('owner', 'admin', 'member')
+ROLE_NAMES = ('群主', '管理员', '成员')
+
+# 性别枚举
+SEX_CODES = {'male': 0, 'female': 1, 'unknown': 2}
+SEX_KEYS = ('male', 'female', 'unknown')
+SEX_NAMES = ('男', '女', '未知')
+
+# 整数列中表示"无数据"的值
+MISSING = -1
+
+
+def role_name(role):
+    """角色键（owner/admin/member）对应的显示名称，未知角色视为普通成员"""
+    return ROLE_NAMES[ROLE_CODES.get(role, ROLE_MEMBER)]
+
+
+def sex_name(sex):
+    """性别键对应的显示名称"""
+    return SEX_NAMES[SEX_CODES.get(sex, 2)]
+
+# 只有 /get_group_member_info 才完整返回的成员详情字段
+DETAIL_FIELDS = ('sex', 'age', 'area', 'level', 'qq_level')
+# 已保存的成员详情在该时间内（秒）视为有效，补全时不再重新获取
+DETAIL_MAX_AGE = 7 * 24 * 60 * 60
+
+
+def format_timestamp(timestamp):
+    """将时间戳格式化为可读时间，无效时返回 未知"""
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp and timestamp > 0 else "未知"
+
+
+def format_size(size):
+    """将字节数格式化为 KB/MB 等易读的格式，None 显示为 —"""
+    if size is None:
+        return "—"
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def missing_to_blank(value):
+    """整数列中的 MISSING 转为空字符串"""
+    return '' if value == MISSING else value
+
+
+# 成员字段注册表：column 为 MemberStore 中保存该字段的列，convert 将列中的值转为导出值
+# （None 表示原样导出），cached 表示转换较慢、结果按行缓存。显示字符串即导出值的 str()，
+# 表格和各种导出格式都按此取值。
+FieldSpec = namedtuple('FieldSpec', ['key', 'name', 'column', 'convert', 'cached'])
+MEMBER_FIELDS = {spec.key: spec for spec in (
+    FieldSpec('user_id', 'QQ号', 'user_ids', None, False),
+    FieldSpec('nickname', '昵称', 'nicknames', None, False),
+    FieldSpec('card', '群名片', 'cards', None, False),
+    FieldSpec('join_time', '加群时间', 'join_times', format_timestamp, True),
+    FieldSpec('last_sent_time', '最后发言时间', 'last_sent_times', format_timestamp, True),
+    FieldSpec('role', '角色', 'roles', ROLE_NAMES.__getitem__, False),
+    FieldSpec('sex', '性别', 'sexes', SEX_NAMES.__getitem__, False),
+    FieldSpec('age', '年龄', 'ages', missing_to_blank, False),
+    FieldSpec('area', '地区', 'areas', None, False),
+    FieldSpec('qq_level', 'QQ等级', 'qq_levels', missing_to_blank, False),
+    FieldSpec('level', '群等级', 'levels', None, False),
+)}
+
+
+class FieldProjection:
+    """MemberStore 上若干字段的投影
+
+    构建时按字段注册表确定每个字段的列和转换函数，之后按行或按块取值，
+    不再逐个单元格判断字段类型。
+    """
+    
+    def __init__(self, store, fields):
+        self.fields = list(fields)
+        self.names = [MEMBER_FIELDS[field].name for field in self.fields]
+        self._columns = []  # 每个字段的 (row -> 列中的值, 转换函数)
+        for field in self.fields:
+            spec = MEMBER_FIELDS[field]
+            if spec.cached:
+                self._columns.append((store.getter(field), None))
+            else:
+                self._columns.append((getattr(store, spec.column).__getitem__, spec.convert))
+    
+    def row(self, row):
+        """返回一行各字段的导出值"""
+        return [lookup(row) if convert is None else convert(lookup(row)) for lookup, convert in self._columns]
+    
+    def chunks(self, rows, size=EXPORT_CHUNK_ROWS):
+        """按块产生各行的导出值元组，块内逐列批量转换"""
+        for start in range(0, len(rows), size):
+            chunk = rows[start:start + size]
+            if not self._columns:
+                yield [()] * len(chunk)
+                continue
+            values = []
+            for lookup, convert in self._columns:
+                cells = map(lookup, chunk)
+                values.append(cells if convert is None else map(convert, cells))
+            yield list(zip(*values))
+
+
+def export_checkpoint(done, total, progress, cancel):
+    """写入下一块之前调用：报告进度，已取消时抛出 ExportCancelled
+
+    写完最后一块后不再检查取消，已完整写出的文件不会因为稍晚的取消而被删除。
+    """
+    if progress is not None:
+        progress(done, total)
+    if cancel is not None and cancel.is_set():
+        raise ExportCancelled()
+
+
+def write_members_csv(f, store, rows, fields, names, progress=None, cancel=None):
+    """将成员数据按CSV格式逐块写入文本流
+
+    Args:
+        f: 以 newline='' 打开的文本流
+        store: MemberStore
+        rows: 要导出的成员行
+        fields: 字段列表
+        names: 字段名称列表（CSV表头）
+        progress: 进度回调 progress(已写出行数, 总行数)
+        cancel: threading.Event，被设置时停止写入并抛出 ExportCancelled
+    """
+    writer = csv.writer(f)
+    # 写入CSV头部
+    writer.writerow(names)
+    
+    # 写入成员数据
+    total = len(rows)
+    done = 0
+    for chunk in store.projection(fields).chunks(rows):
+        export_checkpoint(done, total, progress, cancel)
+        writer.writerows(chunk)
+        done += len(chunk)
+    if progress is not None:
+        progress(done, total)
+
+
+def write_members_json(f, store, rows, fields, names, progress=None, cancel=None):
+    """将成员数据按JSON数组逐个元素写入文本流
+
+    不在内存中构建完整的导出数据；输出格式与 json.dump(..., ensure_ascii=False, indent=2) 相同。
+    参数同 write_members_csv，names 为各字段在JSON中的键名。
+    """
+    total = len(rows)
+    if not total:
+        f.write("[]")
+        return
+    
+    # 字段名只编码一次，每个值单独编码
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    prefixes = [f"    {encode(name)}: " for name in names]
+    
+    f.write("[")
+    separator = "\n"
+    done = 0
+    for chunk in store.projection(fields).chunks(rows):
+        export_checkpoint(done, total, progress, cancel)
+        for values in chunk:
+            if prefixes:
+                body = ",\n".join([prefix + encode(value) for prefix, value in zip(prefixes, values)])
+                f.write(f"{separator}  {{\n{body}\n  }}")
+            else:
+                f.write(f"{separator}  {{}}")
+            separator = ",\n"
+        done += len(chunk)
+    f.write("\n]")
+    if progress is not None:
+        progress(done, total)
+
+
+def build_archive_entry(members, details, fields, export_format):
+    """将一个群的成员序列化并用gzip压缩（在导出所有群的子进程中执行）
+
+    Args:
+        members: 群成员列表
+        details: {QQ号: 成员详情}
+        fields: 导出的字段列表
+        export_format: "csv" 或 "json"
+
+    Returns:
+        (成员数, 压缩后的数据)
+    """
+    store = MemberStore(members, details)
+    rows = store.sort_order('role')
+    names = [MEMBER_FIELDS[field].name for field in fields]
+    buffer = io.StringIO(newline='')
+    if export_format == "csv":
+        write_members_csv(buffer, store, rows, fields, names)
+        data = buffer.getvalue().encode('utf-8-sig')
+    else:
+        write_members_json(buffer, store, rows, fields, names)
+        data = buffer.getvalue().encode('utf-8')
+    return len(store), gzip.compress(data)
+
+
+class MemberSearchIndex:
+    """成员搜索索引
+
+    对QQ号、昵称和群名片（小写）建立1~3字的n-gram倒排索引。查询时取查询词的n-gram
+    对应行的交集，再用子串匹配确认，避免每次按键都扫描全部成员。
+    """
+    
+    MAX_GRAM = 3
+    
+    def __init__(self, store):
+        self.keys = [
+            (str(store.user_ids[row]), store.nicknames[row].lower(), store.cards[row].lower())
+            for row in range(len(store))
+        ]
+        self.postings = {}  # n-gram -> 包含它的行（升序，不重复）
+        postings = self.postings
+        for row, texts in enumerate(self.keys):
+            grams = set()
+            for text in texts:
+                for n in range(1, self.MAX_GRAM + 1):
+                    for i in range(len(text) - n + 1):
+                        grams.add(text[i:i + n])
+            for gram in grams:
+                rows = postings.get(gram)
+                if rows is None:
+                    postings[gram] = [row]
+                else:
+                    rows.append(row)
+    
+    def search(self, query):
+        """返回匹配查询词的行集合"""
+        query = query.strip().lower()
+        if not query:
+            return set(range(len(self.keys)))
+        n = min(len(query), self.MAX_GRAM)
+        grams = {query[i:i + n] for i in range(len(query) - n + 1)}
+        
+        # 从最短的倒排列表开始求交集
+        candidates = None
+        for gram in sorted(grams, key=lambda g: len(self.postings.get(g, ()))):
+            rows = self.postings.get(gram)
+            if not rows:
+                return set()
+            candidates = set(rows) if candidates is None else candidates.intersection(rows)
+            if not candidates:
+                return set()
+        
+        if len(query) <= self.MAX_GRAM:
+            return candidates
+        # 较长的查询词需要确认是连续的子串
+        keys = self.keys
+        return {row for row in candidates if any(query in text for text in keys[row])}
+
+
+class MemberStore:
+    """列式群成员数据
+
+    每次获取成员列表后构建一次，之后不再修改。QQ号、时间戳、等级等保存为紧凑的整数数组，
+    角色和性别保存为枚举值，字符串经过驻留(intern)；显示用的字符串在首次使用时计算并缓存。
+    表格、排序、筛选和导出都从这里读取数据，不再保留原始的成员字典。
+    """
+    
+    # 各列的属性名
+    COLUMNS = ('user_ids', 'join_times', 'last_sent_times', 'roles', 'sexes', 'ages', 'qq_levels',
+               'nicknames', 'cards', 'areas', 'levels')
+    
+    def __init__(self, members=(), details=None):
+        """
+        Args:
+            members: /get_group_member_list 返回的成员列表
+            details: 可选的 {QQ号: 成员详情}，其中的详情字段覆盖成员列表中的值
+        """
+        if details:
+            members = [self.merge_detail(m, details.get(int(m.get('user_id') or 0))) for m in members]
+        intern = sys.intern
+        self.user_ids = array('q', (int(m.get('user_id') or 0) for m in members))
+        self.join_times = array('q', (int(m.get('join_time') or 0) for m in members))
+        self.last_sent_times = array('q', (int(m.get('last_sent_time') or 0) for m in members))
+        self.roles = array('b', (ROLE_CODES.get(m.get('role'), ROLE_MEMBER) for m in members))
+        self.sexes = array('b', (SEX_CODES.get(m.get('sex'), 2) for m in members))
+        self.ages = array('i', (self._int_or_missing(m.get('age')) for m in members))
+        self.qq_levels = array('i', (self._int_or_missing(m.get('qq_level')) for m in members))
+        self.nicknames = [intern(m.get('nickname') or '') for m in members]
+        self.cards = [intern(m.get('card') or '') for m in members]
+        self.areas = [intern(m.get('area') or '') for m in members]
+        self.levels = [intern(str(m.get('level') or '')) for m in members]
+        self.size = len(self.user_ids)
+        
+        self._display = {}  # 字段 -> 各行的显示字符串缓存
+        self._getters = {}  # 字段 -> 取导出值的函数
+        self._orders = {}  # (排序字段, 是否降序) -> 行顺序
+        self._search_index = None
+        self._user_rows = None  # QQ号 -> 行
+    
+    @staticmethod
+    def merge_detail(member, detail):
+        """用成员详情中的非空字段覆盖成员列表中的对应字段"""
+        if not detail:
+            return member
+        merged = dict(member)
+        for field in DETAIL_FIELDS:
+            value = detail.get(field)
+            if value not in (None, ''):
+                merged[field] = value
+        return merged
+    
+    def with_details(self, details):
+        """返回合并了成员详情的新 MemberStore"""
+        return MemberStore([self.member(row) for row in range(self.size)], details)
+    
+    def _copy(self):
+        """复制各列得到新的 MemberStore，缓存不复制"""
+        store = MemberStore()
+        for name in self.COLUMNS:
+            setattr(store, name, getattr(self, name)[:])
+        store.size = self.size
+        return store
+    
+    def with_member(self, member):
+        """返回加入或更新了一名成员的新 MemberStore（用于按事件增量更新）
+        
+        只复制各列而不重新解析全部成员；已在群内的成员保持原来的行号，新成员追加到末尾。
+        """
+        single = MemberStore([member])
+        row = self.user_rows().get(single.user_ids[0])
+        store = self._copy()
+        for name in self.COLUMNS:
+            column = getattr(store, name)
+            if row is None:
+                column.append(getattr(single, name)[0])
+            else:
+                column[row] = getattr(single, name)[0]
+        store.size = len(store.user_ids)
+        return store
+    
+    def without_user(self, user_id):
+        """返回移除了一名成员的新 MemberStore，不在群内时返回自身"""
+        row = self.user_rows().get(user_id)
+        if row is None:
+            return self
+        store = self._copy()
+        for name in self.COLUMNS:
+            del getattr(store, name)[row]
+        store.size -= 1
+        return store
+    
+    @staticmethod
+    def _int_or_missing(value):
+        try:
+            return int(value) if value not in (None, '') else MISSING
+        except (TypeError, ValueError):
+            return MISSING
+    
+    def __len__(self):
+        return self.size
+    
+    def __eq__(self, other):
+        if not isinstance(other, MemberStore):
+            return NotImplemented
+        return (self.user_ids == other.user_ids and
+                self.join_times == other.join_times and
+                self.last_sent_times == other.last_sent_times and
+                self.roles == other.roles and
+                self.sexes == other.sexes and
+                self.ages == other.ages and
+                self.qq_levels == other.qq_levels and
+                self.nicknames == other.nicknames and
+                self.cards == other.cards and
+                self.areas == other.areas and
+                self.levels == other.levels)
+    
+    __hash__ = None
+    
+    def _display_cache(self, field):
+        cache = self._display.get(field)
+        if cache is None:
+            cache = self._display[field] = [None] * self.size
+        return cache
+    
+    def getter(self, field):
+        """返回 row -> 导出值 的函数，按字段注册表构建一次后缓存"""
+        getter = self._getters.get(field)
+        if getter is None:
+            spec = MEMBER_FIELDS[field]
+            column = getattr(self, spec.column)
+            convert = spec.convert
+            if convert is None:
+                getter = column.__getitem__
+            elif spec.cached:
+                # 转换结果即显示字符串，与表格共用缓存
+                cache = self._display_cache(field)
+                
+                def getter(row):
+                    text = cache[row]
+                    if text is None:
+                        text = cache[row] = convert(column[row])
+                    return text
+            else:
+                def getter(row):
+                    return convert(column[row])
+            self._getters[field] = getter
+        return getter
+    
+    def display_getter(self, field):
+        """返回 row -> 显示字符串 的函数，显示字符串首次计算后缓存"""
+        getter = self.getter(field)
+        if MEMBER_FIELDS[field].cached:
+            return getter
+        cache = self._display_cache(field)
+        
+        def display(row):
+            text = cache[row]
+            if text is None:
+                text = cache[row] = str(getter(row))
+            return text
+        return display
+    
+    def projection(self, fields):
+        """返回若干字段的 FieldProjection"""
+        return FieldProjection(self, fields)
+    
+    def value(self, field, row):
+        """返回指定行某字段的导出值"""
+        return self.getter(field)(row)
+    
+    def display(self, field, row):
+        """返回指定行某字段的显示字符串（首次计算后缓存）"""
+        return self.display_getter(field)(row)
+    
+    def member(self, row):
+        """将指定行还原为成员字典"""
+        return {
+            'user_id': self.user_ids[row],
+            'nickname': self.nicknames[row],
+            'card': self.cards[row],
+            'join_time': self.join_times[row],
+            'last_sent_time': self.last_sent_times[row],
+            'role': ROLE_KEYS[self.roles[row]],
+            'sex': SEX_KEYS[self.sexes[row]],
+            'age': self.value('age', row),
+            'area': self.areas[row],
+            'level': self.levels[row],
+            'qq_level': self.value('qq_level', row)
+        }
+    
+    def sort_order(self, field, descending=False):
+        """返回按某字段排序后的行顺序；按角色排序时同一角色内按加群时间排序"""
+        key = (field, descending)
+        order = self._orders.get(key)
+        if order is None:
+            with TRACER.span('sort', field, rows=self.size, descending=descending):
+                if field == 'role':
+                    keys = list(zip(self.roles, self.join_times))
+                else:
+                    keys = getattr(self, MEMBER_FIELDS[field].column)
+                order = self._orders[key] = array('i', sorted(range(self.size), key=keys.__getitem__,
+                                                              reverse=descending))
+        return order
+    
+    def search_index(self):
+        """返回成员搜索索引（首次使用时构建）"""
+        if self._search_index is None:
+            with TRACER.span('store', 'search_index', rows=self.size):
+                self._search_index = MemberSearchIndex(self)
+        return self._search_index
+    
+    def memory_usage(self, seen=None):
+        """估算占用的内存，返回 (各列字节数, 显示缓存、排序和索引字节数)
         
-        main_layout.addLayout(button_layout)
+        Args:
+            seen: 已计入对象的 id 集合，估算同一群的多份数据时共享的部分只计一次
+        """
+        seen = set() if seen is None else seen
+        columns = sum(object_size(getattr(self, name), seen) for name in self.COLUMNS)
+        caches = sum(object_size(cache, seen) for cache in (self._display, self._orders, self._user_rows))
+        index = self._search_index
+        if index is not None:
+            caches += object_size(index.keys, seen) + object_size(index.postings, seen)
+        return columns, caches
+    
+    def search(self, query):
+        """搜索QQ号、昵称或群名片包含查询词的成员，返回行集合"""
+        return self.search_index().search(query)
+    
+    def rows_with_roles(self, roles):
+        """返回角色属于给定角色集合的行"""
+        codes = {ROLE_CODES[role] for role in roles}
+        return [row for row, code in enumerate(self.roles) if code in codes]
+    
+    def rows_active_since(self, timestamp):
+        """返回最后发言时间晚于给定时间戳的行"""
+        return [row for row, sent in enumerate(self.last_sent_times) if sent > timestamp]
+    
+    def user_rows(self):
+        """返回 QQ号 -> 行 的映射（首次使用时构建）"""
+        if self._user_rows is None:
+            self._user_rows = {user_id: row for row, user_id in enumerate(self.user_ids)}
+        return self._user_rows
+    
+    def rows_of_users(self, user_ids):
+        """按给定顺序返回这些QQ号所在的行，不在群内的QQ号被忽略"""
+        user_rows = self.user_rows()
+        return [user_rows[user_id] for user_id in user_ids if user_id in user_rows]
+    
+    def display_name(self, row):
+        """成员的显示名称：有群名片时使用群名片，否则使用昵称"""
+        return self.cards[row] or self.nicknames[row]
+    
+    def diff(self, previous):
+        """与同一群之前的成员数据比较，返回 MemberChange 列表
         
-        # 如果是深色主题，设置对话框背景色
-        if self.theme == "深色主题":
-            self.setStyleSheet("background-color: #353535; color: #cccccc;")
+        以QQ号为键做集合比较，只需线性时间；成员、角色和群名片都未变化时直接比较数组返回。
+        """
+        if (previous.user_ids == self.user_ids and previous.roles == self.roles and
+                previous.cards == self.cards):
+            return []
+        
+        old_rows = previous.user_rows()
+        new_rows = self.user_rows()
+        changes = []
+        for user_id, row in new_rows.items():
+            old_row = old_rows.get(user_id)
+            if old_row is None:
+                changes.append(MemberChange(CHANGE_JOIN, user_id, '', self.display_name(row)))
+                continue
+            if previous.roles[old_row] != self.roles[row]:
+                changes.append(MemberChange(CHANGE_ROLE, user_id, ROLE_KEYS[previous.roles[old_row]],
+                                            ROLE_KEYS[self.roles[row]]))
+            if previous.cards[old_row] != self.cards[row]:
+                changes.append(MemberChange(CHANGE_CARD, user_id, previous.cards[old_row], self.cards[row]))
+        for user_id, old_row in old_rows.items():
+            if user_id not in new_rows:
+                changes.append(MemberChange(CHANGE_LEAVE, user_id, previous.display_name(old_row), ''))
+        return changes
+
+
+class UserGroupIndex:
+    """跨群成员索引：QQ号 -> 所在的群及在群内的角色、群名片和最后发言时间
+
+    以群为单位加入或替换各群的成员数据。每个群只保留 MemberStore 中查询用到的
+    QQ号、角色、群名片和最后发言时间四列（MemberStore 构建后各列不再修改，直接引用而不复制），
+    不保留昵称等其他列、显示缓存和搜索索引，已同步的群再多也只占很少的内存。
+    索引中保存 QQ号 -> {群号: 行}，查询时再从对应群的列读取数据。只在界面线程中访问。
+    """
     
-    def get_settings(self):
-        """获取设置值"""
-        settings = {
-            'url': self.url_entry.text().strip(),
-            'token': self.token_entry.text().strip(),
-            'theme': self.theme_combo.currentText(),
-            'cache_time': int(self.cache_time_entry.text() or 30),
-            'page_size': int(self.page_size_entry.text() or 50)
-        }
-        return settings
+    def __init__(self):
+        self._columns = {}  # 群号 -> (QQ号列, 角色列, 群名片列, 最后发言时间列)
+        self._fetched_at = {}  # 群号 -> 数据获取时间
+        self._users = {}  # QQ号 -> {群号: 行}
+    
+    @property
+    def group_count(self):
+        return len(self._columns)
+    
+    @property
+    def user_count(self):
+        return len(self._users)
+    
+    def has_group(self, group_id):
+        return group_id in self._columns
+    
+    def columns(self):
+        """返回已索引的各群数据 {群号: (QQ号列, 角色列, 群名片列, 最后发言时间列)}"""
+        return dict(self._columns)
+    
+    def memory_usage(self):
+        """估算索引本身（不含各群的列）占用的字节数"""
+        return object_size(self._users, set()) + object_size(self._fetched_at, set())
+    
+    def update_group(self, group_id, store, fetched_at=0):
+        """加入或替换某个群的成员数据，比已索引数据更旧时忽略，返回是否已更新"""
+        columns = (store.user_ids, store.roles, store.cards, store.last_sent_times)
+        old = self._columns.get(group_id)
+        if old is not None and all(a is b for a, b in zip(old, columns)):
+            return False
+        if fetched_at < self._fetched_at.get(group_id, 0):
+            return False
+        self._fetched_at[group_id] = fetched_at
+        users = self._users
+        if old is not None:
+            for user_id in old[0]:
+                groups = users.get(user_id)
+                if groups is not None:
+                    groups.pop(group_id, None)
+                    if not groups:
+                        del users[user_id]
+        
+        self._columns[group_id] = columns
+        for row, user_id in enumerate(store.user_ids):
+            groups = users.get(user_id)
+            if groups is None:
+                users[user_id] = {group_id: row}
+            else:
+                groups[group_id] = row
+        return True
+    
+    def lookup(self, user_id):
+        """返回该QQ号所在的群，每项为 (群号, 角色代码, 群名片, 最后发言时间)，按角色、最后发言时间排序"""
+        entries = []
+        for group_id, row in self._users.get(user_id, {}).items():
+            _, roles, cards, last_sent_times = self._columns[group_id]
+            entries.append((group_id, roles[row], cards[row], last_sent_times[row]))
+        entries.sort(key=lambda entry: (entry[1], -entry[3]))
+        return entries
 
 
-class GroupListItem(QListWidgetItem):
-    """自定义群列表项，用于存储群信息"""
+class MemberTableModel(QAbstractTableModel):
+    """群成员表格模型
+
+    视图只为可见行请求数据，配合固定行高的 QTableView，大型群无需分页即可流畅滚动，
+    每个可见行占用的内存恒定。数据来自 MemberStore，显示字符串由其缓存。
+    """
     
-    def __init__(self, group_data):
-        # 显示名称: 群名称 (成员数/最大成员数)
-        display_text = f"{group_data['group_name']} ({group_data['member_count']}/{group_data['max_member_count']})"
-        super().__init__(display_text)
-        
-        # 存储完整的群信息
-        self.group_data = group_data
-        
-        # 设置工具提示，显示更多信息
-        tooltip = f"群ID: {group_data['group_id']}\n群名称: {group_data['group_name']}\n成员数: {group_data['member_count']}/{group_data['max_member_count']}"
-        if group_data.get('group_remark'):
-            tooltip += f"\n群备注: {group_data['group_remark']}"
+    FIELDS = ["user_id", "nickname", "card", "join_time", "last_sent_time", "role"]
+    HEADERS = [MEMBER_FIELDS[field].name for field in FIELDS]
+    
+    # 角色的背景色（普通成员使用默认颜色）
+    ROLE_COLORS = (
+        QBrush(QColor(255, 200, 200)),  # 浅红色
+        QBrush(QColor(200, 200, 255)),  # 浅蓝色
+        None
+    )
+    # 深色主题下调整颜色，减少对比度
+    DARK_ROLE_COLORS = (
+        QBrush(QColor(120, 60, 60)),  # 深红色
+        QBrush(QColor(60, 60, 120)),  # 深蓝色
+        None
+    )
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._store = MemberStore()
+        self._cells = [self._store.display_getter(field) for field in self.FIELDS]  # 各列取显示字符串的函数
+        self._rows = array('i')  # 显示顺序 -> 数据行
+        self._sort_field = 'role'
+        self._sort_descending = False
+        self._filter = None  # 搜索匹配的行集合，None表示不过滤
+        self._role_colors = self.ROLE_COLORS
+    
+    def set_store(self, store, row_filter=None):
+        """替换全部成员数据，保持当前排序方式
         
-        self.setToolTip(tooltip)
+        Args:
+            store: MemberStore
+            row_filter: 只显示的行集合，None表示显示全部
+        """
+        self.beginResetModel()
+        self._store = store
+        self._cells = [store.display_getter(field) for field in self.FIELDS]
+        self._filter = row_filter
+        self._update_rows()
+        self.endResetModel()
+    
+    def set_filter(self, row_filter):
+        """只显示给定的行集合，None表示显示全部"""
+        self.beginResetModel()
+        self._filter = row_filter
+        self._update_rows()
+        self.endResetModel()
+    
+    def _update_rows(self):
+        order = self._store.sort_order(self._sort_field, self._sort_descending)
+        if self._filter is None:
+            self._rows = order
+        else:
+            row_filter = self._filter
+            self._rows = array('i', [row for row in order if row in row_filter])
+    
+    def set_theme(self, theme):
+        """根据主题切换角色背景色"""
+        self._role_colors = self.DARK_ROLE_COLORS if theme == "深色主题" else self.ROLE_COLORS
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(len(self._rows) - 1, len(self.HEADERS) - 1),
+                                  [Qt.BackgroundRole])
+    
+    def memory_usage(self):
+        """估算表格模型自身（显示顺序和搜索结果）占用的字节数，不含 Qt 控件的内存"""
+        seen = set()
+        return object_size(self._rows, seen) + (object_size(self._filter, seen) if self._filter else 0)
+    
+    def store_row(self, row):
+        """返回显示行对应的数据行"""
+        return self._rows[row]
+    
+    def rows(self):
+        """按当前显示顺序返回所有数据行"""
+        return list(self._rows)
+    
+    def member(self, row):
+        """返回指定显示行的成员数据"""
+        return self._store.member(self._rows[row])
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.beginResetModel()
+        self._sort_field = self.FIELDS[column]
+        self._sort_descending = order == Qt.DescendingOrder
+        self._update_rows()
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        
+        if role == Qt.DisplayRole:
+            return self._cells[index.column()](row)
+        elif role == Qt.BackgroundRole:
+            return self._role_colors[self._store.roles[row]]
+        return None
+    
+    def flags(self, index):
+        # 表格只读
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+
+class MemberTableView(QTableView):
+    """成员表格视图，记录每次绘制可见区域的耗时"""
+    
+    def paintEvent(self, event):
+        with TRACER.span('render', 'paint', rows=self.model().rowCount() if self.model() else 0):
+            super().paintEvent(event)
 
 
 class GroupMemberGUI(QMainWindow):
@@ -648,6 +3332,24 @@ class GroupMemberGUI(QMainWindow):
         # 加载用户设置
         self.load_settings()
         
+        # API客户端（复用连接池）
+        self.client = self.create_client()
+        
+        # 请求策略（超时、重试、熔断）
+        self.policy = RequestPolicy(self.settings.get('timeout', 30), self.settings.get('max_retries', 3))
+        
+        # 异步请求引擎（单线程事件循环 + 并发上限）
+        self.engine = RequestEngine(self.client, self.settings.get('max_concurrency', 8), self.policy)
+        
+        # 本地快照存储
+        self.store = SnapshotStore(self.snapshot_db_path(), self.settings.get('change_retention', 90) * 86400)
+        
+        # 导出文件的写入线程（与请求引擎的线程池分开，长时间的导出不占用请求的线程）
+        self.export_executor = ThreadPoolExecutor(max_workers=1)
+        
+        # 内存分析（开启 tracemalloc 跟踪后记录每次加载和导出前后的内存变化）
+        self.memory_profiler = MemoryProfiler()
+        
         # 设置基本配置
         self.api = '/get_group_member_list'
         self.api_user_detail = '/get_group_member_info'  # 用户详情API
@@ -655,18 +3357,54 @@ class GroupMemberGUI(QMainWindow):
         self.api_ban = '/set_group_ban'  # 禁言API
         self.api_group_list = '/get_group_list'  # 新增：群列表API
         
-        self.member_data = []  # 用于存储成员数据，便于导出
+        self.member_data = MemberStore()  # 当前群的列式成员数据，供表格和导出使用
+        self.member_fetched_at = 0  # 当前成员数据的获取时间
+        self.current_group_id = None  # 当前加载的群号
+        self.revalidating = False  # 是否正在后台刷新缓存数据
         self.group_info = None  # 用于存储群信息
         self.group_list = []  # 新增：用于存储群列表
         self.group_list_last_update = 0  # 新增：群列表最后更新时间
         
-        # 分页控制
-        self.current_page = 0  # 当前页码(从0开始)
-        self.total_pages = 0  # 总页数
+        # 加载代次：每次选择群都会递增，过期的请求结果会被丢弃
+        self.load_generation = 0
+        self.load_futures = []  # 当前加载中的请求
+        
+        # 成员详情批量补全任务
+        self.enrich_future = None
+        self.enrich_progress = None  # 进度对话框
+        self.enrich_callback = None  # 补全完成后的回调（如继续导出）
+        self.enrich_base = None  # 补全开始时当前群的成员数据，补全后在其基础上合并详情
+        
+        # 批量禁言任务
+        self.bulk_ban_future = None
+        
+        # 后台导出任务及其取消标志（导出在线程池中执行，通过标志通知其停止）
+        self.export_future = None
+        self.export_cancel = None
+        
+        # 跨群成员索引及同步所有群的任务
+        self.user_index = UserGroupIndex()
+        self.sync_future = None
+        
+        # 最近更新的若干个群上一次获取的成员数据，按更新顺序排列，用于检测成员变化（只在请求引擎线程中修改）
+        self.previous_members = {}
+        
+        # 事件上报：接收服务，以及按事件修改的各群原始成员列表（只在请求引擎线程中访问）
+        self.event_listener = None
+        # 群号 -> [{QQ号: 成员}, 数据时间]；保存快照时其他线程可能正在编码这些成员，修改时整个替换条目而不改动原字典
+        self.event_members = {}
+        self.event_locks = {}  # 群号 -> asyncio.Lock，同一群的事件依次应用
+        self.event_pending_saves = set()  # 等待保存快照的群号
+        
+        # 后台刷新调度：用本地快照的获取时间初始化，按请求预算定时刷新已缓存的群
+        self.refresh_scheduler = RefreshScheduler(self.settings.get('refresh_interval', 15) * 60,
+                                                  self.settings.get('refresh_budget', 30))
+        self.refresh_scheduler.seed(self.store.load_member_list_times())
         
         # 信号桥接器
         self.signal_bridge = SignalBridge()
         self.signal_bridge.update_data_signal.connect(self.update_ui_with_data)
+        self.signal_bridge.cached_data_signal.connect(self.on_cached_snapshot)
         self.signal_bridge.error_signal.connect(self.show_error)
         self.signal_bridge.status_signal.connect(self.update_status)
         self.signal_bridge.enable_button_signal.connect(self.set_button_state)
@@ -674,11 +3412,34 @@ class GroupMemberGUI(QMainWindow):
         self.signal_bridge.update_group_info_signal.connect(self.update_group_info)
         self.signal_bridge.ban_result_signal.connect(self.handle_ban_result)
         self.signal_bridge.update_group_list_signal.connect(self.update_group_list)  # 新增：连接群列表信号
+        self.signal_bridge.cached_group_list_signal.connect(self.on_cached_group_list)
+        self.signal_bridge.load_finished_signal.connect(self.on_load_finished)
+        self.signal_bridge.enrich_progress_signal.connect(self.on_enrich_progress)
+        self.signal_bridge.enrich_finished_signal.connect(self.on_enrich_finished)
+        self.signal_bridge.bulk_ban_progress_signal.connect(self.on_bulk_ban_progress)
+        self.signal_bridge.bulk_ban_finished_signal.connect(self.on_bulk_ban_finished)
+        self.signal_bridge.sync_group_signal.connect(self.on_sync_group)
+        self.signal_bridge.sync_progress_signal.connect(self.on_sync_progress)
+        self.signal_bridge.sync_finished_signal.connect(self.on_sync_finished)
+        self.signal_bridge.member_changes_signal.connect(self.on_member_changes)
+        self.signal_bridge.export_progress_signal.connect(self.on_export_progress)
+        self.signal_bridge.export_finished_signal.connect(self.on_export_finished)
+        self.signal_bridge.archive_finished_signal.connect(self.on_archive_finished)
+        self.signal_bridge.group_event_signal.connect(self.on_group_event)
+        self.signal_bridge.refresh_done_signal.connect(self.on_background_refresh_done)
         
         # 初始化 UI
         self.init_ui()
         self.apply_theme(self.settings.get('theme', '蓝色主题'))
         
+        # 按设置接收事件上报
+        self.start_event_listener()
+        
+        # 后台刷新定时器
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh_tick)
+        self.update_refresh_timer()
+        
         # 自动加载群列表
         self.fetch_group_list()
         
@@ -692,10 +3453,40 @@ class GroupMemberGUI(QMainWindow):
             'url': settings.value("url", "http://192.168.10.8:3000/"),
             'token': settings.value("token", "token666"),
             'theme': settings.value("theme", "蓝色主题"),
-            'page_size': int(settings.value("page_size", 50)),
-            'cache_time': int(settings.value("cache_time", 30))
+            'cache_time': int(settings.value("cache_time", 30)),
+            'pool_size': int(settings.value("pool_size", 10)),
+            'timeout': int(settings.value("timeout", 30)),
+            'max_concurrency': int(settings.value("max_concurrency", 8)),
+            'max_retries': int(settings.value("max_retries", 3)),
+            'sync_concurrency': int(settings.value("sync_concurrency", 4)),
+            'bulk_rate': int(settings.value("bulk_rate", 200)),
+            'ban_rate': max(1, int(settings.value("ban_rate", 5))),
+            'stale_while_revalidate': settings.value("stale_while_revalidate", True, type=bool),
+            'trace_overlay': settings.value("trace_overlay", False, type=bool),
+            'background_refresh': settings.value("background_refresh", True, type=bool),
+            'refresh_interval': int(settings.value("refresh_interval", 15)),
+            'refresh_budget': int(settings.value("refresh_budget", 30)),
+            'change_retention': int(settings.value("change_retention", 90)),
+            'event_listen': settings.value("event_listen", False, type=bool),
+            'event_host': settings.value("event_host", "127.0.0.1"),
+            'event_port': int(settings.value("event_port", 8090)),
+            'event_secret': settings.value("event_secret", "")
         }
     
+    def snapshot_db_path(self):
+        """本地快照数据库路径"""
+        data_dir = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+        return os.path.join(data_dir, "snapshots.db")
+    
+    def create_client(self):
+        """根据当前设置创建API客户端"""
+        return NapCatClient(
+            self.settings.get('url'),
+            self.settings.get('token'),
+            pool_size=self.settings.get('pool_size', 10),
+            timeout=self.settings.get('timeout', 30)
+        )
+    
     def save_settings(self):
         """保存用户设置"""
         settings = QSettings("QQBot", "GroupManager")
@@ -720,6 +3511,40 @@ class GroupMemberGUI(QMainWindow):
         self.status_label = QLabel("就绪")
         self.statusBar.addWidget(self.status_label)
         
+        # 缓存数据新旧程度
+        self.cache_age_label = QLabel("")
+        self.statusBar.addPermanentWidget(self.cache_age_label)
+        
+        # 请求队列：进行中和按优先级排队的请求数，空闲时隐藏
+        self.queue_label = QLabel("")
+        self.queue_label.hide()
+        self.statusBar.addPermanentWidget(self.queue_label)
+        self.queue_timer = QTimer(self)
+        self.queue_timer.timeout.connect(self.update_queue_status)
+        self.queue_timer.start(500)
+        
+        # 后台导出进度，导出时才显示
+        self.export_progress_bar = QProgressBar()
+        self.export_progress_bar.setMaximumWidth(200)
+        self.export_progress_bar.setFormat("导出 %v/%m")
+        self.export_progress_bar.hide()
+        self.statusBar.addPermanentWidget(self.export_progress_bar)
+        self.export_cancel_button = QPushButton("取消导出")
+        self.export_cancel_button.clicked.connect(self.cancel_export)
+        self.export_cancel_button.hide()
+        self.statusBar.addPermanentWidget(self.export_cancel_button)
+        
+        # 性能概览：各阶段最近一次的耗时，在“视图 → 性能概览”中开启
+        self.trace_label = QLabel("")
+        self.trace_label.hide()
+        self.statusBar.addPermanentWidget(self.trace_label)
+        self.trace_timer = QTimer(self)
+        self.trace_timer.timeout.connect(self.update_trace_overlay)
+        self.set_trace_overlay(self.settings.get('trace_overlay', False))
+        self.cache_age_timer = QTimer(self)
+        self.cache_age_timer.timeout.connect(self.update_cache_age)
+        self.cache_age_timer.start(30 * 1000)
+        
         # 主窗口部件
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -761,9 +3586,14 @@ class GroupMemberGUI(QMainWindow):
         left_layout.addLayout(search_layout)
         
         # 群聊列表
-        self.group_list_widget = QListWidget()
-        self.group_list_widget.itemClicked.connect(self.on_group_selected)
-        left_layout.addWidget(self.group_list_widget)
+        self.group_list_model = GroupListModel(self)
+        self.group_filter_model = GroupFilterProxyModel(self)
+        self.group_filter_model.setSourceModel(self.group_list_model)
+        self.group_list_view = QListView()
+        self.group_list_view.setModel(self.group_filter_model)
+        self.group_list_view.setUniformItemSizes(True)
+        self.group_list_view.clicked.connect(self.on_group_selected)
+        left_layout.addWidget(self.group_list_view)
         
         # 将左侧面板添加到分割器
         splitter.addWidget(left_panel)
@@ -818,66 +3648,50 @@ class GroupMemberGUI(QMainWindow):
         self.member_list_box = CollapsibleBox("群成员列表", name="member_list")
         member_list_layout = QVBoxLayout()
         
-        # 创建一个可滚动区域
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        
-        # 创建内容区域
-        table_container = QWidget()
-        table_layout = QVBoxLayout(table_container)
-        table_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # 表格设置
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["QQ号", "昵称", "群名片", "加群时间", "最后发言时间", "角色"])
+        # 成员搜索框，输入停顿后再搜索
+        self.member_search_input = QLineEdit()
+        self.member_search_input.setPlaceholderText("搜索成员（QQ号/昵称/群名片）...")
+        self.member_search_input.setClearButtonEnabled(True)
+        self.member_search_timer = QTimer(self)
+        self.member_search_timer.setSingleShot(True)
+        self.member_search_timer.setInterval(150)
+        self.member_search_timer.timeout.connect(self.filter_members)
+        self.member_search_input.textChanged.connect(self.member_search_timer.start)
+        member_list_layout.addWidget(self.member_search_input)
+        
+        # 表格模型与视图：只渲染可见行，无需分页
+        self.member_model = MemberTableModel(self)
+        self.table = MemberTableView()
+        self.table.setModel(self.member_model)
         
         # 表格样式设置
         self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.ExtendedSelection)  # 支持Ctrl/Shift多选，用于批量禁言
         self.table.horizontalHeader().setStretchLastSection(True)
         
         # 设置调整模式
-        for i in range(6):
+        for i in range(self.member_model.columnCount()):
             self.table.horizontalHeader().setSectionResizeMode(i, QHeaderView.Stretch)
         
-        # 为空表格添加10行占位行
-        self.table.setRowCount(10)
-        for i in range(10):
-            for j in range(6):
-                self.table.setItem(i, j, QTableWidgetItem(""))
+        # 点击表头排序，默认按角色排序（同一角色内按加群时间）
+        self.table.horizontalHeader().setSortIndicator(5, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
         
-        # 设置文字自动换行
-        self.table.setWordWrap(True)
+        # 固定行高，滚动时无需逐行计算高度
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(28)
         
         # 连接双击事件
-        self.table.cellDoubleClicked.connect(self.on_cell_double_clicked)
-        
-        # 添加表格到容器
-        table_layout.addWidget(self.table)
-        
-        # 将容器设置为滚动区域的内容
-        scroll_area.setWidget(table_container)
+        self.table.doubleClicked.connect(self.on_cell_double_clicked)
         
-        # 添加滚动区域到成员列表布局
-        member_list_layout.addWidget(scroll_area)
+        # 右键菜单
+        self.table.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.table.customContextMenuRequested.connect(self.show_member_context_menu)
         
-        # 分页控制区域
-        pagination_layout = QHBoxLayout()
-        self.prev_page_btn = QPushButton("上一页")
-        self.prev_page_btn.clicked.connect(self.prev_page)
-        self.next_page_btn = QPushButton("下一页")
-        self.next_page_btn.clicked.connect(self.next_page)
-        self.page_info_label = QLabel("第 1 页 / 共 1 页")
-        
-        pagination_layout.addStretch()
-        pagination_layout.addWidget(self.prev_page_btn)
-        pagination_layout.addWidget(self.page_info_label)
-        pagination_layout.addWidget(self.next_page_btn)
-        pagination_layout.addStretch()
-        
-        member_list_layout.addLayout(pagination_layout)
+        # 添加表格到成员列表布局
+        member_list_layout.addWidget(self.table)
         
         # 设置成员列表的内容布局
         self.member_list_box.setContentLayout(member_list_layout)
@@ -917,6 +3731,11 @@ class GroupMemberGUI(QMainWindow):
         export_action.triggered.connect(self.export_members)
         file_menu.addAction(export_action)
         
+        # 导出所有群的成员到一个压缩包
+        export_all_action = QAction("导出所有群", self)
+        export_all_action.triggered.connect(self.export_all_groups)
+        file_menu.addAction(export_all_action)
+        
         file_menu.addSeparator()
         
         # 退出
@@ -932,6 +3751,52 @@ class GroupMemberGUI(QMainWindow):
         refresh_action.triggered.connect(self.refresh_members)
         view_menu.addAction(refresh_action)
         
+        # 批量补全成员详情
+        enrich_action = QAction("补全成员详情", self)
+        enrich_action.triggered.connect(self.enrich_current_members)
+        view_menu.addAction(enrich_action)
+        
+        view_menu.addSeparator()
+        
+        # 同步所有群的成员
+        self.sync_action = QAction("同步所有群", self)
+        self.sync_action.triggered.connect(self.sync_all_groups)
+        view_menu.addAction(self.sync_action)
+        
+        # 查找成员所在的群
+        user_groups_action = QAction("查找成员所在的群", self)
+        user_groups_action.triggered.connect(lambda: self.show_user_groups())
+        view_menu.addAction(user_groups_action)
+        
+        # 成员变化记录
+        changes_action = QAction("成员变化记录", self)
+        changes_action.triggered.connect(self.show_member_changes)
+        view_menu.addAction(changes_action)
+        
+        view_menu.addSeparator()
+        
+        # 请求统计
+        stats_action = QAction("请求统计", self)
+        stats_action.triggered.connect(self.show_request_stats)
+        view_menu.addAction(stats_action)
+        
+        # 内存分析
+        memory_action = QAction("内存分析", self)
+        memory_action.triggered.connect(self.show_memory_profile)
+        view_menu.addAction(memory_action)
+        
+        # 性能概览（状态栏显示各阶段耗时）
+        self.trace_action = QAction("性能概览", self)
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(self.settings.get('trace_overlay', False))
+        self.trace_action.toggled.connect(self.set_trace_overlay)
+        view_menu.addAction(self.trace_action)
+        
+        # 导出计时数据
+        trace_export_action = QAction("导出性能跟踪", self)
+        trace_export_action.triggered.connect(self.export_trace)
+        view_menu.addAction(trace_export_action)
+        
         # 设置菜单
         settings_menu = menu_bar.addMenu("设置")
         
@@ -967,6 +3832,19 @@ class GroupMemberGUI(QMainWindow):
         export_action.triggered.connect(self.export_members)
         toolbar.addAction(export_action)
         
+        toolbar.addSeparator()
+        
+        # 批量禁言按钮
+        bulk_ban_action = QAction("批量禁言", self)
+        bulk_ban_action.setToolTip("禁言表格中选中的成员")
+        bulk_ban_action.triggered.connect(self.bulk_ban_selected)
+        toolbar.addAction(bulk_ban_action)
+        
+        bulk_unban_action = QAction("解除禁言", self)
+        bulk_unban_action.setToolTip("解除表格中选中成员的禁言")
+        bulk_unban_action.triggered.connect(self.bulk_unban_selected)
+        toolbar.addAction(bulk_unban_action)
+        
         # 添加伸缩空间
         spacer = QWidget()
         spacer.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
@@ -994,7 +3872,11 @@ class GroupMemberGUI(QMainWindow):
             theme_changed = new_settings['theme'] != self.settings.get('theme')
             url_changed = new_settings['url'] != self.settings.get('url')
             token_changed = new_settings['token'] != self.settings.get('token')
-            page_size_changed = new_settings['page_size'] != self.settings.get('page_size')
+            connection_changed = (new_settings['pool_size'] != self.settings.get('pool_size') or
+                                  new_settings['timeout'] != self.settings.get('timeout'))
+            concurrency_changed = new_settings['max_concurrency'] != self.settings.get('max_concurrency')
+            event_changed = any(new_settings[key] != self.settings.get(key)
+                                for key in ('event_listen', 'event_host', 'event_port', 'event_secret'))
             
             # 更新设置
             self.settings = new_settings
@@ -1002,6 +3884,31 @@ class GroupMemberGUI(QMainWindow):
             # 保存设置
             self.save_settings()
             
+            # 更新请求策略（策略只在请求引擎的事件循环线程中访问）
+            self.engine.loop.call_soon_threadsafe(self.policy.configure, self.settings['timeout'],
+                                                  self.settings['max_retries'])
+            
+            # 如果连接参数改变，重建API客户端
+            if url_changed or token_changed or connection_changed:
+                self.client.close()
+                self.client = self.create_client()
+                self.engine.client = self.client
+            
+            # 如果并发上限改变，在运行中调整请求引擎（进行中的任务不受影响）
+            if concurrency_changed:
+                self.engine.set_max_concurrency(self.settings['max_concurrency'])
+            
+            # 如果事件上报设置改变，重新启动接收服务
+            if event_changed:
+                self.start_event_listener()
+            
+            # 更新成员变化记录的保留时间
+            self.store.change_retention = self.settings['change_retention'] * 86400
+            
+            # 更新后台刷新的间隔和预算
+            self.refresh_scheduler.configure(self.settings['refresh_interval'] * 60, self.settings['refresh_budget'])
+            self.update_refresh_timer()
+            
             # 如果主题改变了，应用新主题
             if theme_changed:
                 self.apply_theme(self.settings['theme'])
@@ -1009,10 +3916,139 @@ class GroupMemberGUI(QMainWindow):
             # 如果URL或Token改变，刷新群列表
             if url_changed or token_changed:
                 self.fetch_group_list()
-            
-            # 如果页面大小改变，更新表格
-            if page_size_changed and self.member_data:
-                self.update_table()
+    
+    def show_request_stats(self):
+        """显示各接口的重试、熔断和请求合并统计"""
+        state_names = {
+            CircuitBreaker.CLOSED: "正常",
+            CircuitBreaker.OPEN: "熔断中",
+            CircuitBreaker.HALF_OPEN: "试探中"
+        }
+        try:
+            stats = self.engine.call(self.policy.stats)
+        except Exception as e:
+            self.show_error("请求统计", f"读取请求统计失败: {str(e)}")
+            return
+        lines = []
+        for api, state, sent, retries, trips, fast_fails in stats:
+            lines.append(f"{api}\n    状态: {state_names[state]}  发送: {sent}次  重试: {retries}次  "
+                         f"熔断: {trips}次  快速失败: {fast_fails}次")
+        if not lines:
+            lines.append("暂无请求记录")
+        lines.append(f"\n合并的重复请求: {self.engine.coalesced_count}次")
+        scheduler = self.refresh_scheduler
+        scheduler.record_requests(self.policy.sent_total)
+        if self.settings.get('background_refresh', True):
+            lines.append(f"后台刷新: 最近一分钟请求 {scheduler.used()}/{scheduler.budget}次  "
+                         f"跟踪 {scheduler.tracked_count()}个群  待刷新 {len(scheduler.due())}个群  "
+                         f"刷新中 {scheduler.in_flight_count()}个群")
+        else:
+            lines.append("后台刷新: 已关闭")
+        QMessageBox.information(self, "请求统计", "\n".join(lines))
+    
+    def show_memory_profile(self):
+        """显示内存分析面板"""
+        group_names = {str(group.get('group_id')): group.get('group_name', '') for group in self.group_list}
+        dialog = MemoryProfileDialog(self, self.memory_profiler, self.memory_footprint, group_names,
+                                     self.settings.get('theme'))
+        dialog.show()
+    
+    def memory_footprint(self):
+        """估算各群成员数据及其他缓存占用的内存（在界面线程中调用）
+        
+        同一群可能在跨群索引、当前表格和成员变化检测中保存了不同版本的数据，共享的部分只计一次。
+        返回 (各群 [(群号, 成员数, 列式数据, 缓存与索引, 事件原始数据)], 其他 [(项目, 字节数, 说明)])。
+        """
+        stores = {}  # 群号 -> {id: MemberStore}
+        sources = [dict(self.previous_members).items()]
+        if self.current_group_id:
+            sources.append([(self.current_group_id, self.member_data)])
+        for items in sources:
+            for group_id, store in items:
+                stores.setdefault(group_id, {})[id(store)] = store
+        indexed = self.user_index.columns()
+        event_members = dict(self.event_members)
+        
+        groups = []
+        for group_id in set(stores) | set(indexed) | set(event_members):
+            seen = set()
+            count = columns = caches = raw = 0
+            # 跨群索引只引用各群的部分列，与完整数据共享的列只计一次
+            if group_id in indexed:
+                count = len(indexed[group_id][0])
+                columns += sum(object_size(column, seen) for column in indexed[group_id])
+            for store in stores.get(group_id, {}).values():
+                # 其他线程可能正在填充显示缓存，统计时遇到修改则重试
+                for _ in range(3):
+                    try:
+                        store_columns, store_caches = store.memory_usage(seen)
+                        break
+                    except RuntimeError:
+                        continue
+                else:
+                    store_columns = store_caches = 0
+                count = max(count, len(store))
+                columns += store_columns
+                caches += store_caches
+            if group_id in event_members:
+                try:
+                    raw = object_size(event_members[group_id][0], seen)
+                except RuntimeError:
+                    pass
+            groups.append((group_id, count, columns, caches, raw))
+        
+        others = [
+            ("跨群索引", self.user_index.memory_usage(), f"{self.user_index.user_count} 个QQ号的所在群（不含各群数据）"),
+            ("表格模型", self.member_model.memory_usage(), "显示顺序和搜索结果（Qt 控件的内存不在统计范围内）"),
+            ("群列表", object_size(self.group_list, set()), f"{len(self.group_list)} 个群"),
+            ("计时记录", object_size(TRACER.spans(), set()), "性能跟踪保留的计时区间")
+        ]
+        exports = [record for record in self.memory_profiler.records() if record.kind in ("导出", "导出所有群")]
+        if exports:
+            record = exports[-1]
+            others.append(("导出缓冲", record.peak if record.peak is not None else record.retained,
+                           f"最近一次{record.kind}（{record.label}）期间的峰值"))
+        return groups, others
+    
+    def set_trace_overlay(self, enabled):
+        """显示或隐藏状态栏中的性能概览"""
+        self.settings['trace_overlay'] = enabled
+        self.trace_label.setVisible(enabled)
+        if enabled:
+            self.update_trace_overlay()
+            self.trace_timer.start(1000)
+        else:
+            self.trace_timer.stop()
+    
+    def update_trace_overlay(self):
+        """在状态栏显示各类别最近一次的耗时，悬停时显示耗时最多的区间汇总"""
+        latest = TRACER.latest()
+        parts = [f"{label} {latest[category].duration * 1000:.1f}ms"
+                 for category, label in TRACE_CATEGORIES.items() if category in latest]
+        self.trace_label.setText("  ".join(parts) if parts else "暂无计时数据")
+        
+        lines = [f"最近: {TRACE_CATEGORIES[span.category]} {span.name} {span.duration * 1000:.1f}ms"
+                 for span in latest.values()]
+        summary = TRACER.summary()[:10]
+        if summary:
+            lines.append("\n累计耗时最多:")
+            lines.extend(f"{TRACE_CATEGORIES[category]} {name}  {count}次  共{total * 1000:.1f}ms  "
+                         f"最长{longest * 1000:.1f}ms" for category, name, count, total, longest in summary)
+        self.trace_label.setToolTip("\n".join(lines))
+    
+    def export_trace(self):
+        """将计时数据导出为 Chrome 跟踪格式的JSON文件"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出性能跟踪", f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json", "JSON文件 (*.json)")
+        if not file_path:
+            return
+        try:
+            TRACER.save(file_path)
+        except OSError as e:
+            self.show_error("导出错误", f"导出性能跟踪时发生错误:\n{e}")
+            return
+        QMessageBox.information(self, "导出成功", f"已导出 {len(TRACER.spans())} 个计时区间到:\n{file_path}\n\n"
+                                "可在 Chrome 的 chrome://tracing 或 ui.perfetto.dev 中打开")
     
     def show_about(self):
         """显示关于对话框"""
@@ -1032,111 +4068,130 @@ class GroupMemberGUI(QMainWindow):
         current_time = time.time()
         cache_time_seconds = self.settings.get('cache_time', 30) * 60  # 转换为秒
         
+        # 内存中没有群列表时，先在请求引擎中读取本地快照
+        if not self.group_list:
+            self.engine.submit(self.load_group_list_snapshot(force))
+            return
+        
         if not force and self.group_list and (current_time - self.group_list_last_update) < cache_time_seconds:
             # 使用缓存数据
             self.update_group_list(self.group_list)
+            self.update_cache_age()
             return
         
+        # 缓存已过期：先显示旧数据，再在后台刷新
+        if self.group_list and self.settings.get('stale_while_revalidate', True):
+            self.update_group_list(self.group_list)
+            self.update_cache_age()
+        
         # 更新状态
         self.signal_bridge.status_signal.emit("正在获取群列表...")
         
-        # 后台线程获取群列表
-        thread = threading.Thread(target=self.do_fetch_group_list)
-        thread.daemon = True
-        thread.start()
+        # 在请求引擎中获取群列表
+        self.engine.submit(self.do_fetch_group_list())
+    
+    async def load_group_list_snapshot(self, force=False):
+        """在工作线程中读取群列表的本地快照：未过期时直接显示，否则（允许时先显示旧数据）重新获取
+        
+        Args:
+            force: 是否强制刷新，忽略缓存
+        """
+        cached = await self.engine.run_blocking(self.store.load_group_list)
+        if cached:
+            data, fetched_at = cached
+            fresh = not force and time.time() - fetched_at < self.settings.get('cache_time', 30) * 60
+            if fresh or self.settings.get('stale_while_revalidate', True):
+                self.signal_bridge.cached_group_list_signal.emit(data, fetched_at)
+            if fresh:
+                return
+        self.signal_bridge.status_signal.emit("正在获取群列表...")
+        await self.do_fetch_group_list()
+    
+    def on_cached_group_list(self, data, fetched_at):
+        """显示本地快照中的群列表，已获取到更新的群列表时忽略"""
+        if fetched_at <= self.group_list_last_update:
+            return
+        self.group_list, self.group_list_last_update = data, fetched_at
+        self.update_group_list(data)
+        self.update_cache_age()
     
-    def do_fetch_group_list(self):
-        """在后台线程中获取群列表数据"""
+    async def do_fetch_group_list(self, silent=False):
+        """在请求引擎中获取群列表数据
+        
+        Args:
+            silent: 是否为后台刷新，后台刷新不更新状态栏，失败时也不提示
+        """
         try:
-            # 获取URL和Token
-            url = self.settings.get('url')
-            token = self.settings.get('token')
-            
-            # 构建请求
-            full_url = url + self.api_group_list
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {token}'
-            }
-            
             # 发送请求
-            response = requests.post(full_url, json={}, headers=headers)
-            response.raise_for_status()
-            result = response.json()
+            result = await self.engine.request(self.api_group_list,
+                                               priority=PRIORITY_BACKGROUND if silent else PRIORITY_NORMAL)
             
             # 处理响应数据
             if 'data' in result and isinstance(result['data'], list):
                 # 更新缓存时间
                 self.group_list_last_update = time.time()
+                await self.engine.run_blocking(self.store.save_group_list, result['data'],
+                                               self.group_list_last_update)
                 # 保存群列表数据
                 self.group_list = result['data']
-                # 发送信号更新UI
+                # 发送信号更新UI：按界面实际显示的数据比较，没有变化时由群列表模型跳过
+                # （本地快照已过期且未先显示旧数据时，内存中的群列表与界面不一致）
                 self.signal_bridge.update_group_list_signal.emit(result['data'])
                 # 恢复状态
-                self.signal_bridge.status_signal.emit("就绪")
-            else:
+                if not silent:
+                    self.signal_bridge.status_signal.emit("就绪")
+            elif not silent:
                 self.signal_bridge.error_signal.emit("错误", "返回的群列表格式不正确")
         
         except requests.exceptions.RequestException as e:
-            self.signal_bridge.error_signal.emit("请求错误", str(e))
+            if not silent:
+                self.signal_bridge.error_signal.emit("请求错误", str(e))
         except json.JSONDecodeError:
-            self.signal_bridge.error_signal.emit("解析错误", "响应不是有效的JSON格式")
+            if not silent:
+                self.signal_bridge.error_signal.emit("解析错误", "响应不是有效的JSON格式")
         except Exception as e:
-            self.signal_bridge.error_signal.emit("错误", str(e))
+            if not silent:
+                self.signal_bridge.error_signal.emit("错误", str(e))
     
     def update_group_list(self, data):
         """更新群列表UI显示"""
-        # 保存当前选中的项目
-        current_row = self.group_list_widget.currentRow()
-        current_group_id = None
-        if current_row >= 0:
-            item = self.group_list_widget.item(current_row)
-            if isinstance(item, GroupListItem):
-                current_group_id = item.group_data.get('group_id')
-        
-        # 清空列表
-        self.group_list_widget.clear()
-        
-        # 填充群列表
-        for group in data:
-            item = GroupListItem(group)
-            self.group_list_widget.addItem(item)
-        
-        # 如果之前有选中的项目，尝试恢复选中状态
-        if current_group_id:
-            for i in range(self.group_list_widget.count()):
-                item = self.group_list_widget.item(i)
-                if isinstance(item, GroupListItem) and item.group_data.get('group_id') == current_group_id:
-                    self.group_list_widget.setCurrentRow(i)
-                    break
+        # 保存当前选中的群
+        current_group = self.selected_group_data()
+        
+        # 数据没有变化时无需更新
+        if not self.group_list_model.set_groups(data):
+            return
+        self.group_filter_model.refresh()
+        
+        # 如果之前有选中的群，通过群号索引恢复选中状态
+        if current_group and not self.group_list_view.currentIndex().isValid():
+            row = self.group_list_model.row_of(current_group.get('group_id'))
+            if row >= 0:
+                index = self.group_filter_model.mapFromSource(self.group_list_model.index(row))
+                self.group_list_view.setCurrentIndex(index)
     
     def filter_group_list(self):
         """根据搜索框内容过滤群列表"""
-        search_text = self.search_input.text().lower()
-        
-        # 如果搜索框为空，显示所有群
-        if not search_text:
-            for i in range(self.group_list_widget.count()):
-                self.group_list_widget.item(i).setHidden(False)
-            return
-        
-        # 否则根据搜索内容过滤
-        for i in range(self.group_list_widget.count()):
-            item = self.group_list_widget.item(i)
-            if isinstance(item, GroupListItem):
-                group_data = item.group_data
-                # 在群名称、群ID或群备注中搜索
-                name_match = search_text in group_data.get('group_name', '').lower()
-                id_match = search_text in str(group_data.get('group_id', '')).lower()
-                remark_match = search_text in group_data.get('group_remark', '').lower()
-                
-                # 如果匹配则显示，否则隐藏
-                item.setHidden(not (name_match or id_match or remark_match))
+        self.group_filter_model.set_query(self.search_input.text())
+    
+    def selected_group_data(self):
+        """返回当前选中群的信息，没有选中时返回None"""
+        index = self.group_list_view.currentIndex()
+        if not index.isValid():
+            return None
+        return index.data(GroupListModel.GROUP_DATA_ROLE)
     
-    def on_group_selected(self, item):
+    def selected_group_id(self):
+        """返回当前选中群的群号（字符串），没有选中时返回None"""
+        group_data = self.selected_group_data()
+        if group_data and group_data.get('group_id'):
+            return str(group_data.get('group_id'))
+        return None
+    
+    def on_group_selected(self, index):
         """处理群列表项目点击事件"""
-        if isinstance(item, GroupListItem):
-            group_data = item.group_data
+        group_data = index.data(GroupListModel.GROUP_DATA_ROLE)
+        if group_data:
             group_id = group_data.get('group_id')
             
             if group_id:
@@ -1150,59 +4205,89 @@ class GroupMemberGUI(QMainWindow):
         """获取所有群相关信息"""
         # 如果没有提供群ID，则获取当前选中的群
         if not group_id:
-            current_row = self.group_list_widget.currentRow()
-            if current_row >= 0:
-                item = self.group_list_widget.item(current_row)
-                if isinstance(item, GroupListItem):
-                    group_id = str(item.group_data.get('group_id'))
+            group_id = self.selected_group_id()
             
         if not group_id:
             self.show_error("错误", "请先选择一个群")
             return
         
-        # 禁用按钮
+        generation = self.begin_load()
+        self.refresh_scheduler.note_viewed(group_id)
+        if group_id != self.current_group_id:
+            self.member_data = MemberStore()
+            self.member_model.set_store(self.member_data)
+        self.current_group_id = group_id
+        
+        # 禁用按钮；允许使用缓存时，请求引擎发出请求后读取本地快照并先行显示（见 on_cached_snapshot），
+        # 否则清空表格等待网络数据
+        use_cache = self.settings.get('stale_while_revalidate', True)
         self.signal_bridge.enable_button_signal.emit(False)
         self.signal_bridge.status_signal.emit("查询中...")
+        self.revalidating = False
+        if not use_cache:
+            self.member_fetched_at = 0
+            self.member_model.set_store(MemberStore())
+        self.update_cache_age()
+        
+        # 并发获取群信息和成员信息
+        self.track_load([
+            self.engine.submit(self.fetch_group_info(group_id, generation, use_cache)),
+            self.engine.submit(self.do_fetch_request(group_id, generation, use_cache))
+        ])
+    
+    def on_cached_snapshot(self, snapshot):
+        """显示本地快照中的成员列表，网络数据到达前在后台刷新"""
+        if self.is_stale(snapshot.generation):
+            return
+        self.update_ui_with_data(snapshot)
+        self.revalidating = True
+        self.update_cache_age()
+        self.signal_bridge.status_signal.emit("已显示缓存数据，正在后台刷新...")
+    
+    def begin_load(self):
+        """开始新一轮加载，返回新的加载代次（旧代次的结果随即视为过期）"""
+        self.load_generation += 1
+        return self.load_generation
+    
+    def track_load(self, futures):
+        """记录本轮加载的请求，并取消上一轮仍在进行的请求
         
-        # 清空表格
-        self.table.setRowCount(0)
-        
-        # 创建两个后台线程分别获取群信息和成员信息
-        group_info_thread = threading.Thread(target=self.fetch_group_info, args=(group_id,))
-        group_info_thread.daemon = True
-        group_info_thread.start()
-        
-        members_thread = threading.Thread(target=self.do_fetch_request, args=(group_id,))
-        members_thread.daemon = True
-        members_thread.start()
+        新请求先于取消提交，这样与旧请求相同的新请求（如加载中点击刷新）可以直接合并。
+        """
+        previous = self.load_futures
+        self.load_futures = futures
+        for future in previous:
+            future.cancel()
+    
+    def is_stale(self, generation):
+        """判断某一代次的加载结果是否已过期"""
+        return generation != self.load_generation
     
     def refresh_members(self):
         """刷新当前群的成员列表"""
         # 获取当前选中的群
-        current_row = self.group_list_widget.currentRow()
-        if (current_row >= 0):
-            item = self.group_list_widget.item(current_row)
-            if isinstance(item, GroupListItem):
-                group_id = str(item.group_data.get('group_id'))
-                self.fetch_all_info(group_id)
+        group_id = self.selected_group_id()
+        if group_id:
+            self.fetch_all_info(group_id)
         else:
             self.show_error("错误", "请先选择一个群")
     
     def apply_theme(self, theme_name):
         """应用不同的主题样式"""
         app = QApplication.instance()
+        self.member_model.set_theme(theme_name)
         
         if theme_name == "默认主题":
             app.setStyle(QStyleFactory.create("Fusion"))
             # 重置调色板为默认
             app.setPalette(app.style().standardPalette())
             self.table.setStyleSheet("""
-                QTableWidget {
+                QTableView {
                     gridline-color: #d0d0d0;
                     color: #000000;
                     font-size: 12px;
                 }
-                QTableWidget::item {
+                QTableView::item {
                     border-bottom: 1px solid #e0e0e0;
                     padding: 5px;
                 }
@@ -1232,12 +4317,12 @@ class GroupMemberGUI(QMainWindow):
             palette.setColor(QPalette.HighlightedText, QColor(255, 255, 255))
             app.setPalette(palette)
             self.table.setStyleSheet("""
-                QTableWidget {
+                QTableView {
                     gridline-color: #d0d0d0;
                     color: #000000;
                     font-size: 12px;
                 }
-                QTableWidget::item {
+                QTableView::item {
                     border-bottom: 1px solid #e0e0e0;
                     padding: 5px;
                 }
@@ -1268,13 +4353,13 @@ class GroupMemberGUI(QMainWindow):
             palette.setColor(QPalette.HighlightedText, Qt.black)
             app.setPalette(palette)
             self.table.setStyleSheet("""
-                QTableWidget {
+                QTableView {
                     gridline-color: #505050;
                     color: #cccccc;  /* 更改为淡灰色，而不是纯白色，减轻视觉疲劳 */
                     font-size: 12px;
                     background-color: #303030;  /* 表格背景稍微深一点 */
                 }
-                QTableWidget::item {
+                QTableView::item {
                     border-bottom: 1px solid #505050;
                     padding: 5px;
                 }
@@ -1306,12 +4391,12 @@ class GroupMemberGUI(QMainWindow):
             palette.setColor(QPalette.HighlightedText, QColor(255, 255, 255))
             app.setPalette(palette)
             self.table.setStyleSheet("""
-                QTableWidget {
+                QTableView {
                     gridline-color: #d0d0d0;
                     color: #000000;
                     font-size: 12px;
                 }
-                QTableWidget::item {
+                QTableView::item {
                     border-bottom: 1px solid #e0e0e0;
                     padding: 5px;
                 }
@@ -1337,42 +4422,52 @@ class GroupMemberGUI(QMainWindow):
         self.signal_bridge.status_signal.emit("查询中...")
         
         # 清空表格
-        self.table.setRowCount(0)
+        self.member_model.set_store(MemberStore())
         
-        # 后台线程发送请求
-        thread = threading.Thread(target=self.do_fetch_request, args=(group_id,))
-        thread.daemon = True
-        thread.start()
+        # 在请求引擎中发送请求
+        generation = self.begin_load()
+        self.track_load([self.engine.submit(self.do_fetch_request(group_id, generation))])
     
-    def do_fetch_request(self, group_id):
+    async def do_fetch_request(self, group_id, generation, use_cache=False):
+        """获取群成员列表，结果以不可变快照发布给界面线程
+        
+        Args:
+            group_id: 群号
+            generation: 加载代次
+            use_cache: 是否在等待响应期间先发布本地快照（总是先于网络数据发布）
+        """
         try:
             # 构建请求
-            url = self.settings.get('url')
-            token = self.settings.get('token')
-            full_url = url + self.api
             body_json = {
                 "group_id": group_id,
                 "no_cache": False
             }
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {token}'
-            }
             
-            # 发送请求
-            response = requests.post(full_url, json=body_json, headers=headers)
-            response.raise_for_status()
-            result = response.json()
+            # 发送请求，若已选择了其他群则不再解析响应
+            request = asyncio.ensure_future(self.engine.request(self.api, body_json,
+                                                                is_stale=lambda: self.is_stale(generation)))
+            try:
+                if use_cache:
+                    await self.publish_cached_members(group_id, generation)
+                result = await request
+            finally:
+                request.cancel()
             
             # 处理响应数据
             if 'data' in result and isinstance(result['data'], list):
-                self.member_data = result['data']  # 保存数据以便导出
+                fetched_at = time.time()
                 
-                # 更新UI
-                self.signal_bridge.update_data_signal.emit(result['data'])
+                # 在工作线程中构建列式数据和搜索索引，发布快照，由界面线程保存
+                members = await self.load_member_store("打开群", group_id, result['data'], fetched_at)
+                await self.engine.run_blocking(members.search_index)
+                snapshot = MemberSnapshot(group_id, generation, members, fetched_at)
+                self.signal_bridge.update_data_signal.emit(snapshot)
             else:
                 self.signal_bridge.error_signal.emit("错误", "返回数据格式不正确")
         
+        except (StaleRequestError, asyncio.CancelledError):
+            # 已被更新的加载取代，静默放弃
+            return
         except requests.exceptions.RequestException as e:
             self.signal_bridge.error_signal.emit("请求错误", str(e))
         except json.JSONDecodeError:
@@ -1381,147 +4476,145 @@ class GroupMemberGUI(QMainWindow):
             self.signal_bridge.error_signal.emit("错误", str(e))
         
         # 恢复按钮状态
+        self.signal_bridge.load_finished_signal.emit(generation)
         self.signal_bridge.enable_button_signal.emit(True)
         self.signal_bridge.status_signal.emit("就绪")
     
-    def update_ui_with_data(self, data):
-        # 按角色排序：先群主，然后管理员，最后普通成员
-        # 定义角色优先级（数字越小优先级越高）
-        role_priority = {
-            'owner': 0,    # 群主最高
-            'admin': 1,    # 管理员其次
-            'member': 2    # 普通成员最低
-        }
-        
-        # 对数据进行排序
-        sorted_data = sorted(data, key=lambda x: (
-            role_priority.get(x.get('role', 'member'), 2),  # 首先按角色排序
-            x.get('join_time', 0)  # 同一角色内按加群时间排序
-        ))
-        
-        # 保存排序后的数据
-        self.member_data = sorted_data
-        
-        # 更新分页信息
-        self.total_pages = (len(self.member_data) + self.settings.get('page_size', 50) - 1) // self.settings.get('page_size', 50)
-        self.current_page = 0  # 重置为第一页
-        self.update_table()
-    
-    def update_table(self):
-        """更新表格显示当前页的数据"""
-        # 获取分页大小
-        page_size = self.settings.get('page_size', 50)
-        
-        start_index = self.current_page * page_size
-        end_index = min(start_index + page_size, len(self.member_data))
-        current_page_data = self.member_data[start_index:end_index]
+    async def publish_cached_members(self, group_id, generation):
+        """在工作线程中读取群成员列表的本地快照并构建列式数据，发布给界面线程先行显示"""
+        cached = await self.engine.run_blocking(self.store.load_member_list, group_id)
+        if not cached or self.is_stale(generation):
+            return
+        members = await self.engine.run_blocking(self.build_member_store, group_id, cached[0])
+        self.signal_bridge.cached_data_signal.emit(MemberSnapshot(group_id, generation, members, cached[1]))
+    
+    async def load_member_store(self, kind, group_id, data, fetched_at):
+        """构建列式成员数据并保存快照、记录成员变化；开启内存分析时记录这次加载前后的内存变化
         
-        # 清除占位数据
-        self.table.setRowCount(0)
+        Args:
+            kind: 加载方式（内存分析记录中显示），如“打开群”“同步”
+            group_id: 群号
+            data: 接口返回的成员列表
+            fetched_at: 获取时间
+        """
+        with self.memory_profiler.measure(kind, group_id):
+            members = await self.engine.run_blocking(self.build_member_store, group_id, data)
+            await self.save_member_snapshot(group_id, data, members, fetched_at)
+        return members
+    
+    async def save_member_snapshot(self, group_id, data, members, fetched_at):
+        """保存群成员列表快照，并与该群的上一份快照比较，记录成员变化
         
-        # 设置表格行数
-        self.table.setRowCount(max(10, len(current_page_data)))  # 最少显示10行，保持美观
+        上一份快照优先使用内存中的数据（只在请求引擎的事件循环线程中访问），
+        没有时（如程序刚启动，或该群已不在最近更新的群中）再从本地快照读取；该群第一次获取时不记录变化。
         
-        # 定义角色的颜色标记
-        role_colors = {
-            '群主': QColor(255, 200, 200),  # 浅红色
-            '管理员': QColor(200, 200, 255),  # 浅蓝色
-            '成员': None  # 默认颜色
-        }
+        Args:
+            group_id: 群号
+            data: 接口返回的成员列表
+            members: 由 data 构建的 MemberStore
+            fetched_at: 获取时间
+        """
+        previous = self.previous_members.get(group_id)
+        if previous is None:
+            cached = await self.engine.run_blocking(self.store.load_member_list, group_id)
+            # 读取期间可能已有同一群的新快照
+            previous = self.previous_members.get(group_id)
+            if previous is None and cached:
+                previous = await self.engine.run_blocking(MemberStore, cached[0])
+        self.remember_members(group_id, members)
+        # 已在按事件更新的群改用新获取的成员列表
+        if group_id in self.event_members:
+            # 复制各成员：data 是共享的请求结果，事件只替换其中的条目而不修改原字典
+            self.event_members[group_id] = [{int(m.get('user_id') or 0): dict(m) for m in data}, fetched_at]
+        
+        changes = (await self.engine.run_blocking(TRACER.wrap('store', 'diff', members.diff), previous)
+                   if previous is not None else [])
+        await self.engine.run_blocking(TRACER.wrap('store', 'save_member_list', self.store.save_member_list),
+                                       group_id, data, fetched_at)
+        if changes:
+            await self.engine.run_blocking(self.store.save_member_changes, group_id, changes, fetched_at)
+            self.signal_bridge.member_changes_signal.emit(group_id, changes)
+    
+    def remember_members(self, group_id, store):
+        """保存群最近一次的成员数据作为下次比较的基准（在请求引擎线程中调用）
         
-        # 获取当前主题，以便正确处理深色模式下的颜色
-        current_theme = self.settings.get('theme', '蓝色主题')
+        只保留最近更新的 PREVIOUS_MEMBERS_LIMIT 个群，同步所有群时不会把每个群的完整数据都留在内存中；
+        被移除的群下次比较时从本地快照读取。
+        """
+        previous = self.previous_members
+        previous.pop(group_id, None)
+        previous[group_id] = store
+        while len(previous) > PREVIOUS_MEMBERS_LIMIT:
+            del previous[next(iter(previous))]
+    
+    def build_member_store(self, group_id, members):
+        """构建列式成员数据，合并本地保存的成员详情（可在工作线程中调用）"""
+        with TRACER.span('store', 'build_member_store', rows=len(members)):
+            return MemberStore(members, self.store.load_member_details(group_id))
+    
+    def on_load_finished(self, generation):
+        """成员列表加载结束（无论成功与否），结束后台刷新状态"""
+        if not self.is_stale(generation):
+            self.revalidating = False
+            self.update_cache_age()
+    
+    def update_ui_with_data(self, snapshot):
+        """在界面线程中应用成员列表快照"""
+        # 过期的快照对其所属的群仍然有效，先更新跨群索引和后台刷新调度
+        self.user_index.update_group(snapshot.group_id, snapshot.members, snapshot.fetched_at)
+        self.refresh_scheduler.note_fetched(snapshot.group_id, snapshot.fetched_at)
+        
+        # 丢弃过期的快照
+        if self.is_stale(snapshot.generation):
+            return
         
-        # 填充表格数据
-        for i, member in enumerate(current_page_data):
-            # 处理时间戳为可读格式
-            join_time = datetime.fromtimestamp(member.get('join_time', 0)).strftime('%Y-%m-%d %H:%M:%S') if member.get('join_time') else "未知"
-            last_sent_time = datetime.fromtimestamp(member.get('last_sent_time', 0)).strftime('%Y-%m-%d %H:%M:%S') if member.get('last_sent_time') else "未知"
-            
-            # 角色转换为中文
-            role_map = {
-                'owner': '群主',
-                'admin': '管理员',
-                'member': '成员'
-            }
-            role = role_map.get(member.get('role', ''), '成员')
-            
-            # 创建表格项 - 使用自定义的表格项以支持换行
-            nickname_item = QTableWidgetItem(member.get('nickname', ''))
-            nickname_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            
-            card_item = QTableWidgetItem(member.get('card', ''))
-            card_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            
-            # 创建表格项
-            self.table.setItem(i, 0, QTableWidgetItem(str(member.get('user_id', ''))))
-            self.table.setItem(i, 1, nickname_item)
-            self.table.setItem(i, 2, card_item)
-            self.table.setItem(i, 3, QTableWidgetItem(join_time))
-            self.table.setItem(i, 4, QTableWidgetItem(last_sent_time))
-            self.table.setItem(i, 5, QTableWidgetItem(role))
-            
-            # 设置不同角色的背景色
-            bg_color = role_colors.get(role)
-            
-            if bg_color:
-                # 深色主题下调整颜色，减少对比度
-                if current_theme == "深色主题":
-                    if role == '群主':
-                        bg_color = QColor(120, 60, 60)  # 深红色
-                    elif role == '管理员':
-                        bg_color = QColor(60, 60, 120)  # 深蓝色
-                
-                # 设置背景色
-                for j in range(6):
-                    self.table.item(i, j).setBackground(bg_color)
-            
-            # 设置项目不可编辑
-            for j in range(6):
-                item = self.table.item(i, j)
-                if item:
-                    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+        self.member_fetched_at = snapshot.fetched_at
+        self.update_cache_age()
         
-        # 如果数据行数少于10，填充剩余的空行
-        if len(current_page_data) < 10:
-            for i in range(len(current_page_data), 10):
-                for j in range(6):
-                    self.table.setItem(i, j, QTableWidgetItem(""))
+        # 后台刷新得到的数据与当前显示的相同，无需重新渲染
+        if snapshot.members == self.member_data:
+            self.signal_bridge.enable_button_signal.emit(True)
+            return
         
-        # 调整行高以适应内容
-        self.table.resizeRowsToContents()
+        # 保存成员数据，排序由表格模型按当前排序方式完成（默认按角色、再按加群时间）
+        self.member_data = snapshot.members
+        self.update_table()
+    
+    def update_table(self):
+        """将成员数据交给表格模型显示"""
+        with TRACER.span('render', 'update_table', rows=len(self.member_data)):
+            self.member_model.set_store(self.member_data, self.member_search_rows())
         
         # 调整表格各列比例
         self.adjust_column_ratios()
         
-        # 计算总页数
-        page_size = self.settings.get('page_size', 50)
-        self.total_pages = (len(self.member_data) + page_size - 1) // page_size
-        
         # 更新成员数量信息到群成员列表标题栏
-        self.member_list_box.setTitle(f"群成员列表 ({len(self.member_data)}人)")
-        
-        # 更新分页信息标签
-        self.page_info_label.setText(f"第 {self.current_page + 1} 页 / 共 {self.total_pages} 页")
-        
-        # 更新分页按钮状态
-        self.prev_page_btn.setEnabled(self.current_page > 0)
-        self.next_page_btn.setEnabled(self.current_page < self.total_pages - 1)
+        self.update_member_title()
         
         # 恢复按钮状态
         self.signal_bridge.enable_button_signal.emit(True)
     
-    def prev_page(self):
-        """显示上一页"""
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.update_table()
+    def member_search_rows(self):
+        """根据成员搜索框内容返回匹配的行，未搜索时返回None"""
+        query = self.member_search_input.text().strip()
+        if not query:
+            return None
+        return self.member_data.search(query)
     
-    def next_page(self):
-        """显示下一页"""
-        if self.current_page < self.total_pages - 1:
-            self.current_page += 1
-            self.update_table()
+    def filter_members(self):
+        """根据成员搜索框内容过滤成员表格"""
+        with TRACER.span('render', 'filter_members', rows=len(self.member_data)):
+            self.member_model.set_filter(self.member_search_rows())
+        self.update_member_title()
+    
+    def update_member_title(self):
+        """更新群成员列表标题栏中的成员数量"""
+        total = len(self.member_data)
+        shown = self.member_model.rowCount()
+        if shown != total:
+            self.member_list_box.setTitle(f"群成员列表 (匹配 {shown} / 共 {total}人)")
+        else:
+            self.member_list_box.setTitle(f"群成员列表 ({total}人)")
     
     def export_members(self):
         """导出成员信息到CSV或JSON文件"""
@@ -1531,12 +4624,10 @@ class GroupMemberGUI(QMainWindow):
         
         # 获取当前选中的群ID，而不是从已移除的group_id_entry获取
         group_id = None
-        current_row = self.group_list_widget.currentRow()
-        if current_row >= 0:
-            item = self.group_list_widget.item(current_row)
-            if isinstance(item, GroupListItem):
-                group_id = str(item.group_data.get('group_id', '未知'))
-                group_name = item.group_data.get('group_name', '未知群')
+        group_data = self.selected_group_data()
+        if group_data:
+            group_id = str(group_data.get('group_id', '未知'))
+            group_name = group_data.get('group_name', '未知群')
         
         if not group_id:
             QMessageBox.warning(self, "警告", "未选择群，请先选择一个群")
@@ -1585,19 +4676,11 @@ class GroupMemberGUI(QMainWindow):
         fields_layout = QVBoxLayout()
         fields_group.setLayout(fields_layout)
         
-        # 定义可以导出的字段
+        # 定义可以导出的字段（名称来自字段注册表）
+        default_fields = {"user_id", "nickname", "card", "join_time", "last_sent_time", "role", "sex"}
         available_fields = [
-            {"name": "QQ号", "key": "user_id", "default": True},
-            {"name": "昵称", "key": "nickname", "default": True},
-            {"name": "群名片", "key": "card", "default": True},
-            {"name": "加群时间", "key": "join_time", "default": True},
-            {"name": "最后发言时间", "key": "last_sent_time", "default": True},
-            {"name": "角色", "key": "role", "default": True},
-            {"name": "性别", "key": "sex", "default": True},
-            {"name": "年龄", "key": "age", "default": False},
-            {"name": "地区", "key": "area", "default": False},
-            {"name": "QQ等级", "key": "qq_level", "default": False},
-            {"name": "群等级", "key": "level", "default": False}
+            {"name": spec.name, "key": spec.key, "default": spec.key in default_fields}
+            for spec in MEMBER_FIELDS.values()
         ]
         
         # 创建全选/全不选按钮
@@ -1638,6 +4721,19 @@ class GroupMemberGUI(QMainWindow):
         select_none_btn.clicked.connect(select_none)
         select_basic_btn.clicked.connect(select_basic)
         
+        # 详情字段只有成员详情接口才完整返回，导出前可先批量补全
+        enrich_checkbox = QCheckBox("导出前补全成员详情（性别、年龄、地区、QQ等级、群等级）")
+        enrich_checkbox.setToolTip("已补全过的成员会直接使用本地保存的详情")
+        fields_layout.addWidget(enrich_checkbox)
+        
+        def detail_field_toggled(checked):
+            # 勾选了详情字段时默认同时补全
+            if checked:
+                enrich_checkbox.setChecked(True)
+        
+        for key in ("age", "area", "qq_level", "level"):
+            field_checkboxes[key].toggled.connect(detail_field_toggled)
+        
         # 按钮区域
         button_layout = QHBoxLayout()
         cancel_button = QPushButton("取消")
@@ -1672,20 +4768,22 @@ class GroupMemberGUI(QMainWindow):
         # 处理导出选项
         export_format = "csv" if csv_radio.isChecked() else "json"
         
-        # 筛选数据
-        filtered_data = self.member_data.copy()
+        # 筛选数据：按表格当前的显示顺序导出
+        filtered_rows = self.member_model.rows()
         
         # 根据选择筛选数据
         if only_admin_radio.isChecked():
-            filtered_data = [m for m in filtered_data if m.get('role') in ['owner', 'admin']]
+            selected_rows = set(self.member_data.rows_with_roles(['owner', 'admin']))
+            filtered_rows = [row for row in filtered_rows if row in selected_rows]
         elif only_active_radio.isChecked():
             # 计算30天前的时间戳
             thirty_days_ago = int(time.time()) - (30 * 24 * 60 * 60)
-            filtered_data = [m for m in filtered_data if m.get('last_sent_time', 0) > thirty_days_ago]
+            selected_rows = set(self.member_data.rows_active_since(thirty_days_ago))
+            filtered_rows = [row for row in filtered_rows if row in selected_rows]
         # all_members_radio选中时使用所有数据，不需要额外处理
         
         # 如果筛选后没有数据
-        if not filtered_data:
+        if not filtered_rows:
             QMessageBox.warning(self, "警告", "根据选择的筛选条件，没有数据可导出")
             return
         
@@ -1714,104 +4812,904 @@ class GroupMemberGUI(QMainWindow):
         if not file_path:
             return  # 用户取消了导出
         
+        if enrich_checkbox.isChecked():
+            # 先补全成员详情，完成后按QQ号找回补全后数据中的行再导出
+            user_ids = [self.member_data.user_ids[row] for row in filtered_rows]
+            self.enrich_members(
+                group_id, user_ids,
+                lambda store: self.write_export(file_path, export_format, store.rows_of_users(user_ids),
+                                                selected_fields, selected_field_names, store))
+            return
+        
+        self.write_export(file_path, export_format, filtered_rows, selected_fields, selected_field_names)
+    
+    def write_export(self, file_path, export_format, rows, selected_fields, selected_field_names, store=None):
+        """在后台按格式写出导出文件，进度显示在状态栏中，完成后提示结果
+        
+        Args:
+            file_path: 导出文件路径
+            export_format: "csv" 或 "json"
+            rows: 要导出的成员行（MemberStore中的行号）
+            selected_fields: 选中的字段列表
+            selected_field_names: 选中的字段名称列表
+            store: 成员数据，默认为当前群的成员数据
+        """
+        if self.export_future is not None:
+            QMessageBox.warning(self, "警告", "正在导出，请等待当前导出完成或先取消")
+            return
+        
+        store = store if store is not None else self.member_data
+        self.export_cancel = threading.Event()
+        self.export_progress_bar.setRange(0, len(rows))
+        self.export_progress_bar.setValue(0)
+        self.export_progress_bar.show()
+        self.export_cancel_button.show()
+        self.signal_bridge.status_signal.emit(f"正在导出 {len(rows)} 名成员到 {os.path.basename(file_path)}...")
+        self.export_future = self.engine.submit(self.do_export(
+            file_path, export_format, rows, selected_fields, selected_field_names, store, self.export_cancel))
+    
+    def cancel_export(self):
+        """取消正在进行的导出，已写出的部分文件会被删除"""
+        if self.export_cancel is not None:
+            self.export_cancel.set()
+    
+    async def do_export(self, file_path, export_format, rows, selected_fields, selected_field_names, store, cancel):
+        """在导出线程中逐块写出导出文件"""
+        export = self.export_to_csv if export_format == "csv" else self.export_to_json
+        error = ""
+        cancelled = False
         try:
-            # 根据格式导出
-            if export_format == "csv":
-                self.export_to_csv(file_path, filtered_data, selected_fields, selected_field_names)
-            else:
-                self.export_to_json(file_path, filtered_data, selected_fields, selected_field_names)
-            
-            QMessageBox.information(self, "导出成功", f"成员信息已成功导出到:\n{file_path}")
+            with self.memory_profiler.measure("导出", os.path.basename(file_path)):
+                await self.engine.loop.run_in_executor(
+                    self.export_executor, export, file_path, rows, selected_fields, selected_field_names,
+                    store, self.signal_bridge.export_progress_signal.emit, cancel)
+        except ExportCancelled:
+            cancelled = True
+            try:
+                await self.engine.loop.run_in_executor(self.export_executor, os.remove, file_path)
+            except OSError:
+                pass
         except Exception as e:
-            self.show_error("导出错误", f"导出成员信息时发生错误:\n{str(e)}")
+            error = str(e)
+        self.signal_bridge.export_finished_signal.emit(file_path, len(rows), error, cancelled)
+    
+    def on_export_progress(self, done, total):
+        """更新导出进度"""
+        self.export_progress_bar.setValue(done)
+    
+    def on_export_finished(self, file_path, count, error, cancelled):
+        """导出结束：隐藏进度并提示结果"""
+        self.export_future = None
+        self.export_cancel = None
+        self.export_progress_bar.hide()
+        self.export_cancel_button.hide()
+        
+        if cancelled:
+            self.signal_bridge.status_signal.emit("已取消导出")
+        elif error:
+            self.signal_bridge.status_signal.emit("导出失败")
+            self.show_error("导出错误", f"导出成员信息时发生错误:\n{error}")
+        else:
+            self.signal_bridge.status_signal.emit(f"已导出 {count} 名成员")
+            QMessageBox.information(self, "导出成功", f"成员信息已成功导出到:\n{file_path}")
     
-    def export_to_json(self, file_path, data=None, selected_fields=None, selected_field_names=None):
+    def export_to_json(self, file_path, rows=None, selected_fields=None, selected_field_names=None, store=None,
+                       progress=None, cancel=None):
         """将成员数据导出为JSON文件
         
         Args:
             file_path: 导出文件路径
-            data: 要导出的数据，如果为None则使用self.member_data
+            rows: 要导出的成员行（MemberStore中的行号），如果为None则导出全部成员
             selected_fields: 选中的字段列表
             selected_field_names: 选中的字段名称列表
+            store: 成员数据，默认为当前群的成员数据
+            progress: 进度回调 progress(已写出行数, 总行数)，可在其他线程中调用
+            cancel: threading.Event，被设置时停止导出并抛出 ExportCancelled
         """
-        export_data = []
+        store = store if store is not None else self.member_data
         
         # 如果没有提供数据，使用全部数据
-        data = data if data is not None else self.member_data
-        
-        for member in data:
-            # 处理时间戳
-            join_time = datetime.fromtimestamp(member.get('join_time', 0)).strftime('%Y-%m-%d %H:%M:%S') if member.get('join_time') else "未知"
-            last_sent_time = datetime.fromtimestamp(member.get('last_sent_time', 0)).strftime('%Y-%m-%d %H:%M:%S') if member.get('last_sent_time') else "未知"
-            
-            # 角色转换
-            role_map = {'owner': '群主', 'admin': '管理员', 'member': '成员'}
-            role = role_map.get(member.get('role', ''), '普通成员')
-            
-            # 性别转换
-            sex_map = {'male': '男', 'female': '女', 'unknown': '未知'}
-            sex = sex_map.get(member.get('sex', ''), '未知')
-            
-            # 构建导出数据
-            export_member = {}
-            for field, name in zip(selected_fields, selected_field_names):
-                if field == "join_time":
-                    export_member[name] = join_time
-                elif field == "last_sent_time":
-                    export_member[name] = last_sent_time
-                elif field == "role":
-                    export_member[name] = role
-                elif field == "sex":
-                    export_member[name] = sex
-                else:
-                    export_member[name] = member.get(field, '')
-            
-            export_data.append(export_member)
+        rows = rows if rows is not None else range(len(store))
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2)
+        with TRACER.span('export', 'json', rows=len(rows)), open(file_path, 'w', encoding='utf-8') as f:
+            write_members_json(f, store, rows, selected_fields, selected_field_names, progress, cancel)
 
-    def export_to_csv(self, file_path, data=None, selected_fields=None, selected_field_names=None):
+    def export_to_csv(self, file_path, rows=None, selected_fields=None, selected_field_names=None, store=None,
+                      progress=None, cancel=None):
         """将成员数据导出为CSV文件
         
         Args:
             file_path: 导出文件路径
-            data: 要导出的数据，如果为None则使用self.member_data
+            rows: 要导出的成员行（MemberStore中的行号），如果为None则导出全部成员
             selected_fields: 选中的字段列表
             selected_field_names: 选中的字段名称列表
+            store: 成员数据，默认为当前群的成员数据
+            progress: 进度回调 progress(已写出行数, 总行数)，可在其他线程中调用
+            cancel: threading.Event，被设置时停止导出并抛出 ExportCancelled
         """
+        store = store if store is not None else self.member_data
+        
         # 如果没有提供数据，使用全部数据
-        data = data if data is not None else self.member_data
+        rows = rows if rows is not None else range(len(store))
+        
+        with TRACER.span('export', 'csv', rows=len(rows)), \
+                open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
+            write_members_csv(csvfile, store, rows, selected_fields, selected_field_names, progress, cancel)
+    
+    def export_all_groups(self):
+        """将群列表中所有群的成员导出到一个zip压缩包，每个群一个gzip压缩的文件，并附带清单"""
+        if not self.group_list:
+            QMessageBox.warning(self, "警告", "群列表为空，请先刷新群列表")
+            return
+        if self.export_future is not None:
+            QMessageBox.warning(self, "警告", "正在导出，请等待当前导出完成或先取消")
+            return
+        
+        # 导出选项对话框
+        dialog = QDialog(self)
+        dialog.setWindowTitle("导出所有群")
+        dialog.setMinimumWidth(400)
+        dialog_layout = QVBoxLayout()
+        dialog.setLayout(dialog_layout)
+        
+        format_group = QGroupBox("导出格式")
+        format_layout = QVBoxLayout()
+        format_group.setLayout(format_layout)
+        csv_radio = QRadioButton("CSV 格式 (.csv.gz)")
+        csv_radio.setChecked(True)
+        json_radio = QRadioButton("JSON 格式 (.json.gz)")
+        format_layout.addWidget(csv_radio)
+        format_layout.addWidget(json_radio)
+        
+        source_group = QGroupBox("成员数据")
+        source_layout = QVBoxLayout()
+        source_group.setLayout(source_layout)
+        snapshot_radio = QRadioButton("使用本地快照（没有快照的群才重新获取）")
+        snapshot_radio.setChecked(True)
+        fetch_radio = QRadioButton("重新获取所有群的成员列表")
+        source_layout.addWidget(snapshot_radio)
+        source_layout.addWidget(fetch_radio)
+        
+        button_layout = QHBoxLayout()
+        cancel_button = QPushButton("取消")
+        export_button = QPushButton("导出")
+        export_button.setDefault(True)
+        button_layout.addStretch()
+        button_layout.addWidget(cancel_button)
+        button_layout.addWidget(export_button)
+        cancel_button.clicked.connect(dialog.reject)
+        export_button.clicked.connect(dialog.accept)
+        
+        dialog_layout.addWidget(format_group)
+        dialog_layout.addWidget(source_group)
+        dialog_layout.addLayout(button_layout)
+        if self.settings.get('theme') == "深色主题":
+            dialog.setStyleSheet("background-color: #353535; color: #cccccc;")
+        
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        export_format = "csv" if csv_radio.isChecked() else "json"
+        
+        default_filename = f"所有群成员_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        file_path, _ = QFileDialog.getSaveFileName(self, "导出所有群", default_filename, "ZIP Files (*.zip)")
+        if not file_path:
+            return
+        
+        groups = [(str(group['group_id']), group.get('group_name', '')) for group in self.group_list
+                  if group.get('group_id')]
+        self.export_cancel = threading.Event()
+        self.export_progress_bar.setRange(0, len(groups))
+        self.export_progress_bar.setValue(0)
+        self.export_progress_bar.show()
+        self.export_cancel_button.show()
+        self.signal_bridge.status_signal.emit(f"正在导出 {len(groups)} 个群的成员...")
+        self.export_future = self.engine.submit(self.do_export_all_groups(
+            file_path, groups, export_format, fetch_radio.isChecked(), self.export_cancel))
+    
+    async def do_export_all_groups(self, file_path, groups, export_format, refresh, cancel):
+        """获取或读取各群的成员列表，在进程池中并行序列化和压缩，依次写入压缩包
+        
+        Args:
+            file_path: 压缩包路径
+            groups: (群号, 群名称) 列表
+            export_format: "csv" 或 "json"
+            refresh: 是否重新获取所有群的成员列表，否则优先使用本地快照
+            cancel: threading.Event，被设置时停止导出并删除压缩包（所有群都已处理完时保留）
+        """
+        fields = list(MEMBER_FIELDS)
+        workers = os.cpu_count() or 1
+        # 限制已取得数据、等待序列化的群数，避免所有群的成员列表同时留在内存中
+        pending = asyncio.Semaphore(workers * 2)
+        write_lock = asyncio.Lock()
+        entries = {}  # 群号 -> 清单条目
+        failed = []
+        progress = {'done': 0}
+        entry_tasks = []
+        skipped = []  # 取消后未处理的群
+        
+        async def load_members(group_id):
+            """返回 (成员列表, 获取时间, 来源)，优先使用本地快照"""
+            if not refresh:
+                cached = await self.engine.run_blocking(self.store.load_member_list, group_id)
+                if cached:
+                    return cached[0], cached[1], "snapshot"
+            body_json = {
+                "group_id": group_id,
+                "no_cache": False
+            }
+            result = await self.engine.request(self.api, body_json, priority=PRIORITY_BACKGROUND)
+            if not isinstance(result.get('data'), list):
+                raise ValueError(result.get('message') or result.get('wording') or "成员列表为空")
+            fetched_at = time.time()
+            members = await self.load_member_store("导出所有群", group_id, result['data'], fetched_at)
+            self.signal_bridge.sync_group_signal.emit(group_id, members, fetched_at)
+            return result['data'], fetched_at, "fetched"
+        
+        async def write_entry(archive, group_id, group_name, members, fetched_at, source):
+            try:
+                details = await self.engine.run_blocking(self.store.load_member_details, group_id)
+                count, data = await self.engine.loop.run_in_executor(
+                    pool, build_archive_entry, members, details, fields, export_format)
+                name = f"group_{group_id}.{export_format}.gz"
+                async with write_lock:
+                    await self.engine.loop.run_in_executor(
+                        self.export_executor, TRACER.wrap('export', 'archive_entry', archive.writestr), name, data)
+                entries[group_id] = {
+                    'group_id': int(group_id),
+                    'group_name': group_name,
+                    'file': name,
+                    'member_count': count,
+                    'fetched_at': datetime.fromtimestamp(fetched_at).isoformat(timespec='seconds'),
+                    'source': source
+                }
+            except Exception as e:
+                failed.append({'group_id': int(group_id), 'group_name': group_name, 'error': str(e)})
+            finally:
+                pending.release()
+                progress['done'] += 1
+                self.signal_bridge.export_progress_signal.emit(progress['done'], len(groups))
+        
+        async def export_group(group):
+            group_id, group_name = group
+            if cancel.is_set():
+                skipped.append(group_id)
+                return
+            await pending.acquire()
+            try:
+                members, fetched_at, source = await load_members(group_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                pending.release()
+                failed.append({'group_id': int(group_id), 'group_name': group_name, 'error': str(e)})
+                progress['done'] += 1
+                self.signal_bridge.export_progress_signal.emit(progress['done'], len(groups))
+                return
+            # 序列化在进程池中进行，不等待其完成即可继续获取下一个群
+            entry_tasks.append(asyncio.ensure_future(
+                write_entry(archive, group_id, group_name, members, fetched_at, source)))
+        
+        error = ""
+        cancelled = False
+        try:
+            archive = zipfile.ZipFile(file_path, 'w', zipfile.ZIP_STORED)
+            try:
+                with self.memory_profiler.measure("导出所有群", os.path.basename(file_path)), \
+                        ProcessPoolExecutor(max_workers=workers,
+                                            mp_context=multiprocessing.get_context('spawn')) as pool:
+                    await self.engine.run_bulk(groups, export_group,
+                                               concurrency=self.settings.get('sync_concurrency', 4))
+                    await asyncio.gather(*entry_tasks)
+                
+                # 清单按群列表的顺序列出导出的群
+                manifest = {
+                    'created_at': datetime.now().isoformat(timespec='seconds'),
+                    'format': export_format,
+                    'compression': 'gzip',
+                    'fields': fields,
+                    'field_names': [MEMBER_FIELDS[field].name for field in fields],
+                    'group_count': len(entries),
+                    'member_count': sum(entry['member_count'] for entry in entries.values()),
+                    'groups': [entries[group_id] for group_id, _ in groups if group_id in entries],
+                    'failed': failed
+                }
+                archive.writestr(zipfile.ZipInfo('manifest.json', time.localtime()[:6]),
+                                 json.dumps(manifest, ensure_ascii=False, indent=2),
+                                 compress_type=zipfile.ZIP_DEFLATED)
+            finally:
+                archive.close()
+        except Exception as e:
+            error = str(e)
+        
+        # 所有群都已处理完时才取消的，压缩包是完整的，予以保留
+        cancelled = bool(skipped)
+        if cancelled or error:
+            try:
+                await self.engine.run_blocking(os.remove, file_path)
+            except OSError:
+                pass
+        self.signal_bridge.archive_finished_signal.emit(file_path, len(entries), len(failed), error, cancelled)
+    
+    def on_archive_finished(self, file_path, exported, failed, error, cancelled):
+        """导出所有群结束：隐藏进度并提示结果"""
+        self.export_future = None
+        self.export_cancel = None
+        self.export_progress_bar.hide()
+        self.export_cancel_button.hide()
+        
+        if cancelled:
+            self.signal_bridge.status_signal.emit("已取消导出所有群")
+        elif error:
+            self.signal_bridge.status_signal.emit("导出所有群失败")
+            self.show_error("导出错误", f"导出所有群时发生错误:\n{error}")
+        else:
+            message = f"已导出 {exported} 个群的成员"
+            if failed:
+                message += f"，{failed} 个群失败（详见压缩包中的 manifest.json）"
+            self.signal_bridge.status_signal.emit(message)
+            QMessageBox.information(self, "导出成功", f"{message}\n\n文件已保存到:\n{file_path}")
+    
+    def enrich_current_members(self):
+        """补全当前群（按表格当前的搜索结果）成员的详情"""
+        group_id = self.current_group_id
+        if not group_id or not self.member_data:
+            QMessageBox.warning(self, "警告", "没有可补全的成员，请先选择一个群")
+            return
+        rows = self.member_model.rows()
+        self.enrich_members(group_id, [self.member_data.user_ids[row] for row in rows])
+    
+    def enrich_members(self, group_id, user_ids, callback=None):
+        """批量获取成员详情并保存到本地，之后的导出直接复用
+        
+        已在本地保存且未过期的详情不会重新获取。请求在请求引擎中以有限的并发和速率发送，
+        进度显示在可取消的进度对话框中；读取已保存的详情和合并详情都在工作线程中进行。
+        
+        Args:
+            group_id: 群号
+            user_ids: 要补全的成员QQ号列表
+            callback: 补全完成后以补全后的 MemberStore 调用，取消时不调用
+        """
+        if self.enrich_future is not None:
+            QMessageBox.warning(self, "警告", "正在补全成员详情，请稍候")
+            return
+        
+        self.enrich_callback = callback
+        # 当前群的数据作为合并详情的基础，其他群基于本地快照重建
+        self.enrich_base = self.member_data if group_id == self.current_group_id else None
+        
+        self.enrich_progress = QProgressDialog("正在补全成员详情...", "取消", 0, len(user_ids), self)
+        self.enrich_progress.setWindowTitle("补全成员详情")
+        self.enrich_progress.setWindowModality(Qt.WindowModal)
+        self.enrich_progress.setAutoClose(False)
+        self.enrich_progress.setAutoReset(False)
+        self.enrich_progress.setMinimumDuration(0)
+        self.enrich_progress.canceled.connect(self.cancel_enrichment)
+        self.enrich_progress.show()
+        
+        self.enrich_future = self.engine.submit(self.do_enrich_members(group_id, user_ids, self.enrich_base))
+    
+    def cancel_enrichment(self):
+        """取消正在进行的成员详情补全（已获取的详情仍会保存）"""
+        if self.enrich_future is not None:
+            self.enrich_future.cancel()
+    
+    async def do_enrich_members(self, group_id, user_ids, base):
+        """在请求引擎中以有限的并发和速率获取成员详情，结束后在工作线程中合并得到补全后的 MemberStore
+        
+        Args:
+            group_id: 群号
+            user_ids: 要补全的成员QQ号列表
+            base: 合并详情的成员数据，None 表示基于本地快照重建
+        """
+        details = []  # (QQ号, 详情)
+        progress = {'done': 0, 'failed': 0}
+        cancelled = False
         
-        with open(file_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            writer = csv.writer(csvfile)
-            # 写入CSV头部
-            writer.writerow(selected_field_names)
+        try:
+            fresh = await self.engine.run_blocking(self.store.load_member_details, group_id, DETAIL_MAX_AGE)
+            pending = [user_id for user_id in dict.fromkeys(user_ids) if user_id not in fresh]
+        except asyncio.CancelledError:
+            cancelled = True
+            pending = []
+        total = len(pending)
+        if pending:
+            self.signal_bridge.status_signal.emit(f"正在补全 {total} 名成员的详情...")
+            self.signal_bridge.enrich_progress_signal.emit(0, total)
+        
+        async def fetch_detail(user_id):
+            body_json = {
+                "group_id": group_id,
+                "user_id": user_id,
+                "no_cache": False
+            }
+            try:
+                result = await self.engine.request(self.api_user_detail, body_json, priority=PRIORITY_BACKGROUND)
+                if isinstance(result.get('data'), dict):
+                    details.append((user_id, result['data']))
+                else:
+                    progress['failed'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                progress['failed'] += 1
+            progress['done'] += 1
+            self.signal_bridge.enrich_progress_signal.emit(progress['done'], total)
+        
+        if pending:
+            try:
+                await self.engine.run_bulk(pending, fetch_detail, self.settings.get('bulk_rate', 200))
+            except asyncio.CancelledError:
+                cancelled = True
+        
+        store = base
+        try:
+            if details:
+                await self.engine.run_blocking(self.store.save_member_details, group_id, details)
+            if base is None:
+                cached = await self.engine.run_blocking(self.store.load_member_list, group_id)
+                store = (await self.engine.run_blocking(self.build_member_store, group_id, cached[0])
+                         if cached else MemberStore())
+            elif details:
+                merged = await self.engine.run_blocking(self.store.load_member_details, group_id)
+                store = await self.engine.run_blocking(base.with_details, merged)
+        except asyncio.CancelledError:
+            # 在保存或合并期间取消：仍然通知界面结束补全
+            cancelled = True
+        except Exception as e:
+            self.signal_bridge.error_signal.emit("错误", f"保存成员详情失败: {str(e)}")
+        self.signal_bridge.enrich_finished_signal.emit(group_id, store, len(details), progress['failed'], cancelled)
+    
+    def on_enrich_progress(self, done, total):
+        """更新补全进度"""
+        # 模态进度框的 setValue 会处理事件，期间补全可能已结束并关闭进度框
+        progress = self.enrich_progress
+        if progress is not None:
+            progress.setMaximum(total)
+            progress.setLabelText(f"正在补全成员详情... {done}/{total}")
+            progress.setValue(done)
+    
+    def on_enrich_finished(self, group_id, store, fetched, failed, cancelled):
+        """补全结束：显示补全后的成员数据，并执行后续操作"""
+        self.enrich_future = None
+        callback, self.enrich_callback = self.enrich_callback, None
+        base, self.enrich_base = self.enrich_base, None
+        if self.enrich_progress is not None:
+            self.enrich_progress.close()
+            self.enrich_progress = None
+        
+        # 补全期间已重新加载的数据更新，保留新数据而不用补全前的数据覆盖
+        if base is not None and store is not base and self.member_data is base:
+            self.member_data = store
+            self.update_table()
+        
+        if cancelled:
+            self.signal_bridge.status_signal.emit(f"已取消补全成员详情（已保存 {fetched} 条）")
+            return
+        message = f"成员详情补全完成：新获取 {fetched} 条"
+        if failed:
+            message += f"，失败 {failed} 条"
+        self.signal_bridge.status_signal.emit(message)
+        
+        if callback is not None:
+            callback(store)
+    
+    def sync_all_groups(self):
+        """并发获取群列表中所有群的成员列表，建立跨群成员索引；同步进行中时再次调用则停止同步"""
+        if self.sync_future is not None:
+            self.sync_future.cancel()
+            return
+        if not self.group_list:
+            QMessageBox.warning(self, "警告", "群列表为空，请先刷新群列表")
+            return
+        
+        group_ids = [str(group['group_id']) for group in self.group_list if group.get('group_id')]
+        self.sync_action.setText("停止同步")
+        self.signal_bridge.status_signal.emit(f"正在同步所有群的成员 0/{len(group_ids)}...")
+        self.sync_future = self.engine.submit(self.do_sync_all_groups(group_ids))
+    
+    async def do_sync_all_groups(self, group_ids):
+        """在请求引擎中同步所有群的成员列表，每完成一个群就发布给界面线程"""
+        total = len(group_ids)
+        progress = {'done': 0, 'failed': 0}
+        
+        async def sync_group(group_id):
+            body_json = {
+                "group_id": group_id,
+                "no_cache": False
+            }
+            try:
+                result = await self.engine.request(self.api, body_json, priority=PRIORITY_BACKGROUND)
+                if isinstance(result.get('data'), list):
+                    fetched_at = time.time()
+                    members = await self.load_member_store("同步", group_id, result['data'], fetched_at)
+                    self.signal_bridge.sync_group_signal.emit(group_id, members, fetched_at)
+                else:
+                    progress['failed'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                progress['failed'] += 1
+            progress['done'] += 1
+            self.signal_bridge.sync_progress_signal.emit(progress['done'], total)
+        
+        cancelled = False
+        try:
+            await self.engine.run_bulk(group_ids, sync_group,
+                                       concurrency=self.settings.get('sync_concurrency', 4))
+        except asyncio.CancelledError:
+            cancelled = True
+        self.signal_bridge.sync_finished_signal.emit(progress['done'] - progress['failed'],
+                                                     progress['failed'], cancelled)
+    
+    async def do_load_user_index(self, group_ids):
+        """从本地快照加载尚未索引的群，使查找无需等待网络同步"""
+        for group_id in group_ids:
+            cached = await self.engine.run_blocking(self.store.load_member_list, group_id)
+            if cached:
+                members = await self.engine.run_blocking(self.build_member_store, group_id, cached[0])
+                self.signal_bridge.sync_group_signal.emit(group_id, members, cached[1])
+    
+    def on_sync_group(self, group_id, members, fetched_at):
+        """收到一个群的成员数据：更新跨群索引，若是当前群且数据更新则刷新表格"""
+        self.refresh_scheduler.note_fetched(group_id, fetched_at)
+        if not self.user_index.update_group(group_id, members, fetched_at):
+            return
+        if group_id == self.current_group_id and fetched_at > self.member_fetched_at:
+            self.member_fetched_at = fetched_at
+            self.update_cache_age()
+            if members != self.member_data:
+                self.member_data = members
+                self.update_table()
+    
+    def on_sync_progress(self, done, total):
+        """在状态栏显示同步进度"""
+        self.status_label.setText(f"正在同步所有群的成员 {done}/{total}...")
+    
+    def on_sync_finished(self, succeeded, failed, cancelled):
+        """同步所有群结束"""
+        self.sync_future = None
+        self.sync_action.setText("同步所有群")
+        message = f"同步{'已停止' if cancelled else '完成'}：成功 {succeeded} 个群"
+        if failed:
+            message += f"，失败 {failed} 个群"
+        message += f"，共索引 {self.user_index.user_count} 名成员"
+        self.signal_bridge.status_signal.emit(message)
+    
+    def on_member_changes(self, group_id, changes):
+        """检测到成员变化时在状态栏临时提示，并让该群更频繁地后台刷新"""
+        self.refresh_scheduler.note_changes(group_id, len(changes))
+        counts = [0] * len(CHANGE_NAMES)
+        for change in changes:
+            counts[change.kind] += 1
+        summary = "，".join(f"{name} {count}" for name, count in zip(CHANGE_NAMES, counts) if count)
+        group_name = next((group.get('group_name', '') for group in self.group_list
+                           if str(group.get('group_id')) == group_id), group_id)
+        # 临时消息，不会被随后的“就绪”状态覆盖
+        self.statusBar.showMessage(f"群 {group_name} 成员变化：{summary}", 10 * 1000)
+    
+    def show_member_changes(self):
+        """显示成员变化记录对话框"""
+        group_names = {str(group.get('group_id')): group.get('group_name', '') for group in self.group_list}
+        dialog = MemberChangesDialog(self, self.store, group_names, self.settings.get('theme'),
+                                     self.current_group_id)
+        self.signal_bridge.member_changes_signal.connect(dialog.reload)
+        dialog.finished.connect(lambda: self.signal_bridge.member_changes_signal.disconnect(dialog.reload))
+        dialog.show()
+    
+    def start_event_listener(self):
+        """按设置启动（或重新启动）事件上报接收服务"""
+        self.stop_event_listener()
+        if not self.settings.get('event_listen'):
+            return
+        host = self.settings.get('event_host', '127.0.0.1')
+        port = self.settings.get('event_port', 8090)
+        try:
+            self.event_listener = EventListener(host, port, self.on_event,
+                                                self.settings.get('event_secret', '')).start()
+        except (OSError, ValueError) as e:
+            self.show_error("事件上报", f"无法在 {host}:{port} 接收事件上报:\n{str(e)}")
+            return
+        self.signal_bridge.status_signal.emit(f"正在 {host}:{port} 接收事件上报")
+    
+    def stop_event_listener(self):
+        """停止事件上报接收服务"""
+        if self.event_listener is not None:
+            self.event_listener.stop()
+            self.event_listener = None
+    
+    def on_event(self, event):
+        """收到一条上报事件（在接收线程中调用），群通知交给请求引擎应用"""
+        if event.get('post_type') == 'notice' and event.get('notice_type') in EVENT_NOTICE_TYPES:
+            self.engine.submit(self.apply_group_event(event))
+    
+    async def apply_group_event(self, event):
+        """将一条群通知应用到该群的成员数据（在请求引擎中执行）
+        
+        只处理已有本地快照的群，其他群下次获取成员列表时自然是最新的。原始成员列表中的
+        对应成员被修改后延迟保存；内存中的 MemberStore 只复制列做增量更新，变化记入成员
+        变化记录，并通知界面线程更新跨群索引和表格。
+        
+        Args:
+            event: OneBot 通知事件（group_increase、group_decrease、group_admin、group_ban、group_card）
+        """
+        group_id = str(event.get('group_id') or '')
+        user_id = int(event.get('user_id') or 0)
+        notice_type = event.get('notice_type')
+        if not group_id:
+            return
+        
+        lock = self.event_locks.get(group_id)
+        if lock is None:
+            lock = self.event_locks[group_id] = asyncio.Lock()
+        async with lock:
+            cached = await self.load_event_members(group_id)
+            if cached is None:
+                return
+            event_time = event.get('time') or time.time()
+            if notice_type == 'group_increase':
+                member = await self.fetch_event_member(group_id, user_id, event_time)
+            store = self.previous_members.get(group_id)
+            if store is None:
+                store = await self.engine.run_blocking(self.build_member_store, group_id, list(cached[0].values()))
+                # 构建期间可能已获取到新的成员列表
+                store = self.previous_members.get(group_id, store)
+                self.remember_members(group_id, store)
+            # 等待期间可能已获取到新的成员列表（不经过事件锁），之后的修改都基于最新的数据
+            cached = self.event_members.get(group_id, cached)
+            members = cached[0]
             
-            # 写入成员数据
-            for member in data:
-                row = []
-                for field in selected_fields:
-                    if field == "join_time":
-                        value = datetime.fromtimestamp(member.get('join_time', 0)).strftime('%Y-%m-%d %H:%M:%S') if member.get('join_time') else "未知"
-                    elif field == "last_sent_time":
-                        value = datetime.fromtimestamp(member.get('last_sent_time', 0)).strftime('%Y-%m-%d %H:%M:%S') if member.get('last_sent_time') else "未知"
-                    elif field == "role":
-                        role_map = {'owner': '群主', 'admin': '管理员', 'member': '成员'}
-                        value = role_map.get(member.get('role', ''), '普通成员')
-                    elif field == "sex":
-                        sex_map = {'male': '男', 'female': '女', 'unknown': '未知'}
-                        value = sex_map.get(member.get('sex', ''), '未知')
-                    else:
-                        value = member.get(field, '')
-                    row.append(value)
-                writer.writerow(row)
+            new_store = store
+            changes = []
+            row = store.user_rows().get(user_id)
+            if notice_type == 'group_increase':
+                members[user_id] = member
+                new_store = store.with_member(member)
+                if row is None:
+                    changes.append(MemberChange(CHANGE_JOIN, user_id, '',
+                                                member.get('card') or member.get('nickname') or ''))
+            elif notice_type == 'group_decrease':
+                members.pop(user_id, None)
+                if row is not None:
+                    new_store = store.without_user(user_id)
+                    changes.append(MemberChange(CHANGE_LEAVE, user_id, store.display_name(row), ''))
+            elif notice_type == 'group_admin' and row is not None:
+                role = 'admin' if event.get('sub_type') == 'set' else 'member'
+                old_role = ROLE_KEYS[store.roles[row]]
+                if role != old_role:
+                    if user_id in members:
+                        members[user_id] = {**members[user_id], 'role': role}
+                    member = store.member(row)
+                    member['role'] = role
+                    new_store = store.with_member(member)
+                    changes.append(MemberChange(CHANGE_ROLE, user_id, old_role, role))
+            elif notice_type == 'group_card' and row is not None:
+                card = event.get('card_new') or ''
+                old_card = store.cards[row]
+                if card != old_card:
+                    if user_id in members:
+                        members[user_id] = {**members[user_id], 'card': card}
+                    member = store.member(row)
+                    member['card'] = card
+                    new_store = store.with_member(member)
+                    changes.append(MemberChange(CHANGE_CARD, user_id, old_card, card))
+            elif notice_type == 'group_ban':
+                # 禁言状态只在原始成员列表中保存，成员数据和表格不变
+                duration = int(event.get('duration') or 0) if event.get('sub_type') == 'ban' else 0
+                if user_id in members:
+                    members[user_id] = {**members[user_id],
+                                        'shut_up_timestamp': int(event_time) + duration if duration else 0}
+                name = store.display_name(row) if row is not None else "全体成员" if not user_id else str(user_id)
+                action = f"被禁言 {self.format_duration(duration)}" if duration else "被解除禁言"
+                self.signal_bridge.status_signal.emit(f"群 {group_id}：{name} {action}")
+            
+            # 开始接收事件后获取的快照由事件保持最新，否则保留原来的获取时间
+            listener = self.event_listener
+            if listener is not None and cached[1] >= listener.started_at:
+                cached[1] = time.time()
+            self.schedule_event_save(group_id)
+            
+            if new_store is not store:
+                self.remember_members(group_id, new_store)
+            # 与获取成员列表时一样先通知变化，刷新调度先缩短间隔，再按新数据安排下次刷新
+            if changes:
+                await self.engine.run_blocking(self.store.save_member_changes, group_id, changes, event_time)
+                self.signal_bridge.member_changes_signal.emit(group_id, changes)
+            if new_store is not store:
+                # 合并补全得到的成员详情，避免刷新表格后丢失已补全的信息
+                details = await self.engine.run_blocking(self.store.load_member_details, group_id)
+                merged = await self.engine.run_blocking(new_store.with_details, details)
+                if self.previous_members.get(group_id) is new_store:
+                    self.previous_members[group_id] = merged
+                    self.signal_bridge.group_event_signal.emit(group_id, merged, cached[1])
+    
+    async def load_event_members(self, group_id):
+        """返回按事件修改的 [{QQ号: 成员}, 数据时间]，首次使用时从本地快照读取，没有快照时返回None"""
+        cached = self.event_members.get(group_id)
+        if cached is None:
+            snapshot = await self.engine.run_blocking(self.store.load_member_list, group_id)
+            if snapshot is None:
+                return None
+            # 读取期间可能已获取到新的成员列表
+            cached = self.event_members.get(group_id)
+            if cached is None:
+                cached = self.event_members[group_id] = [
+                    {int(m.get('user_id') or 0): m for m in snapshot[0]}, snapshot[1]]
+        return cached
+    
+    async def fetch_event_member(self, group_id, user_id, event_time):
+        """获取新加入成员的信息（入群通知中没有昵称等信息），失败时返回只有QQ号的成员"""
+        body_json = {
+            "group_id": group_id,
+            "user_id": user_id,
+            "no_cache": True
+        }
+        try:
+            result = await self.engine.request(self.api_user_detail, body_json, priority=PRIORITY_BACKGROUND)
+            if isinstance(result.get('data'), dict):
+                # 复制一份：请求结果可能由多个调用方共享
+                member = dict(result['data'])
+                await self.engine.run_blocking(self.store.save_member_details, group_id, [(user_id, member)])
+                return member
+        except Exception:
+            pass
+        return {'group_id': int(group_id), 'user_id': user_id, 'nickname': '', 'card': '', 'role': 'member',
+                'join_time': int(event_time), 'last_sent_time': 0}
+    
+    def schedule_event_save(self, group_id):
+        """稍后保存按事件修改的成员列表快照，期间同一群的其他事件一起保存"""
+        if group_id in self.event_pending_saves:
+            return
+        self.event_pending_saves.add(group_id)
+        asyncio.get_event_loop().call_later(
+            EVENT_SAVE_DELAY, lambda: asyncio.ensure_future(self.save_event_members(group_id)))
+    
+    async def save_event_members(self, group_id):
+        """保存按事件修改的成员列表快照"""
+        self.event_pending_saves.discard(group_id)
+        cached = self.event_members.get(group_id)
+        if cached is None:
+            return
+        try:
+            await self.engine.run_blocking(self.store.save_member_list, group_id, list(cached[0].values()), cached[1])
+        except Exception as e:
+            self.signal_bridge.error_signal.emit("错误", f"保存成员列表快照失败: {str(e)}")
+    
+    def on_group_event(self, group_id, members, fetched_at):
+        """事件更新了一个群的成员数据：更新跨群索引，若是当前群则刷新表格"""
+        self.user_index.update_group(group_id, members, fetched_at)
+        self.refresh_scheduler.note_fetched(group_id, fetched_at)
+        if group_id == self.current_group_id:
+            self.member_data = members
+            self.member_fetched_at = max(self.member_fetched_at, fetched_at)
+            self.update_table()
+            self.update_cache_age()
+    
+    def update_refresh_timer(self):
+        """按设置启动或停止后台刷新定时器"""
+        if self.settings.get('background_refresh', True):
+            if not self.refresh_timer.isActive():
+                self.refresh_timer.start(RefreshScheduler.TICK * 1000)
+        else:
+            self.refresh_timer.stop()
+    
+    def refresh_tick(self):
+        """定时检查：群列表过期时刷新群列表，并在请求预算内提交到期群的后台刷新"""
+        # 同步所有群时已在获取全部成员列表
+        if self.sync_future is not None:
+            return
+        scheduler = self.refresh_scheduler
+        scheduler.record_requests(self.policy.sent_total)
+        if scheduler.list_due(self.group_list_last_update, self.settings.get('cache_time', 30) * 60):
+            self.engine.submit(self.do_fetch_group_list(silent=True))
+        scheduler.track(str(group['group_id']) for group in self.group_list if group.get('group_id'))
+        for group_id in scheduler.next_batch():
+            self.engine.submit(self.do_background_refresh(group_id))
+    
+    async def do_background_refresh(self, group_id):
+        """在请求引擎中后台刷新一个群的成员列表和群信息，失败时不提示
+        
+        成员列表与同步所有群一样经 sync_group_signal 发布，当前打开的群会随之更新表格。
+        """
+        body_json = {
+            "group_id": group_id,
+            "no_cache": False
+        }
+        ok = False
+        try:
+            result, info = await asyncio.gather(
+                self.engine.request(self.api, body_json, priority=PRIORITY_BACKGROUND),
+                self.engine.request(self.api_group_info, body_json, priority=PRIORITY_BACKGROUND),
+                return_exceptions=True)
+            if isinstance(result, dict) and isinstance(result.get('data'), list):
+                fetched_at = time.time()
+                members = await self.load_member_store("后台刷新", group_id, result['data'], fetched_at)
+                self.signal_bridge.sync_group_signal.emit(group_id, members, fetched_at)
+                ok = True
+            if isinstance(info, dict) and isinstance(info.get('data'), dict):
+                await self.engine.run_blocking(self.store.save_group_info, group_id, info['data'])
+                # 先读取加载代次：期间切换了群时，群信息会作为过期结果被丢弃
+                generation = self.load_generation
+                if group_id == self.current_group_id:
+                    self.signal_bridge.update_group_info_signal.emit(info['data'], generation)
+        except Exception:
+            pass
+        self.signal_bridge.refresh_done_signal.emit(group_id, ok)
+    
+    def on_background_refresh_done(self, group_id, ok):
+        """后台刷新一个群结束"""
+        self.refresh_scheduler.finish(group_id, ok)
+    
+    def show_user_groups(self, user_id=""):
+        """显示查找成员所在群的对话框"""
+        # 先从本地快照补充尚未索引的群
+        unindexed = [str(group['group_id']) for group in self.group_list
+                     if group.get('group_id') and not self.user_index.has_group(str(group['group_id']))]
+        if unindexed:
+            self.engine.submit(self.do_load_user_index(unindexed))
+        
+        group_names = {str(group.get('group_id')): group.get('group_name', '') for group in self.group_list}
+        dialog = UserGroupsDialog(self, self.user_index, group_names, self.settings.get('theme'), user_id)
+        dialog.open_group_signal.connect(self.open_group)
+        # 加载快照期间索引会增长，刷新查询结果
+        self.signal_bridge.sync_group_signal.connect(dialog.lookup)
+        dialog.finished.connect(lambda: self.signal_bridge.sync_group_signal.disconnect(dialog.lookup))
+        dialog.show()
+    
+    def open_group(self, group_id):
+        """在群列表中选中并加载指定的群"""
+        row = self.group_list_model.row_of(int(group_id))
+        if row >= 0:
+            index = self.group_filter_model.mapFromSource(self.group_list_model.index(row))
+            if not index.isValid():
+                # 被群列表搜索过滤掉了，先清空搜索
+                self.search_input.clear()
+                index = self.group_filter_model.mapFromSource(self.group_list_model.index(row))
+            self.group_list_view.setCurrentIndex(index)
+        self.fetch_all_info(group_id)
     
     def show_error(self, title, message):
         QMessageBox.critical(self, title, message)
     
     def update_status(self, message):
         self.status_label.setText(message)
+        self.update_cache_age()
+    
+    def update_cache_age(self):
+        """在状态栏显示当前数据的新旧程度"""
+        now = time.time()
+        parts = []
+        if self.group_list_last_update:
+            parts.append(f"群列表: {self.format_age(now - self.group_list_last_update)}")
+        if self.member_fetched_at:
+            member_age = f"成员: {self.format_age(now - self.member_fetched_at)}"
+            if self.revalidating:
+                member_age += " (刷新中)"
+            parts.append(member_age)
+        self.cache_age_label.setText("  |  ".join(parts))
+    
+    def update_queue_status(self):
+        """在状态栏显示进行中和排队的请求数"""
+        active, waiting = self.engine.queue_status()
+        if not active and not any(waiting):
+            self.queue_label.hide()
+            return
+        text = f"请求 {active} 进行中"
+        if any(waiting):
+            detail = " ".join(f"{name} {count}" for name, count in zip(PRIORITY_NAMES, waiting) if count)
+            text += f"，排队 {sum(waiting)}（{detail}）"
+        self.queue_label.setText(text)
+        self.queue_label.show()
+    
+    def format_age(self, seconds):
+        """格式化数据的年龄为易读的格式"""
+        if seconds < 60:
+            return "刚刚更新"
+        elif seconds < 3600:
+            return f"{int(seconds // 60)}分钟前"
+        elif seconds < 86400:
+            return f"{int(seconds // 3600)}小时前"
+        else:
+            return f"{int(seconds // 86400)}天前"
     
     def set_button_state(self, enabled):
         """设置按钮状态
@@ -1871,24 +5769,19 @@ class GroupMemberGUI(QMainWindow):
             else:
                 self.member_list_box.collapse(False)
     
-    def on_cell_double_clicked(self, row, column):
+    def on_cell_double_clicked(self, index):
         """处理表格单元格双击事件"""
         # 检查是否有有效数据
-        if not self.member_data or row >= len(self.member_data):
+        if not index.isValid() or index.row() >= self.member_model.rowCount():
             return
             
         # 获取用户QQ号
-        user_id = self.table.item(row, 0).text()
+        user_id = str(self.member_model.member(index.row()).get('user_id', ''))
         if not user_id:
             return
             
         # 获取当前选中的群ID
-        group_id = None
-        current_row = self.group_list_widget.currentRow()
-        if current_row >= 0:
-            item = self.group_list_widget.item(current_row)
-            if isinstance(item, GroupListItem):
-                group_id = str(item.group_data.get('group_id'))
+        group_id = self.selected_group_id()
         
         if not group_id:
             self.show_error("错误", "无法获取当前群号")
@@ -1897,32 +5790,21 @@ class GroupMemberGUI(QMainWindow):
         # 更新状态
         self.status_label.setText(f"正在获取用户 {user_id} 的详细信息...")
         
-        # 在后台线程中请求详细信息
-        thread = threading.Thread(target=self.fetch_user_detail, args=(group_id, user_id))
-        thread.daemon = True
-        thread.start()
+        # 在请求引擎中请求详细信息
+        self.engine.submit(self.fetch_user_detail(group_id, user_id))
     
-    def fetch_user_detail(self, group_id, user_id):
+    async def fetch_user_detail(self, group_id, user_id):
         """获取群成员的详细信息"""
         try:
             # 构建请求
-            url = self.settings.get('url')
-            token = self.settings.get('token')
-            full_url = url + self.api_user_detail
             body_json = {
                 "group_id": group_id,
                 "user_id": user_id,
                 "no_cache": False
             }
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {token}'
-            }
             
             # 发送请求
-            response = requests.post(full_url, json=body_json, headers=headers)
-            response.raise_for_status()
-            result = response.json()
+            result = await self.engine.request(self.api_user_detail, body_json, priority=PRIORITY_INTERACTIVE)
             
             # 处理响应数据
             if 'data' in result and isinstance(result['data'], dict):
@@ -1957,12 +5839,7 @@ class GroupMemberGUI(QMainWindow):
         current_theme = self.settings.get('theme')
         
         # 获取当前选中的群ID
-        group_id = None
-        current_row = self.group_list_widget.currentRow()
-        if current_row >= 0:
-            item = self.group_list_widget.item(current_row)
-            if isinstance(item, GroupListItem):
-                group_id = str(item.group_data.get('group_id'))
+        group_id = self.selected_group_id()
         
         if not group_id:
             self.show_error("错误", "无法获取当前群号")
@@ -1992,32 +5869,21 @@ class GroupMemberGUI(QMainWindow):
         # 禁用按钮，防止重复操作
         self.signal_bridge.enable_button_signal.emit(False)
         
-        # 后台线程执行禁言
-        thread = threading.Thread(target=self.do_ban_request, args=(group_id, user_id, duration))
-        thread.daemon = True
-        thread.start()
+        # 在请求引擎中执行禁言
+        self.engine.submit(self.do_ban_request(group_id, user_id, duration))
     
-    def do_ban_request(self, group_id, user_id, duration):
+    async def do_ban_request(self, group_id, user_id, duration):
         """执行禁言请求"""
         try:
             # 构建请求
-            url = self.settings.get('url')
-            token = self.settings.get('token')
-            full_url = url + self.api_ban
             body_json = {
                 "group_id": group_id,
                 "user_id": user_id,
                 "duration": duration
             }
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {token}'
-            }
             
             # 发送请求
-            response = requests.post(full_url, json=body_json, headers=headers)
-            response.raise_for_status()
-            result = response.json()
+            result = await self.engine.request(self.api_ban, body_json, priority=PRIORITY_INTERACTIVE)
             
             # 处理响应结果
             if 'status' in result:
@@ -2052,6 +5918,143 @@ class GroupMemberGUI(QMainWindow):
             else:
                 QMessageBox.warning(self, "禁言失败", f"设置禁言失败: {message}")
     
+    def selected_members(self):
+        """按表格显示顺序返回选中的成员，每项为 (QQ号, 显示名称)"""
+        store = self.member_data
+        members = []
+        for index in sorted(self.table.selectionModel().selectedRows(), key=lambda index: index.row()):
+            row = self.member_model.store_row(index.row())
+            members.append((store.user_ids[row], store.display_name(row)))
+        return members
+    
+    def show_member_context_menu(self, pos):
+        """成员表格右键菜单"""
+        index = self.table.indexAt(pos)
+        if not index.isValid():
+            return
+        count = len(self.table.selectionModel().selectedRows())
+        
+        menu = QMenu(self)
+        detail_action = menu.addAction("查看详情")
+        detail_action.triggered.connect(lambda: self.on_cell_double_clicked(index))
+        user_id = self.member_model.member(index.row()).get('user_id')
+        groups_action = menu.addAction("查看所在的群")
+        groups_action.triggered.connect(lambda: self.show_user_groups(user_id))
+        menu.addSeparator()
+        ban_action = menu.addAction(f"禁言选中成员 ({count})")
+        ban_action.triggered.connect(self.bulk_ban_selected)
+        unban_action = menu.addAction(f"解除禁言 ({count})")
+        unban_action.triggered.connect(self.bulk_unban_selected)
+        menu.exec_(self.table.viewport().mapToGlobal(pos))
+    
+    def bulk_ban_selected(self):
+        """禁言表格中选中的成员"""
+        members = self.selected_members()
+        if not members:
+            QMessageBox.warning(self, "警告", "请先在成员表格中选择要禁言的成员（可按住Ctrl或Shift多选）")
+            return
+        
+        # 只选中一名成员时显示其信息
+        user_info = None
+        if len(members) == 1:
+            store = self.member_data
+            user_info = store.member(store.user_rows()[members[0][0]])
+        dialog = BanUserDialog(self, user_info, self.settings.get('theme'), user_count=len(members))
+        if dialog.exec_() == QDialog.Accepted:
+            self.bulk_ban(self.current_group_id, members, dialog.get_duration())
+    
+    def bulk_unban_selected(self):
+        """解除表格中选中成员的禁言"""
+        members = self.selected_members()
+        if not members:
+            QMessageBox.warning(self, "警告", "请先在成员表格中选择要解除禁言的成员")
+            return
+        
+        reply = QMessageBox.question(self, "解除禁言", f"确定解除选中的 {len(members)} 名成员的禁言吗？")
+        if reply == QMessageBox.Yes:
+            self.bulk_ban(self.current_group_id, members, 0)
+    
+    def bulk_ban(self, group_id, members, duration):
+        """批量设置禁言，时长为0表示解除禁言
+        
+        请求在请求引擎中以有限的并发和速率发送，进度显示在状态栏中，界面不会被锁定，
+        全部完成后汇总每个成员的结果。
+        
+        Args:
+            group_id: 群号
+            members: (QQ号, 显示名称) 列表
+            duration: 禁言时长（秒）
+        """
+        if not group_id:
+            self.show_error("错误", "无法获取当前群号")
+            return
+        if self.bulk_ban_future is not None:
+            QMessageBox.warning(self, "警告", "上一个批量禁言操作仍在进行中，请稍候")
+            return
+        
+        action = "禁言" if duration else "解除禁言"
+        self.signal_bridge.status_signal.emit(f"正在批量{action} 0/{len(members)}...")
+        self.bulk_ban_future = self.engine.submit(self.do_bulk_ban(group_id, members, duration))
+    
+    async def do_bulk_ban(self, group_id, members, duration):
+        """在请求引擎中并发执行批量禁言，收集每个成员的结果"""
+        total = len(members)
+        results = []  # (QQ号, 显示名称, 是否成功, 失败原因)
+        
+        async def ban_member(member):
+            user_id, name = member
+            body_json = {
+                "group_id": group_id,
+                "user_id": user_id,
+                "duration": duration
+            }
+            try:
+                # 普通优先级：先于同步、补全等后台任务，但不抢在查看详情等交互操作之前
+                result = await self.engine.request(self.api_ban, body_json, priority=PRIORITY_NORMAL)
+                if result.get('status') == 'ok':
+                    results.append((user_id, name, True, ""))
+                else:
+                    results.append((user_id, name, False, result.get('message') or '未知错误'))
+            except asyncio.CancelledError:
+                raise
+            except requests.exceptions.RequestException as e:
+                results.append((user_id, name, False, f"请求错误: {str(e)}"))
+            except Exception as e:
+                results.append((user_id, name, False, str(e)))
+            self.signal_bridge.bulk_ban_progress_signal.emit(len(results), total)
+        
+        try:
+            # 禁言是管理操作，使用单独的较低速率，不与只读的批量补全共用
+            await self.engine.run_bulk(members, ban_member, max(1, self.settings.get('ban_rate', 5)))
+        except asyncio.CancelledError:
+            pass
+        self.signal_bridge.bulk_ban_finished_signal.emit(duration, results)
+    
+    def on_bulk_ban_progress(self, done, total):
+        """在状态栏显示批量禁言进度"""
+        self.status_label.setText(f"正在批量处理禁言 {done}/{total}...")
+    
+    def on_bulk_ban_finished(self, duration, results):
+        """汇总批量禁言结果"""
+        self.bulk_ban_future = None
+        action = f"禁言 {self.format_duration(duration)}" if duration else "解除禁言"
+        failures = [(user_id, name, message) for user_id, name, success, message in results if not success]
+        succeeded = len(results) - len(failures)
+        self.signal_bridge.status_signal.emit(f"批量{action}完成：成功 {succeeded}，失败 {len(failures)}")
+        
+        box = QMessageBox(self)
+        box.setWindowTitle("批量禁言结果")
+        box.setIcon(QMessageBox.Warning if failures else QMessageBox.Information)
+        box.setText(f"批量{action}完成\n成功: {succeeded} 人\n失败: {len(failures)} 人")
+        if failures:
+            lines = []
+            for user_id, name, message in failures:
+                if message == "ERR_NOT_GROUP_ADMIN":
+                    message = "您不是群管理员，无法设置禁言"
+                lines.append(f"{name} ({user_id}): {message}")
+            box.setDetailedText("\n".join(lines))
+        box.exec_()
+    
     def format_duration(self, seconds):
         """格式化时长为易读的格式"""
         if seconds < 60:
@@ -2074,34 +6077,37 @@ class GroupMemberGUI(QMainWindow):
             else:
                 return f"{days}天"
                 
-    def fetch_group_info(self, group_id):
-        """获取群基本信息"""
+    async def fetch_group_info(self, group_id, generation, use_cache=False):
+        """获取群基本信息，use_cache 时在等待响应期间先发布本地保存的群信息"""
         try:
             # 构建请求
-            url = self.settings.get('url')
-            token = self.settings.get('token')
-            full_url = url + self.api_group_info
             body_json = {
                 "group_id": group_id,
                 "no_cache": False
             }
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {token}'
-            }
             
             # 发送请求
-            response = requests.post(full_url, json=body_json, headers=headers)
-            response.raise_for_status()
-            result = response.json()
+            request = asyncio.ensure_future(self.engine.request(self.api_group_info, body_json,
+                                                                is_stale=lambda: self.is_stale(generation)))
+            try:
+                if use_cache:
+                    cached = await self.engine.run_blocking(self.store.load_group_info, group_id)
+                    if cached:
+                        self.signal_bridge.update_group_info_signal.emit(cached[0], generation)
+                result = await request
+            finally:
+                request.cancel()
             
             # 处理响应数据
             if 'data' in result and isinstance(result['data'], dict):
-                self.group_info = result['data']  # 保存群信息
-                self.signal_bridge.update_group_info_signal.emit(result['data'])
+                await self.engine.run_blocking(self.store.save_group_info, group_id, result['data'])
+                self.signal_bridge.update_group_info_signal.emit(result['data'], generation)
             else:
                 self.signal_bridge.error_signal.emit("错误", "返回的群信息格式不正确")
         
+        except (StaleRequestError, asyncio.CancelledError):
+            # 已被更新的加载取代，静默放弃
+            return
         except requests.exceptions.RequestException as e:
             self.signal_bridge.error_signal.emit("请求错误", str(e))
         except json.JSONDecodeError:
@@ -2109,9 +6115,15 @@ class GroupMemberGUI(QMainWindow):
         except Exception as e:
             self.signal_bridge.error_signal.emit("错误", str(e))
     
-    def update_group_info(self, group_data):
+    def update_group_info(self, group_data, generation):
         """更新群信息显示"""
+        # 丢弃过期的群信息
+        if self.is_stale(generation):
+            return
+        
         if group_data:
+            self.group_info = group_data  # 保存群信息
+            
             # 更新群信息标签
             self.group_info_labels["群名称"].setText(group_data.get("group_name", "未知"))
             self.group_info_labels["群号"].setText(str(group_data.get("group_id", "未知")))
@@ -2130,10 +6142,25 @@ class GroupMemberGUI(QMainWindow):
     def closeEvent(self, event):
         """程序关闭时保存设置"""
         self.save_settings()
+        self.refresh_timer.stop()
+        self.queue_timer.stop()
+        self.cancel_enrichment()
+        self.cancel_export()
+        self.stop_event_listener()
+        if self.bulk_ban_future is not None:
+            self.bulk_ban_future.cancel()
+        if self.sync_future is not None:
+            self.sync_future.cancel()
+        self.engine.stop()
+        self.export_executor.shutdown(wait=False)
+        self.client.close()
+        self.store.close()
         super().closeEvent(event)
 
 
 if __name__ == "__main__":
+    # 打包为可执行文件时，导出所有群使用的子进程需要
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     ex = GroupMemberGUI()
     sys.exit(app.exec_())
\ No newline at end of file